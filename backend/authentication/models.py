@@ -21,11 +21,13 @@ class UserProfile(models.Model):
     education = models.TextField(blank=True, null=True)
     experience = models.TextField(blank=True, null=True)
     profile_image = models.ImageField(upload_to='profiles/', blank=True, null=True)
+    profile_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     
     # Company fields
     company_name = models.CharField(max_length=200, blank=True, null=True)
     address = models.TextField(blank=True, null=True)
     company_image = models.ImageField(upload_to='companies/', blank=True, null=True)
+    company_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     
     def __str__(self):
         return f"{self.user.email} - {self.role}"
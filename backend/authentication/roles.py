@@ -0,0 +1,29 @@
+"""
+Per-user cache of UserProfile.role.
+
+Role checks (JobSearchStatsView, the role permissions in core.permissions)
+read only the role, so it is cached on its own instead of loading the whole
+profile, and dropped by the UserProfile signals in signals.py.
+"""
+from django.conf import settings
+
+from core.caching import TieredCache
+
+from .models import UserProfile
+
+
+CACHE_TIMEOUT = getattr(settings, 'ROLE_CACHE_TIMEOUT', 60 * 60)
+
+roles = TieredCache('user_role', UserProfile, timeout=CACHE_TIMEOUT, max_entries=10000)
+
+
+def get_role(user_id):
+    """The user's role, or None when they have no profile"""
+    return roles.get_or_set(
+        user_id, lambda: UserProfile.objects.filter(user_id=user_id).values_list('role', flat=True).first()
+    )
+
+
+def invalidate_role(user_id):
+    roles.delete(user_id)
+
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import OTP, UserProfile
+from core.images import ImageVariantsField
 from django.contrib.auth.password_validation import validate_password
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -87,11 +88,13 @@ class ProfileSerializer(serializers.ModelSerializer):
     education = serializers.CharField(source='userprofile.education', read_only=True)
     experience = serializers.CharField(source='userprofile.experience', read_only=True)
     profile_image = serializers.ImageField(source='userprofile.profile_image', read_only=True)
+    profile_image_variants = ImageVariantsField('profile_image', source='userprofile')
     
     # Company fields
     company_name = serializers.CharField(source='userprofile.company_name', read_only=True)
     address = serializers.CharField(source='userprofile.address', read_only=True)
     company_image = serializers.ImageField(source='userprofile.company_image', read_only=True)
+    company_image_variants = ImageVariantsField('company_image', source='userprofile')
     
     def to_representation(self, instance):
         data = super().to_representation(instance)
@@ -107,7 +110,8 @@ class ProfileSerializer(serializers.ModelSerializer):
                 'role': data['role'],
                 'company_name': data['company_name'],
                 'address': data['address'],
-                'company_image': data['company_image']
+                'company_image': data['company_image'],
+                'company_image_variants': data['company_image_variants']
             }
         else:
             # Return employee/employer fields
@@ -121,14 +125,15 @@ class ProfileSerializer(serializers.ModelSerializer):
                 'skills': data['skills'],
                 'education': data['education'],
                 'experience': data['experience'],
-                'profile_image': data['profile_image']
+                'profile_image': data['profile_image'],
+                'profile_image_variants': data['profile_image_variants']
             }
     
     class Meta:
         model = User
         fields = ('id', 'first_name', 'last_name', 'email', 'role', 'phone_number', 'skills', 
-                 'education', 'experience', 'profile_image', 'company_name', 'address', 
-                 'company_image')
+                 'education', 'experience', 'profile_image', 'profile_image_variants', 'company_name', 'address',
+                 'company_image', 'company_image_variants')
 
 class ProfileUpdateSerializer(serializers.ModelSerializer):
     phone_number = serializers.CharField(required=False)
@@ -0,0 +1,9 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import UserProfile
+from .roles import invalidate_role
+
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def role_changed(sender, instance, **kwargs):
+    invalidate_role(instance.user_id)
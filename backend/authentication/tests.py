@@ -1,3 +1,27 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from .models import UserProfile
+from .roles import get_role, roles
+
+
+class RoleCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        roles.l1.clear()
+        self.user = User.objects.create_user('employer')
+        self.profile = UserProfile.objects.create(user=self.user, role='employer')
+
+    def test_role_is_read_once(self):
+        self.assertEqual(get_role(self.user.id), 'employer')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_role(self.user.id), 'employer')
+
+    def test_profile_changes_drop_the_cached_role(self):
+        self.assertEqual(get_role(self.user.id), 'employer')
+        self.profile.role = 'company'
+        self.profile.save()
+        self.assertEqual(get_role(self.user.id), 'company')
+        self.profile.delete()
+        self.assertIsNone(get_role(self.user.id))
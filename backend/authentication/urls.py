@@ -3,7 +3,7 @@ from rest_framework_simplejwt.views import TokenRefreshView
 from .views import(
     RegisterAPI, VerifyEmailAPI, ResendOTPAPI, LoginAPI,
     ForgotPasswordAPI, VerifyForgotPasswordAPI, ResetPasswordAPI,
-    ChangePasswordAPI, UserProfileAPI
+    ChangePasswordAPI, UserProfileAPI, AccountDeleteAPI
 )
 
 urlpatterns = [
@@ -25,4 +25,7 @@ urlpatterns = [
     # User Profile
     path('profile/', UserProfileAPI.as_view(), name='profile'),
     path('profile/update/', UserProfileAPI.as_view(), name='profile_update'),
+    
+    # Account
+    path('account/', AccountDeleteAPI.as_view(), name='account_delete'),
 ]
\ No newline at end of file
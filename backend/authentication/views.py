@@ -15,6 +15,7 @@ from .serializer import (
 )
 from .models import OTP, UserProfile
 from .utils import send_otp_email, create_otp_for_user
+from core.accounts import request_account_deletion
 
 @method_decorator(csrf_exempt, name='dispatch')
 class RegisterAPI(APIView):
@@ -268,4 +269,23 @@ class UserProfileAPI(APIView):
             return Response({'error': 'Failed to update profile'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
     def patch(self, request):
-        return self.put(request)
\ No newline at end of file
+        return self.put(request)
+
+class AccountDeleteAPI(APIView):
+    """Deactivate the account now and delete its data in the background"""
+    permission_classes = [IsAuthenticated]
+    
+    def delete(self, request):
+        try:
+            password = request.data.get('password')
+            if not password or not request.user.check_password(password):
+                return Response({'error': 'Invalid password'}, status=status.HTTP_400_BAD_REQUEST)
+            
+            deletion = request_account_deletion(request.user)
+            return Response({
+                'message': 'Account deactivated; its data is being deleted',
+                'status': deletion.status,
+                'requested_at': deletion.requested_at,
+            }, status=status.HTTP_202_ACCEPTED)
+        except Exception as e:
+            return Response({'error': 'Account deletion failed'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
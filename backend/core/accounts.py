@@ -0,0 +1,174 @@
+"""
+Chunked account deletion.
+
+user.delete() cascades to jobs, applications, posts, likes, comments,
+follows, OTPs and profiles in one transaction. For an active account that
+locks hot tables for as long as the whole cascade takes. Instead:
+
+- request_account_deletion() deactivates the user, which invalidates their
+  tokens, and hides their jobs and posts. It is a handful of UPDATEs in the
+  request.
+- run_account_deletion() then deletes the dependent rows in a background
+  thread, children before parents. Each chunk of CHUNK_SIZE rows is its own
+  short transaction. Files are queued for core.purge, and the likes_count /
+  comments_count of the posts the user liked or commented on are decreased
+  in bulk. Progress per model is recorded on the AccountDeletion row after
+  every chunk.
+
+A run that stops halfway (restart, crash) is picked up again by
+`manage.py process_account_deletions`. Every step only looks at the rows
+that are still there, so resuming is safe.
+
+Profile posts (profile_app.Post) point at a profile through a generic
+foreign key, which the database cascade does not follow. They are deleted
+explicitly before the profiles.
+"""
+import logging
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import AccountDeletion
+from .purge import MAX_CASCADE_DEPTH, cascade_querysets, queue_purge, referenced_files, start_sweeper
+
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = getattr(settings, 'ACCOUNT_DELETION_CHUNK_SIZE', 500)
+# Seconds to sleep between chunks, to leave room for foreground traffic
+CHUNK_PAUSE = getattr(settings, 'ACCOUNT_DELETION_CHUNK_PAUSE', 0)
+
+# Rows whose deletion must decrease a counter on the row they point at: label -> (foreign key, counter)
+COUNTERS = {
+    'feeds.PostLike': ('post', 'likes_count'),
+    'feeds.PostComment': ('post', 'comments_count'),
+    'profile_app.PostLike': ('post', 'likes_count'),
+    'profile_app.PostComment': ('post', 'comments_count'),
+}
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        # One at a time: deletions are background work and should not compete with each other
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='account-deletion')
+    return _executor
+
+
+def _deletion_order(queryset, depth=0):
+    """queryset's cascade with children before parents, so each step deletes rows nothing references"""
+    if depth < MAX_CASCADE_DEPTH:
+        for related in cascade_querysets(queryset):
+            yield from _deletion_order(related, depth + 1)
+    yield queryset
+
+
+def deletion_steps(user_pk):
+    """Querysets to empty, in order, to delete the account"""
+    from profile_app.models import CompanyProfile, EmployeeProfile, EmployerProfile, Post as ProfilePost
+
+    steps = []
+    for profile_model in (EmployeeProfile, EmployerProfile, CompanyProfile):
+        profile_posts = ProfilePost.objects.filter(
+            content_type=ContentType.objects.get_for_model(profile_model),
+            object_id__in=profile_model.objects.filter(user_id=user_pk).values('pk'),
+        )
+        steps.extend(_deletion_order(profile_posts))
+    steps.extend(_deletion_order(User.objects.filter(pk=user_pk)))
+    return steps
+
+
+def _adjust_counters(model, ids):
+    spec = COUNTERS.get(model._meta.label)
+    if spec is None:
+        return
+    foreign_key, counter = spec
+    per_parent = Counter(model._base_manager.filter(pk__in=ids).values_list(f'{foreign_key}_id', flat=True))
+    by_amount = defaultdict(list)
+    for parent, amount in per_parent.items():
+        by_amount[amount].append(parent)
+    parent_model = model._meta.get_field(foreign_key).related_model
+    # One UPDATE per distinct amount; for likes that is a single UPDATE per chunk
+    for amount, parents in by_amount.items():
+        parent_model._base_manager.filter(pk__in=parents).update(**{counter: Greatest(F(counter) - amount, 0)})
+
+
+def _delete_chunk(model, ids):
+    with transaction.atomic():
+        chunk = model._base_manager.filter(pk__in=ids)
+        queue_purge(referenced_files(chunk))
+        _adjust_counters(model, ids)
+        chunk.delete()
+
+
+def request_account_deletion(user):
+    """Deactivate user and hide their content now; the rows are deleted in the background after commit"""
+    from feeds.models import Post
+    from job_postings.autocomplete import invalidate_autocomplete
+    from job_postings.models import Job
+    from job_postings.recommendations import invalidate_job_recommendations
+
+    with transaction.atomic():
+        deletion, _ = AccountDeletion.objects.update_or_create(
+            user_pk=user.pk, defaults={'username': user.username, 'status': 'pending', 'error': ''}
+        )
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        hidden_jobs = Job.objects.filter(posted_by=user, is_active=True).update(is_active=False)
+        Post.objects.filter(author=user, is_active=True).update(is_active=False)
+    if hidden_jobs:
+        # update() skips the Job signals that keep these fresh
+        invalidate_job_recommendations()
+        invalidate_autocomplete()
+    transaction.on_commit(lambda: get_executor().submit(_run_in_background, deletion.pk))
+    return deletion
+
+
+def run_account_deletion(deletion):
+    deletion.status, deletion.error = 'running', ''
+    deletion.started_at = deletion.started_at or timezone.now()
+    steps = deletion_steps(deletion.user_pk)
+    planned = Counter()
+    for queryset in steps:
+        planned[queryset.model._meta.label] += queryset.order_by().count()
+    # Rows deleted by an earlier, interrupted run are already in progress
+    planned.update(deletion.progress)
+    deletion.planned = {label: count for label, count in planned.items() if count}
+    deletion.save(update_fields=['status', 'error', 'started_at', 'planned', 'updated_at'])
+
+    for queryset in steps:
+        model = queryset.model
+        label = model._meta.label
+        deletion.current_step = label
+        while ids := list(queryset.order_by().values_list('pk', flat=True)[:CHUNK_SIZE]):
+            _delete_chunk(model, ids)
+            deletion.progress[label] = deletion.progress.get(label, 0) + len(ids)
+            deletion.save(update_fields=['progress', 'current_step', 'updated_at'])
+            if CHUNK_PAUSE:
+                time.sleep(CHUNK_PAUSE)
+
+    deletion.status, deletion.current_step, deletion.finished_at = 'done', '', timezone.now()
+    deletion.save(update_fields=['status', 'current_step', 'finished_at', 'updated_at'])
+    start_sweeper()
+    return deletion
+
+
+def _run_in_background(deletion_pk):
+    try:
+        deletion = AccountDeletion.objects.get(pk=deletion_pk)
+        try:
+            run_account_deletion(deletion)
+        except Exception as e:
+            logger.exception('Deleting account %s failed', deletion.user_pk)
+            AccountDeletion.objects.filter(pk=deletion_pk).update(status='failed', error=str(e)[:1000])
+    finally:
+        close_old_connections()
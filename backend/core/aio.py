@@ -0,0 +1,77 @@
+"""
+Helpers for the async (ASGI) read views.
+
+Django's async ORM runs every query on one shared thread, so independent
+queries awaited with asyncio.gather would still execute one after another.
+gather_queries() instead runs each blocking ORM callable in its own worker
+thread, with its own connection, so they really overlap. The request's
+statement timeout applies there too (see core.db.worker_queries).
+"""
+import asyncio
+import math
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import HttpResponse, JsonResponse
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .db import worker_queries
+from .renderers import dumps
+
+
+def _run_query(query):
+    try:
+        with worker_queries():
+            return query()
+    finally:
+        # Worker threads keep their own connections; honour CONN_MAX_AGE/pooling
+        close_old_connections()
+
+
+async def gather_queries(*queries):
+    """Run independent zero-argument ORM callables concurrently"""
+    return await asyncio.gather(
+        *(sync_to_async(_run_query, thread_sensitive=False)(query) for query in queries)
+    )
+
+
+async def authenticate(request):
+    """Resolve the JWT user for an async view, or None when unauthenticated"""
+    try:
+        result = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+def paginated_response(message, total_count, page, page_size, data):
+    return HttpResponse(dumps({
+        'message': message,
+        'count': total_count,
+        'page': page,
+        'page_size': page_size,
+        'total_pages': (total_count + page_size - 1) // page_size,
+        'data': data
+    }), content_type='application/json', status=status.HTTP_200_OK)
+
+
+def unauthorized_response():
+    return JsonResponse({
+        'detail': 'Authentication credentials were not provided.'
+    }, status=status.HTTP_401_UNAUTHORIZED)
+
+
+def throttled_response(wait):
+    """429 with Retry-After, as DRF sends for core.throttling"""
+    seconds = max(1, math.ceil(wait))
+    response = JsonResponse({
+        'detail': f'Request was throttled. Expected available in {seconds} seconds.'
+    }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    response['Retry-After'] = str(seconds)
+    return response
+
+
+def error_response(error, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR):
+    return JsonResponse({'error': str(error)}, status=status_code)
@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+
+    def ready(self):
+        from .db import install_connect_timing, install_request_wrappers
+        from .images import connect_image_signals
+        from .instrumentation import install_serializer_timing
+        install_connect_timing()
+        install_request_wrappers()
+        install_serializer_timing()
+        connect_image_signals()
@@ -0,0 +1,102 @@
+"""
+Per-process write buffers, flushed in batches by a background thread.
+
+Counting something on every request with its own UPDATE makes the counted
+row a hot spot and puts a write on the request path. A WriteBuffer instead
+collects changes in memory and writes them every `interval` seconds, and
+once more at exit. With interval=None nothing is flushed unless flush() is
+called, as in tests. Subclasses say what an empty buffer is and how to write
+a full one:
+
+    class Hits(WriteBuffer):
+        def empty(self):
+            return Counter()
+
+        def add(self, key):
+            with self.lock:
+                self.pending[key] += 1
+
+        def write(self, pending):
+            ...  # one batched statement
+
+    hits = ProcessLocal(lambda: Hits(interval=5))
+    hits.get().add(key)
+
+What a process has not flushed is lost if it is killed, so buffer only what
+may be approximate. A failed write is logged and dropped rather than
+retried, so a broken database cannot grow the buffer without bound.
+"""
+import atexit
+import logging
+import os
+import threading
+
+from django.db import close_old_connections
+
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBuffer:
+    def __init__(self, interval=None, name='write-buffer'):
+        self.pid = os.getpid()
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.pending = self.empty()
+        self.flushes = self.failures = 0
+        if interval is not None:
+            threading.Thread(target=self._run, daemon=True, name=name).start()
+            atexit.register(self.close)
+
+    def empty(self):
+        raise NotImplementedError
+
+    def write(self, pending):
+        raise NotImplementedError
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, self.empty()
+        if pending:
+            self.write(pending)
+            self.flushes += 1
+
+    def _run(self):
+        stop = threading.Event()
+        while not stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception:
+                self.failures += 1
+                logger.exception('Flushing %s failed; its changes are dropped', type(self).__name__)
+            finally:
+                close_old_connections()
+
+    def close(self):
+        # atexit handlers are inherited by forked children too
+        if os.getpid() == self.pid:
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Flushing %s at exit failed', type(self).__name__)
+
+    def snapshot(self):
+        return {'pending': len(self.pending), 'flushes': self.flushes, 'failures': self.failures}
+
+
+class ProcessLocal:
+    """One factory() per process, created on first use and again after a fork"""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.instance = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        instance = self.instance
+        if instance is None or instance.pid != os.getpid():
+            with self.lock:
+                if self.instance is None or self.instance.pid != os.getpid():
+                    self.instance = self.factory()
+                instance = self.instance
+        return instance
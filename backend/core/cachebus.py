@@ -0,0 +1,208 @@
+"""
+Invalidation messages between worker processes, for core.caching.
+
+CACHE_BUS_URL selects the transport:
+
+    ''                          this process only (runserver, tests)
+    unix:///run/job_portal/bus  one datagram socket per process in that
+                                directory; publishing sends to all of them.
+                                No server needed, but only reaches processes
+                                on the same host.
+    redis://host:6379/0         Redis pub/sub (needs the redis package)
+
+Messages are small JSON dicts. Delivery is best effort: a process that
+misses one serves its L1 copy until the L1 TTL runs out, which bounds how
+stale any entry can get. A Redis subscriber that reconnects clears its L1,
+since it may have missed messages.
+"""
+import atexit
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import suppress
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'cache-invalidation'
+MAX_MESSAGE_BYTES = 65000
+
+# Called with every message, from this process or another
+handlers = []
+
+_lock = threading.Lock()
+_bus = None
+
+
+class Bus:
+    """In-process bus: publishing only reaches this process's handlers"""
+    transport = 'local'
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.origin = uuid.uuid4().hex
+        self.published = self.received = self.dropped = 0
+
+    def publish(self, message, local=True):
+        """Send message to every process; local=False skips this process's handlers"""
+        if local:
+            dispatch(message)
+        self.published += 1
+        self.send(json.dumps({**message, 'origin': self.origin}).encode())
+
+    def send(self, payload):
+        pass
+
+    def receive(self, payload):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning('Ignoring malformed cache bus message')
+            return
+        if message.pop('origin', None) != self.origin:
+            self.received += 1
+            dispatch(message)
+
+    def release(self):
+        """Drop what a forked child inherited, leaving it to the parent"""
+
+    def close(self):
+        pass
+
+    def snapshot(self):
+        return {
+            'transport': self.transport,
+            'published': self.published,
+            'received': self.received,
+            'dropped': self.dropped,
+        }
+
+
+class SocketBus(Bus):
+    """Datagram sockets in a shared directory, one per process"""
+    transport = 'unix'
+
+    def __init__(self, directory):
+        super().__init__()
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, f'{self.pid}-{self.origin[:8]}.sock')
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.socket.bind(self.path)
+        # Never block a request on a receiver whose queue is full
+        self.sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sender.setblocking(False)
+        threading.Thread(target=self._listen, daemon=True, name='cache-bus').start()
+        atexit.register(self.close)
+
+    def send(self, payload):
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if path == self.path or not name.endswith('.sock'):
+                continue
+            try:
+                self.sender.sendto(payload, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Left behind by a process that is gone
+                with suppress(OSError):
+                    os.unlink(path)
+            except OSError:
+                self.dropped += 1
+                logger.warning('Cache bus message to %s dropped', name)
+
+    def _listen(self):
+        while True:
+            try:
+                payload = self.socket.recv(MAX_MESSAGE_BYTES)
+            except OSError:
+                return
+            self.receive(payload)
+
+    def release(self):
+        self.socket.close()
+        self.sender.close()
+
+    def close(self):
+        # atexit handlers are inherited by forked children too
+        if os.getpid() == self.pid:
+            self.release()
+            with suppress(OSError):
+                os.unlink(self.path)
+
+
+class RedisBus(Bus):
+    transport = 'redis'
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImproperlyConfigured('A redis:// CACHE_BUS_URL needs the redis package') from e
+        super().__init__()
+        self.client = redis.Redis.from_url(url)
+        threading.Thread(target=self._listen, daemon=True, name='cache-bus').start()
+
+    def send(self, payload):
+        try:
+            self.client.publish(CHANNEL, payload)
+        except Exception:
+            self.dropped += 1
+            logger.warning('Cache bus publish failed', exc_info=True)
+
+    def _listen(self):
+        connected_before = False
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                if connected_before:
+                    dispatch({'reset': True})
+                connected_before = True
+                for item in pubsub.listen():
+                    self.receive(item['data'])
+            except Exception:
+                logger.warning('Cache bus subscription lost; reconnecting', exc_info=True)
+                time.sleep(1)
+
+
+def create_bus(url):
+    if not url:
+        return Bus()
+    if url.startswith('unix://'):
+        return SocketBus(url[len('unix://'):])
+    if url.startswith(('redis://', 'rediss://')):
+        return RedisBus(url)
+    raise ImproperlyConfigured(f'Unsupported CACHE_BUS_URL {url!r}')
+
+
+def dispatch(message):
+    for handler in handlers:
+        try:
+            handler(message)
+        except Exception:
+            logger.exception('Cache bus handler failed')
+
+
+def get_bus():
+    """This process's bus, created on first use and again after a fork"""
+    global _bus
+    bus = _bus
+    if bus is None or bus.pid != os.getpid():
+        with _lock:
+            if _bus is None or _bus.pid != os.getpid():
+                if _bus is not None:
+                    _bus.release()
+                _bus = create_bus(getattr(settings, 'CACHE_BUS_URL', ''))
+            bus = _bus
+    return bus
+
+
+def publish(message, local=True):
+    get_bus().publish(message, local)
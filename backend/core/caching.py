@@ -0,0 +1,253 @@
+"""
+Two-level caching for the apps' read paths.
+
+A TieredCache keeps a bounded per-process LRU with a TTL (L1) in front of
+the shared Django cache (L2). Every key embeds the version of the model
+type it is derived from:
+
+    roles = TieredCache('user_role', 'authentication.UserProfile')
+    role = roles.get_or_set(user_id, lambda: load_role(user_id))
+    roles.delete(user_id)                       # one entry, every process
+    versions.bump('authentication.UserProfile') # every entry of that model
+
+set() and delete() broadcast the changed keys over core.cachebus, so other
+processes drop their L1 copies; a version bump is broadcast the same way.
+Without a cross-process bus, the L1 TTL (CACHE_L1_TTL) bounds how stale
+another process can be. When L2 is the per-process memory cache (no
+REDIS_URL), received invalidations are applied to it as well. Values are shared by all callers in a process and
+must be treated as read-only.
+
+Hit ratios, evictions and expirations per cache are reported by
+/metrics/cache/.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from . import cachebus
+
+
+L1_MAX_ENTRIES = getattr(settings, 'CACHE_L1_MAX_ENTRIES', 10000)
+L1_TTL = getattr(settings, 'CACHE_L1_TTL', 30)
+# Keys per invalidation message
+BROADCAST_BATCH = 500
+MISSING = object()
+
+# name -> TieredCache, for the bus handler and metrics
+tiered_caches = {}
+
+
+class LRUCache:
+    """Thread-safe LRU with a TTL per entry"""
+
+    def __init__(self, max_entries=L1_MAX_ENTRIES, ttl=L1_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.evictions = self.expirations = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                self.expirations += 1
+                return MISSING
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def process_local(backend):
+    """Whether backend is per process, so other processes' changes must be applied to it too"""
+    return isinstance(backend, LocMemCache)
+
+
+def model_label(model):
+    return model if isinstance(model, str) else model._meta.label
+
+
+class ModelVersions:
+    """Version number per model label, kept in L2; bumping one makes every key built on it stale"""
+
+    def __init__(self):
+        self.local = LRUCache(max_entries=1000)
+
+    def _key(self, label):
+        return f'cache_version:{label}'
+
+    def get(self, model):
+        label = model_label(model)
+        version = self.local.get(label)
+        if version is MISSING:
+            version = caches['default'].get_or_set(self._key(label), 1, None)
+            self.local.set(label, version)
+        return version
+
+    def bump(self, model):
+        label = model_label(model)
+        try:
+            version = caches['default'].incr(self._key(label))
+        except ValueError:
+            version = 2
+            caches['default'].set(self._key(label), version, None)
+        cachebus.publish({'version': label, 'value': version})
+        return version
+
+    def receive(self, label, version):
+        # Messages can overtake each other; versions only move forward
+        if version > self.get(label):
+            self.local.set(label, version)
+            if process_local(caches['default']):
+                caches['default'].set(self._key(label), version, None)
+
+
+versions = ModelVersions()
+
+
+class TieredCache:
+    """Per-process L1 in front of the shared cache, for values derived from one model type"""
+
+    def __init__(self, name, model, timeout=None, max_entries=L1_MAX_ENTRIES, ttl=L1_TTL, alias='default'):
+        if name in tiered_caches:
+            raise ValueError(f'A TieredCache named {name!r} already exists')
+        self.name = name
+        self.model = model_label(model)
+        self.timeout = timeout
+        self.alias = alias
+        self.l1 = LRUCache(max_entries, min(ttl, timeout) if timeout else ttl)
+        self.l1_hits = self.l2_hits = self.misses = self.sets = self.invalidations = 0
+        tiered_caches[name] = self
+
+    @property
+    def l2(self):
+        return caches[self.alias]
+
+    def make_key(self, key):
+        return f'{self.name}:v{versions.get(self.model)}:{key}'
+
+    def get(self, key, default=None):
+        cachebus.get_bus()
+        full_key = self.make_key(key)
+        value = self.l1.get(full_key)
+        if value is not MISSING:
+            self.l1_hits += 1
+            return value
+        value = self.l2.get(full_key, MISSING)
+        if value is MISSING:
+            self.misses += 1
+            return default
+        self.l2_hits += 1
+        self.l1.set(full_key, value)
+        return value
+
+    def get_or_set(self, key, compute):
+        """Cached value for key, computing and storing it on a miss (not broadcast: no process had it)"""
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = compute()
+            full_key = self.make_key(key)
+            self.l2.set(full_key, value, self.timeout)
+            self.l1.set(full_key, value)
+            self.sets += 1
+        return value
+
+    def set(self, key, value):
+        self.set_many({key: value})
+
+    def set_many(self, values):
+        full_values = {self.make_key(key): value for key, value in values.items()}
+        self.l2.set_many(full_values, self.timeout)
+        for full_key, value in full_values.items():
+            self.l1.set(full_key, value)
+        self.sets += len(full_values)
+        # This process already holds the new values
+        self._broadcast(list(full_values), local=False)
+
+    def delete(self, key):
+        self.delete_many([key])
+
+    def delete_many(self, keys):
+        full_keys = [self.make_key(key) for key in keys]
+        self.l2.delete_many(full_keys)
+        self._broadcast(full_keys)
+
+    def invalidate_all(self):
+        """Stale every entry of this cache, and of every other cache on the same model"""
+        versions.bump(self.model)
+
+    def _broadcast(self, full_keys, local=True):
+        for start in range(0, len(full_keys), BROADCAST_BATCH):
+            cachebus.publish({'cache': self.name, 'keys': full_keys[start:start + BROADCAST_BATCH]}, local)
+
+    def receive(self, full_keys):
+        self.invalidations += len(full_keys)
+        for full_key in full_keys:
+            self.l1.delete(full_key)
+        if process_local(self.l2):
+            self.l2.delete_many(full_keys)
+
+    def snapshot(self):
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        return {
+            'model': self.model,
+            'version': versions.get(self.model),
+            'l1_entries': len(self.l1),
+            'l1_max_entries': self.l1.max_entries,
+            'l1_hits': self.l1_hits,
+            'l2_hits': self.l2_hits,
+            'misses': self.misses,
+            'hit_ratio': round((self.l1_hits + self.l2_hits) / lookups, 4) if lookups else None,
+            'l1_hit_ratio': round(self.l1_hits / lookups, 4) if lookups else None,
+            'sets': self.sets,
+            'evictions': self.l1.evictions,
+            'expirations': self.l1.expirations,
+            'invalidations': self.invalidations,
+        }
+
+
+def handle_message(message):
+    if message.get('reset'):
+        versions.local.clear()
+        for tiered in tiered_caches.values():
+            tiered.l1.clear()
+    elif 'version' in message:
+        versions.receive(message['version'], message['value'])
+    elif message.get('cache') in tiered_caches:
+        tiered_caches[message['cache']].receive(message['keys'])
+
+
+cachebus.handlers.append(handle_message)
+
+
+def cache_metrics():
+    return {
+        'bus': cachebus.get_bus().snapshot(),
+        'caches': {name: tiered.snapshot() for name, tiered in sorted(tiered_caches.items())},
+    }
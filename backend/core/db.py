@@ -0,0 +1,203 @@
+"""
+Database connection helpers: per-endpoint statement timeouts, connection
+checkout metrics, and execute wrappers scoped to a request.
+
+wrap_request_queries(wrapper) passes the queries of the current request
+through an execute wrapper. Every connection carries one dispatcher (see
+install_request_wrappers()) that applies the wrappers in a context
+variable, so they follow the request into the threads that inherit its
+context: sync_to_async() threads, the workers core.aio.gather_queries()
+runs queries on, and a streamed body produced after the middleware
+returned (see wrap_streamed_queries()). A wrapper may define
+release(connection), to undo what it did to a connection once a thread is
+done with the request (see worker_queries() and release_request_queries()).
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from functools import partial, reduce
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+
+class ConnectionMetrics:
+    """
+    Process-wide counters for connection checkouts and new connections. A
+    checkout is a request's first query on a connection; it costs the time
+    to connect (or take a connection from the pool) when the connection
+    was not open already, and nothing when it was.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_seconds = 0.0
+            self.max_checkout_seconds = 0.0
+            self.connections_created = 0
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+
+    def record_connection(self, seconds):
+        with self._lock:
+            self.connections_created += 1
+            self.checkout_seconds += seconds
+            self.max_checkout_seconds = max(self.max_checkout_seconds, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'connections_created': self.connections_created,
+                'avg_checkout_ms': round(self.checkout_seconds * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                'max_checkout_ms': round(self.max_checkout_seconds * 1000, 3),
+                'reuse_ratio': round(1 - self.connections_created / self.checkouts, 4) if self.checkouts else 0.0,
+            }
+
+
+connection_metrics = ConnectionMetrics()
+
+
+def install_connect_timing():
+    """Time every new database connection (or pool checkout) into connection_metrics"""
+    connect = BaseDatabaseWrapper.connect
+    if getattr(connect, 'instrumented', False):
+        return
+
+    def timed_connect(self):
+        start = time.perf_counter()
+        try:
+            return connect(self)
+        finally:
+            connection_metrics.record_connection(time.perf_counter() - start)
+
+    timed_connect.instrumented = True
+    BaseDatabaseWrapper.connect = timed_connect
+
+
+_request_wrappers = ContextVar('request_execute_wrappers', default=())
+_DONE = object()
+
+
+def _request_queries(execute, sql, params, many, context):
+    """On every connection: pass the query through the current request's wrappers"""
+    wrappers = _request_wrappers.get()
+    if wrappers:
+        # Nested as Django nests execute_wrappers: the last one outermost
+        execute = reduce(lambda inner, wrapper: partial(wrapper, inner), wrappers, execute)
+    return execute(sql, params, many, context)
+
+
+def install_request_wrappers():
+    """Give every database connection the dispatcher for request-scoped wrappers"""
+    init = BaseDatabaseWrapper.__init__
+    if getattr(init, 'instrumented', False):
+        return
+
+    def wrapped_init(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        self.execute_wrappers.append(_request_queries)
+
+    wrapped_init.instrumented = True
+    BaseDatabaseWrapper.__init__ = wrapped_init
+    # Apps loaded earlier may have created this thread's connections already
+    for connection in connections.all(initialized_only=True):
+        connection.execute_wrappers.append(_request_queries)
+
+
+def release_request_queries(wrappers=None):
+    """Let the request's wrappers undo what they did to this thread's connections"""
+    for wrapper in _request_wrappers.get() if wrappers is None else wrappers:
+        if hasattr(wrapper, 'release'):
+            for connection in connections.all(initialized_only=True):
+                wrapper.release(connection)
+
+
+@contextmanager
+def wrap_request_queries(wrapper):
+    """Pass the current request's queries through wrapper, in every thread that inherits its context"""
+    token = _request_wrappers.set(_request_wrappers.get() + (wrapper,))
+    try:
+        yield
+    finally:
+        _request_wrappers.reset(token)
+        release_request_queries((wrapper,))
+
+
+@contextmanager
+def worker_queries():
+    """In a thread that runs queries for a request, release the request's wrappers afterwards"""
+    try:
+        yield
+    finally:
+        release_request_queries()
+
+
+def wrap_streamed_queries(response, wrapper):
+    """Pass the queries of a streamed response's body through wrapper too"""
+    if not response.streaming or response.is_async:
+        return
+    content = iter(response.streaming_content)
+    # The body is produced after the request's scope ended, so in a copy of it
+    context = copy_context()
+    context.run(_request_wrappers.set, _request_wrappers.get() + (wrapper,))
+
+    def scoped():
+        try:
+            while (chunk := context.run(next, content, _DONE)) is not _DONE:
+                yield chunk
+        finally:
+            context.run(release_request_queries, (wrapper,))
+
+    response.streaming_content = scoped()
+
+
+def get_statement_timeout(timeout_class):
+    """Return the configured timeout in ms for an endpoint class, or None"""
+    if not timeout_class:
+        return None
+    return getattr(settings, 'DATABASE_STATEMENT_TIMEOUTS', {}).get(timeout_class)
+
+
+class RequestConnections:
+    """
+    Execute wrapper that checks out each connection on the request's first
+    query through it, and applies the endpoint's statement timeout there.
+    Requests that run no query never touch a connection.
+    """
+
+    def __init__(self, timeout_ms=None):
+        self.timeout_ms = timeout_ms
+        self.lock = threading.Lock()
+        # Connection objects are per thread, so worker threads add their own;
+        # connection -> whether the timeout was set on it
+        self.checked_out = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        connection = context['connection']
+        if connection not in self.checked_out:
+            connection_metrics.record_checkout()
+            timed_out = bool(self.timeout_ms) and connection.vendor == 'postgresql'
+            if timed_out:
+                # On the driver's cursor, so the SET is not one of the request's queries
+                with connection.connection.cursor() as cursor:
+                    cursor.execute(f'SET statement_timeout = {int(self.timeout_ms)}')
+            with self.lock:
+                self.checked_out[connection] = timed_out
+        return execute(sql, params, many, context)
+
+    def release(self, connection):
+        """Restore the server default before the connection is reused"""
+        with self.lock:
+            timed_out = self.checked_out.pop(connection, False)
+        if timed_out and connection.connection is not None:
+            with connection.connection.cursor() as cursor:
+                cursor.execute('RESET statement_timeout')
@@ -0,0 +1,203 @@
+"""
+Resized variants of uploaded images.
+
+Feeds and profiles used to hand every client the original upload, often
+several megabytes, even where a 320px thumbnail is shown. Each image field
+in IMAGE_FIELDS now has a JSONField next to it, named `<field>_variants`,
+which records the original's dimensions and one WebP file per entry in
+VARIANT_SIZES (longest edge in pixels, never upscaled):
+
+    {"source": "posts/2024/05/a.jpg", "width": 4032, "height": 3024,
+     "sizes": {"thumbnail": {"name": "posts/2024/05/variants/a_thumbnail.webp",
+                             "width": 320, "height": 240}, ...}}
+
+The variants are written next to the original through the same storage.
+They are generated off the request path: saving a model whose image
+changed queues the work, after commit, on a small thread pool. Pillow
+releases the GIL while decoding, resizing and encoding, so the threads run
+in parallel. Until the variants exist, and whenever "source" no longer
+matches the image, ImageVariantsField returns None and clients use the
+original. `manage.py generate_image_variants` backfills existing rows.
+"""
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_save
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+from .uploads import delete_files
+
+
+logger = logging.getLogger(__name__)
+
+# (model label, image field); each model has a `<field>_variants` JSONField
+IMAGE_FIELDS = (
+    ('feeds.PostImage', 'image'),
+    ('profile_app.Post', 'image'),
+    ('authentication.UserProfile', 'profile_image'),
+    ('authentication.UserProfile', 'company_image'),
+    ('profile_app.EmployeeProfile', 'profile_image'),
+    ('profile_app.EmployerProfile', 'profile_image'),
+    ('profile_app.CompanyProfile', 'company_logo'),
+    ('profile_app.CompanyProfile', 'cover_image'),
+)
+
+VARIANT_SIZES = getattr(settings, 'IMAGE_VARIANT_SIZES', {'thumbnail': 320, 'medium': 768, 'large': 1600})
+VARIANT_QUALITY = getattr(settings, 'IMAGE_VARIANT_QUALITY', 80)
+IMAGE_WORKERS = getattr(settings, 'IMAGE_WORKERS', 2)
+ORIENTATION_TAG = 0x0112
+
+_executor = None
+
+
+def variants_field(field_name):
+    return f'{field_name}_variants'
+
+
+def _variant_name(source, size):
+    directory, filename = posixpath.split(source)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, 'variants', f'{stem}_{size}.webp')
+
+
+def _open(storage, name):
+    with storage.open(name, 'rb') as f:
+        image = Image.open(f)
+        width, height = image.size
+        # EXIF orientations 5-8 are rotated by 90 degrees when displayed
+        if image.getexif().get(ORIENTATION_TAG) in (5, 6, 7, 8):
+            width, height = height, width
+        # JPEG can decode straight at a reduced scale no smaller than the largest variant
+        largest = max(VARIANT_SIZES.values())
+        image.draft(image.mode, (largest, largest))
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        has_alpha = image.mode in ('LA', 'PA') or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    return image, width, height
+
+
+def generate_variants(field_file):
+    """Write the variants of an image file and return the `<field>_variants` value"""
+    storage, source = field_file.storage, field_file.name
+    image, width, height = _open(storage, source)
+    sizes, previous = {}, None
+    for size, edge in sorted(VARIANT_SIZES.items(), key=lambda item: item[1]):
+        # Past the original's size every larger variant would be the same file
+        if previous and max(previous['width'], previous['height']) >= max(width, height):
+            sizes[size] = previous
+            continue
+        variant = image.copy()
+        variant.thumbnail((edge, edge), Image.LANCZOS)
+        buffer = BytesIO()
+        variant.save(buffer, 'WEBP', quality=VARIANT_QUALITY, method=4)
+        name = storage.save(_variant_name(source, size), ContentFile(buffer.getvalue()))
+        sizes[size] = previous = {'name': name, 'width': variant.width, 'height': variant.height}
+    return {'source': source, 'width': width, 'height': height, 'sizes': sizes}
+
+
+def variant_names(variants):
+    return {entry['name'] for entry in (variants or {}).get('sizes', {}).values()}
+
+
+def process_image(model, pk, field_name, force=False):
+    """Generate the variants of one row's image, unless they are current or the image changed meanwhile"""
+    column = variants_field(field_name)
+    row = model._default_manager.filter(pk=pk).values(field_name, column).first()
+    if not row or not row[field_name]:
+        return None
+    old = row[column] or {}
+    if old.get('source') == row[field_name] and not force:
+        return old
+    field = model._meta.get_field(field_name)
+    field_file = field.attr_class(None, field, row[field_name])
+    variants = generate_variants(field_file)
+    storage = field_file.storage
+    # Only if the row still points at the image the variants were made from
+    updated = model._default_manager.filter(pk=pk, **{field_name: row[field_name]}).update(**{column: variants})
+    if updated:
+        delete_files(storage, variant_names(old) - variant_names(variants))
+        return variants
+    delete_files(storage, variant_names(variants))
+    return None
+
+
+def _process_in_background(label, pk, field_name):
+    try:
+        process_image(apps.get_model(label), pk, field_name)
+    except Exception:
+        logger.exception('Generating image variants failed for %s %s.%s', label, pk, field_name)
+    finally:
+        close_old_connections()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix='image-variants')
+    return _executor
+
+
+def schedule_variants(instance, field_name):
+    """Queue variant generation for after the current transaction commits"""
+    label, pk = instance._meta.label, instance.pk
+    transaction.on_commit(lambda: get_executor().submit(_process_in_background, label, pk, field_name))
+
+
+def _image_saved(sender, instance, update_fields=None, **kwargs):
+    for label, field_name in IMAGE_FIELDS:
+        if label != sender._meta.label:
+            continue
+        if update_fields is not None and field_name not in update_fields:
+            continue
+        name = getattr(instance, field_name).name
+        if name and (getattr(instance, variants_field(field_name)) or {}).get('source') != name:
+            schedule_variants(instance, field_name)
+
+
+def connect_image_signals():
+    for label in {label for label, _ in IMAGE_FIELDS}:
+        post_save.connect(_image_saved, sender=apps.get_model(label), dispatch_uid=f'image_variants:{label}')
+
+
+def variant_map(field_file, variants, request=None):
+    """
+    {"width", "height", "sizes": {size: {"url", "width", "height"}}, "srcset"}
+    for an image, or None while its variants are missing or stale.
+    """
+    if not field_file or not variants or variants.get('source') != field_file.name:
+        return None
+    storage, sizes, srcset = field_file.storage, {}, []
+    for size, entry in variants['sizes'].items():
+        url = storage.url(entry['name'])
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        sizes[size] = {'url': url, 'width': entry['width'], 'height': entry['height']}
+        candidate = f"{url} {entry['width']}w"
+        if candidate not in srcset:
+            srcset.append(candidate)
+    return {'width': variants['width'], 'height': variants['height'], 'sizes': sizes, 'srcset': ', '.join(srcset)}
+
+
+class ImageVariantsField(serializers.Field):
+    """Read-only variant map of an image field, e.g. `image_variants = ImageVariantsField('image')`"""
+
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        kwargs['read_only'] = True
+        kwargs.setdefault('source', '*')
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        return variant_map(
+            getattr(instance, self.image_field), getattr(instance, variants_field(self.image_field)),
+            self.context.get('request')
+        )
@@ -0,0 +1,220 @@
+"""
+Per-request instrumentation: SQL query count and time, serializer time,
+render time and response size.
+
+RequestInstrumentationMiddleware collects the numbers for each request,
+reports them in a `Server-Timing` header and aggregates them per URL name
+in `request_metrics` (served by core.views.RequestMetricsAPI). Views can
+declare a query budget, e.g.
+
+    class JobListAPI(APIView):
+        query_budget = 3
+
+or settings.QUERY_BUDGETS can map URL names to budgets. With
+QUERY_BUDGET_ENFORCE on (as in test runs), a request that goes over its
+budget raises QueryBudgetExceeded; otherwise it is logged as a warning.
+
+Queries count wherever the request runs them: in its own thread, in
+core.aio.gather_queries() workers and in a streamed body (see
+core.db.wrap_request_queries). A streamed body is produced after the
+headers are sent, so its queries are in the aggregates and the budget
+check, made once the body is sent, but not in its Server-Timing header.
+"""
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from rest_framework.serializers import BaseSerializer
+
+from .db import wrap_request_queries
+
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view ran more SQL queries than its query budget allows"""
+
+
+class RequestTimings:
+    """Numbers collected while handling one request"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.render_seconds = 0.0
+        self.render_start = None
+        self.serializing = False
+        # Query workers add to the SQL numbers concurrently
+        self.lock = threading.Lock()
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.queries += 1
+                self.sql_seconds += elapsed
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+
+_current = ContextVar('request_timings', default=None)
+
+
+@contextmanager
+def measure_serializer():
+    """Add the time spent in the block to the current request's serializer time"""
+    timings = _current.get()
+    if timings is None or timings.serializing:
+        yield
+        return
+    timings.serializing = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.serializer_seconds += time.perf_counter() - start
+        timings.serializing = False
+
+
+def install_serializer_timing():
+    """Time every DRF serializer's `.data` (nested serializers count once)"""
+    data = BaseSerializer.data
+    if getattr(data.fget, 'instrumented', False):
+        return
+
+    def timed_data(self):
+        with measure_serializer():
+            return data.fget(self)
+
+    timed_data.instrumented = True
+    BaseSerializer.data = property(timed_data)
+
+
+class Histogram:
+    """Fixed-bucket histogram; the last bucket counts values above every bound"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def snapshot(self):
+        buckets = {f'le_{bound}': count for bound, count in zip(self.bounds, self.counts)}
+        buckets['inf'] = self.counts[-1]
+        return buckets
+
+
+class EndpointMetrics:
+
+    def __init__(self):
+        self.requests = 0
+        self.budget_exceeded = 0
+        self.max_queries = 0
+        self.sql_ms = 0.0
+        self.serializer_ms = 0.0
+        self.render_ms = 0.0
+        self.response_bytes = 0
+        self.duration = Histogram(DURATION_BUCKETS_MS)
+        self.query_count = Histogram(QUERY_COUNT_BUCKETS)
+
+    def snapshot(self):
+        requests = self.requests or 1
+        return {
+            'requests': self.requests,
+            'avg_ms': round(self.duration.total / requests, 3),
+            'avg_queries': round(self.query_count.total / requests, 2),
+            'max_queries': self.max_queries,
+            'avg_sql_ms': round(self.sql_ms / requests, 3),
+            'avg_serializer_ms': round(self.serializer_ms / requests, 3),
+            'avg_render_ms': round(self.render_ms / requests, 3),
+            'avg_response_bytes': round(self.response_bytes / requests),
+            'budget_exceeded': self.budget_exceeded,
+            'duration_ms': self.duration.snapshot(),
+            'queries': self.query_count.snapshot(),
+        }
+
+
+class RequestMetrics:
+    """Process-wide per-URL-name aggregates"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = {}
+
+    def record(self, name, timings, duration_seconds, response_bytes, over_budget):
+        with self._lock:
+            metrics = self.endpoints.get(name)
+            if metrics is None:
+                metrics = self.endpoints[name] = EndpointMetrics()
+            metrics.requests += 1
+            metrics.budget_exceeded += int(over_budget)
+            metrics.max_queries = max(metrics.max_queries, timings.queries)
+            metrics.sql_ms += timings.sql_seconds * 1000
+            metrics.serializer_ms += timings.serializer_seconds * 1000
+            metrics.render_ms += timings.render_seconds * 1000
+            metrics.response_bytes += response_bytes
+            metrics.duration.observe(duration_seconds * 1000)
+            metrics.query_count.observe(timings.queries)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: metrics.snapshot() for name, metrics in sorted(self.endpoints.items())}
+
+
+request_metrics = RequestMetrics()
+
+
+def get_query_budget(url_name, view_class):
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    if url_name in budgets:
+        return budgets[url_name]
+    return getattr(view_class, 'query_budget', None)
+
+
+def server_timing_header(timings, duration_seconds):
+    return ', '.join([
+        f'db;dur={timings.sql_seconds * 1000:.2f};desc="{timings.queries} queries"',
+        f'serializer;dur={timings.serializer_seconds * 1000:.2f}',
+        f'render;dur={timings.render_seconds * 1000:.2f}',
+        f'total;dur={duration_seconds * 1000:.2f}',
+    ])
+
+
+def response_size(response):
+    if response.streaming:
+        return 0
+    return len(response.content)
+
+
+@contextmanager
+def collect_timings():
+    """Record the SQL of the current request, on every connection and query worker, into a new RequestTimings"""
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        with wrap_request_queries(timings.sql_wrapper):
+            yield timings
+    finally:
+        _current.reset(token)
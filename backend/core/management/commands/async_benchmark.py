@@ -0,0 +1,97 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test import AsyncClient, Client
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from job_postings.models import Job
+
+
+# (name, WSGI/sync URL, ASGI/async URL)
+ENDPOINTS = [
+    ('job search', '/jobs/advanced-search/', '/jobs/async/advanced-search/'),
+    ('job detail', '/jobs/detail/{job_id}/', '/jobs/async/detail/{job_id}/'),
+    ('feed', '/feeds/feed/', '/feeds/async/feed/'),
+    ('followers', '/relationships/followers/', '/relationships/async/followers/'),
+]
+
+
+def _summary(latencies, elapsed, errors):
+    latencies = sorted(latencies)
+    return {
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies) * 1000, 2),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        'errors': errors,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compare throughput of the sync (WSGI) views and their async (ASGI) variants under concurrent load'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint and mode')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--user-email', help='User to authenticate as (defaults to the first active user)')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True)
+        if options['user_email']:
+            users = users.filter(email=options['user_email'])
+        user = users.first()
+        job = Job.objects.filter(is_active=True).first()
+        if user is None or job is None:
+            raise CommandError('Needs at least one active user and one active job (see seed_benchmark_data)')
+
+        headers = {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+        # The test clients always send Host: testserver
+        if 'testserver' not in settings.ALLOWED_HOSTS:
+            settings.ALLOWED_HOSTS.append('testserver')
+        total, concurrency = options['requests'], options['concurrency']
+
+        self.stdout.write(f"{'endpoint':<12}{'mode':<6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'errors':>8}")
+        for name, sync_url, async_url in ENDPOINTS:
+            sync_url, async_url = sync_url.format(job_id=job.id), async_url.format(job_id=job.id)
+            for mode, result in (
+                ('wsgi', self.run_sync(sync_url, headers, total, concurrency)),
+                ('asgi', asyncio.run(self.run_async(async_url, headers, total, concurrency))),
+            ):
+                self.stdout.write(
+                    f"{name:<12}{mode:<6}{result['requests_per_second']:>9}{result['p50_ms']:>9}"
+                    f"{result['p95_ms']:>9}{result['errors']:>8}"
+                )
+
+    def run_sync(self, url, headers, total, concurrency):
+        def request(_):
+            client = Client()
+            start = time.perf_counter()
+            response = client.get(url, headers=headers)
+            close_old_connections()
+            return time.perf_counter() - start, response.status_code >= 400
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(request, range(total)))
+        elapsed = time.perf_counter() - start
+        return _summary([r[0] for r in results], elapsed, sum(r[1] for r in results))
+
+    async def run_async(self, url, headers, total, concurrency):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def request():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(url, headers=headers)
+                return time.perf_counter() - start, response.status_code >= 400
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(request() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+        return _summary([r[0] for r in results], elapsed, sum(r[1] for r in results))
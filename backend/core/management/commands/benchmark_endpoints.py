@@ -0,0 +1,173 @@
+import json
+import resource
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.instrumentation import collect_timings
+from feeds.models import Post, PostComment, PostImage, PostLike
+from job_postings.models import Job, JobApplication
+from relationships.models import Follow
+
+
+# (name, URL, user the request is made as)
+ENDPOINTS = [
+    ('job_search', '/jobs/advanced-search/?search=python&location=bangalore&sort_by=-salary_max', 'employee'),
+    ('job_search_broad', '/jobs/advanced-search/?job_type=full_time&page=5', 'employee'),
+    ('job_list_optimized', '/jobs/?search=engineer&ordering=-created_at', 'employee'),
+    ('job_list', '/jobs/list/?skills=django,react', 'employee'),
+    ('available_jobs', '/jobs/available/', 'employee'),
+    ('recommended_jobs', '/jobs/recommended/', 'employee'),
+    ('job_stats', '/jobs/stats/', 'employee'),
+    ('job_autocomplete', '/jobs/autocomplete/?q=dev', 'employee'),
+    ('applications_received', '/jobs/applications-received/', 'employer'),
+    ('applications_ranked', '/jobs/applications-received/?sort_by=-match_score', 'employer'),
+    ('post_feed', '/feeds/feed/', 'employee'),
+    ('all_posts', '/feeds/all-posts/', 'employee'),
+    ('followers', '/relationships/followers/{popular_id}/', 'employee'),
+    ('following', '/relationships/following/', 'employee'),
+    ('follow_stats', '/relationships/stats/{popular_id}/', 'employee'),
+]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Measure latency, query counts and memory of the main endpoints and write the results to JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30, help='Measured requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests per endpoint')
+        parser.add_argument('--only', nargs='*', help='Endpoint names to run (default: all)')
+        parser.add_argument('--output', help='JSON file to write (default: benchmark-<commit>.json)')
+        parser.add_argument('--compare', help='Earlier results file to print deltas against')
+
+    def handle(self, *args, **options):
+        users = self.pick_users()
+        # The test client always sends Host: testserver
+        if 'testserver' not in settings.ALLOWED_HOSTS:
+            settings.ALLOWED_HOSTS.append('testserver')
+
+        endpoints = [e for e in ENDPOINTS if not options['only'] or e[0] in options['only']]
+        if not endpoints:
+            raise CommandError(f"No endpoints match; choose from {', '.join(e[0] for e in ENDPOINTS)}")
+
+        clients = {
+            role: Client(raise_request_exception=False, HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+            for role, user in users.items() if role != 'popular'
+        }
+        results = {}
+        self.stdout.write(f"{'endpoint':<24}{'status':>7}{'p50 ms':>9}{'p95 ms':>9}{'queries':>9}{'peak KiB':>10}")
+        for name, url, role in endpoints:
+            url = url.format(popular_id=users['popular'].id)
+            results[name] = self.measure(clients[role], url, options['iterations'], options['warmup'])
+            r = results[name]
+            self.stdout.write(
+                f"{name:<24}{r['status']:>7}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['queries']:>9}{r['peak_alloc_kib']:>10}"
+            )
+
+        commit = git_commit()
+        report = {
+            'commit': commit,
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'iterations': options['iterations'],
+            'dataset': self.dataset_counts(),
+            'max_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'endpoints': results,
+        }
+        output = options['output'] or f"benchmark-{commit or timezone.now().strftime('%Y%m%d%H%M%S')}.json"
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
+
+        if options['compare']:
+            self.compare(options['compare'], results)
+
+    def pick_users(self):
+        employee = User.objects.filter(userprofile__role='employee', employee_profile__isnull=False).first()
+        employer = (
+            User.objects.filter(userprofile__role__in=['employer', 'company'])
+            .annotate(received=Count('posted_jobs__applications')).order_by('-received').first()
+        )
+        popular = User.objects.annotate(follower_count=Count('followers')).order_by('-follower_count').first()
+        if not (employee and employer and popular):
+            raise CommandError('Needs employee and employer users; run seed_benchmark_data first')
+        return {'employee': employee, 'employer': employer, 'popular': popular}
+
+    def dataset_counts(self):
+        models = [User, Job, JobApplication, Post, PostImage, PostComment, PostLike, Follow]
+        return {model._meta.label: model.objects.count() for model in models}
+
+    def measure(self, client, url, iterations, warmup):
+        for _ in range(warmup):
+            client.get(url)
+
+        latencies, queries, sql_ms = [], [], []
+        for _ in range(iterations):
+            with collect_timings() as timings:
+                start = time.perf_counter()
+                response = client.get(url)
+                latencies.append((time.perf_counter() - start) * 1000)
+            queries.append(timings.queries)
+            sql_ms.append(timings.sql_seconds * 1000)
+
+        # One extra request under tracemalloc, which slows everything down
+        tracemalloc.start()
+        client.get(url)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'url': url,
+            'status': response.status_code,
+            'p50_ms': round(statistics.median(latencies), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'mean_ms': round(statistics.fmean(latencies), 2),
+            'queries': max(queries),
+            'sql_ms': round(statistics.median(sql_ms), 2),
+            'response_bytes': len(response.content),
+            'peak_alloc_kib': round(peak / 1024),
+        }
+
+    def compare(self, path, results):
+        with open(path) as f:
+            baseline = json.load(f)
+        self.stdout.write(f"\nCompared with {baseline.get('commit') or path}:")
+        self.stdout.write(f"{'endpoint':<24}{'p50 ms':>16}{'p95 ms':>16}{'queries':>12}")
+        for name, current in results.items():
+            before = baseline['endpoints'].get(name)
+            if before is None:
+                continue
+            self.stdout.write(
+                f"{name:<24}"
+                f"{self.delta(before['p50_ms'], current['p50_ms']):>16}"
+                f"{self.delta(before['p95_ms'], current['p95_ms']):>16}"
+                f"{before['queries']:>5} -> {current['queries']:<4}"
+            )
+
+    def delta(self, before, after):
+        change = (after - before) / before * 100 if before else 0.0
+        return f'{after} ({change:+.0f}%)'
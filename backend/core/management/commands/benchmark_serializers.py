@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import FastJSONRenderer, orjson
+from job_postings.models import JobApplication
+from job_postings.query import JobQuery, job_query_results
+from job_postings.rows import JobApplicationListRows, JobApplicationReceivedRows, JobRows
+from job_postings.serializers import JobApplicationListSerializer, JobApplicationReceivedSerializer, JobSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Rows/second of the job and application lists: ModelSerializer + JSONRenderer against '
+        'row serializers + FastJSONRenderer. Fails if the two produce different data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per list')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement; the best is reported')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        applications = JobApplication.objects.order_by('-applied_at', 'id')
+        lists = [
+            ('jobs', job_query_results(JobQuery())[:rows], JobSerializer, JobRows),
+            ('applications', applications.select_related('job__posted_by__userprofile', 'applicant__userprofile')[:rows],
+             JobApplicationListSerializer, JobApplicationListRows),
+            ('received', applications.select_related('job__posted_by__userprofile', 'applicant__userprofile')[:rows],
+             JobApplicationReceivedSerializer, JobApplicationReceivedRows),
+        ]
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; FastJSONRenderer falls back to JSONRenderer'))
+
+        self.stdout.write(f"{'list':<14}{'rows':>7}{'stage':>11}{'drf rows/s':>13}{'fast rows/s':>13}{'speedup':>9}")
+        for name, queryset, serializer_class, rows_class in lists:
+            # .all() clones, so no run is served from another's result cache
+            expected = serializer_class(list(queryset.all()), many=True).data
+            actual = rows_class.serialize(queryset)
+            if [dict(row) for row in expected] != actual:
+                raise CommandError(f'{rows_class.__name__} output differs from {serializer_class.__name__}')
+            count = len(actual)
+            if not count:
+                self.stdout.write(self.style.WARNING(f'{name:<14}no rows; run seed_benchmark_data first'))
+                continue
+
+            # Serializing alone, from already fetched rows
+            instances, tuples = list(queryset.all()), list(rows_class.values(queryset))
+            self.report(name, count, 'serialize', repeat,
+                        lambda: serializer_class(instances, many=True).data, lambda: rows_class.many(tuples))
+            # Rendering alone, from the same dicts
+            self.report(name, count, 'render', repeat,
+                        lambda: JSONRenderer().render({'data': expected}),
+                        lambda: FastJSONRenderer().render({'data': actual}))
+            # Query, serialize and render, as a list endpoint does
+            self.report(name, count, 'total', repeat,
+                        lambda: JSONRenderer().render({'data': serializer_class(list(queryset.all()), many=True).data}),
+                        lambda: FastJSONRenderer().render({'data': rows_class.serialize(queryset)}))
+
+    def report(self, name, count, stage, repeat, drf, fast):
+        drf_seconds, fast_seconds = self.best(drf, repeat), self.best(fast, repeat)
+        self.stdout.write(
+            f'{name:<14}{count:>7}{stage:>11}{count / drf_seconds:>13,.0f}{count / fast_seconds:>13,.0f}'
+            f'{drf_seconds / fast_seconds:>8.1f}x'
+        )
+
+    def best(self, func, repeat):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        return min(times)
@@ -0,0 +1,77 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from core import pagination
+from core.pagination import stream_response
+from job_postings.query import JobQuery, job_query_results
+from job_postings.serializers import JobSerializer
+
+
+def current_rss_kib():
+    """Resident set size right now (Linux); None elsewhere"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare memory of a buffered list response with a streamed one (?stream=true) as the row count grows. '
+        'Streamed peaks should stay flat; seed with `seed_benchmark_data --scale large` for 100k rows.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='*', default=[1000, 10000, 100000], help='Row counts to measure')
+        parser.add_argument('--skip-buffered', action='store_true', help='Only measure streaming (buffered 100k rows is slow)')
+
+    def handle(self, *args, **options):
+        jobs = job_query_results(JobQuery())
+        available = jobs.count()
+        if not available:
+            raise CommandError('No active jobs; run seed_benchmark_data first')
+        # Let the largest requested size stream in full
+        pagination.MAX_STREAM_ROWS = max(max(options['rows']), pagination.MAX_STREAM_ROWS)
+
+        self.stdout.write(f"{'rows':>8}{'mode':>10}{'seconds':>10}{'bytes':>14}{'peak KiB':>11}{'RSS +KiB':>10}")
+        for rows in options['rows']:
+            if rows > available:
+                self.stdout.write(self.style.WARNING(f'{rows:>8}  only {available} active jobs; skipped'))
+                continue
+            queryset = jobs[:rows]
+            if not options['skip_buffered']:
+                self.report(rows, 'buffered', lambda: self.buffered(queryset))
+            self.report(rows, 'streamed', lambda: self.streamed(queryset))
+
+    def buffered(self, queryset):
+        return len(JSONRenderer().render({'data': JobSerializer(list(queryset), many=True).data}))
+
+    def streamed(self, queryset):
+        # Consume the body the way a server writes it to the socket
+        response = stream_response('Benchmark', queryset, lambda rows: JobSerializer(rows, many=True).data)
+        size, rss_peak = 0, current_rss_kib()
+        for part in response.streaming_content:
+            size += len(part)
+            rss_peak = max(rss_peak or 0, current_rss_kib() or 0)
+        self._rss_peak = rss_peak
+        return size
+
+    def report(self, rows, mode, func):
+        rss_before = current_rss_kib()
+        self._rss_peak = None
+        tracemalloc.start()
+        start = time.perf_counter()
+        size = func()
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rss_after = max(self._rss_peak or 0, current_rss_kib() or 0)
+        rss_growth = rss_after - rss_before if rss_before else '-'
+        self.stdout.write(f'{rows:>8}{mode:>10}{seconds:>10.2f}{size:>14}{round(peak / 1024):>11}{rss_growth:>10}')
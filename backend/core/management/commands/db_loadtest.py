@@ -0,0 +1,102 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test import Client
+
+from core.db import connection_metrics
+
+
+# Environment overrides for each connection mode compared by --compare
+MODES = {
+    'no_reuse': {'DB_POOL': 'false', 'DB_CONN_MAX_AGE': '0'},
+    'persistent': {'DB_POOL': 'false', 'DB_CONN_MAX_AGE': '60'},
+    'pool': {'DB_POOL': 'true'},
+}
+
+
+class Command(BaseCommand):
+    help = 'Measure requests/sec against an endpoint, optionally comparing connection modes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='/jobs/advanced-search/')
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds per run')
+        parser.add_argument('--compare', action='store_true',
+                            help='Run once per connection mode in a fresh process and print a table')
+        parser.add_argument('--json', action='store_true', help='Print the result as JSON')
+
+    def handle(self, *args, **options):
+        if options['compare']:
+            return self.compare(options)
+
+        result = self.run_load(options['url'], options['threads'], options['duration'])
+        if options['json']:
+            self.stdout.write(json.dumps(result))
+        else:
+            self.stdout.write(
+                f"{result['requests']} requests in {result['seconds']}s "
+                f"({result['requests_per_second']} req/s, {result['errors']} errors)"
+            )
+            self.stdout.write(f"connections: {result['connections']}")
+
+    def run_load(self, url, threads, duration):
+        connection_metrics.reset()
+        counts = [0] * threads
+        errors = [0] * threads
+        deadline = time.perf_counter() + duration
+
+        def worker(index):
+            client = Client(HTTP_HOST='localhost')
+            while time.perf_counter() < deadline:
+                response = client.get(url)
+                # The test client skips the request_finished connection cleanup
+                # that a real server runs, so do it here to reproduce reconnects
+                close_old_connections()
+                counts[index] += 1
+                if response.status_code >= 500:
+                    errors[index] += 1
+
+        start = time.perf_counter()
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        return {
+            'url': url,
+            'threads': threads,
+            'requests': sum(counts),
+            'errors': sum(errors),
+            'seconds': round(elapsed, 2),
+            'requests_per_second': round(sum(counts) / elapsed, 1),
+            'connections': connection_metrics.snapshot(),
+        }
+
+    def compare(self, options):
+        rows = []
+        for mode, overrides in MODES.items():
+            env = dict(os.environ, **overrides)
+            output = subprocess.run(
+                [sys.executable, sys.argv[0], 'db_loadtest', '--json',
+                 '--url', options['url'], '--threads', str(options['threads']),
+                 '--duration', str(options['duration'])],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            rows.append((mode, result))
+
+        self.stdout.write(f"{'mode':<12}{'req/s':>10}{'errors':>8}{'new conns':>11}{'avg checkout ms':>17}")
+        for mode, result in rows:
+            self.stdout.write(
+                f"{mode:<12}{result['requests_per_second']:>10}{result['errors']:>8}"
+                f"{result['connections']['connections_created']:>11}"
+                f"{result['connections']['avg_checkout_ms']:>17}"
+            )
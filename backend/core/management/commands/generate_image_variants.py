@@ -0,0 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.images import IMAGE_FIELDS, IMAGE_WORKERS, process_image, variants_field
+
+
+class Command(BaseCommand):
+    help = 'Generate missing or stale image variants (thumbnail/medium/large) for every image field in core.images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=IMAGE_WORKERS, help='Images processed in parallel')
+        parser.add_argument('--force', action='store_true', help='Regenerate variants that are already current')
+
+    def handle(self, *args, **options):
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for label, field_name in IMAGE_FIELDS:
+                model = apps.get_model(label)
+                column = variants_field(field_name)
+                rows = model._default_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                pending = [
+                    pk for pk, name, variants in rows.values_list('pk', field_name, column).iterator()
+                    if options['force'] or (variants or {}).get('source') != name
+                ]
+                done = failed = 0
+                results = pool.map(lambda pk: self.process(model, pk, field_name, options['force']), pending)
+                for result in results:
+                    done, failed = (done + 1, failed) if result else (done, failed + 1)
+                self.stdout.write(f'{label}.{field_name}: {done} generated, {failed} failed')
+
+    def process(self, model, pk, field_name, force):
+        try:
+            return process_image(model, pk, field_name, force) is not None
+        except Exception as e:
+            self.stderr.write(f'{model._meta.label} {pk}: {e}')
+            return False
+        finally:
+            close_old_connections()
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.accounts import run_account_deletion
+from core.models import AccountDeletion
+
+
+class Command(BaseCommand):
+    help = 'Run account deletions that are pending or were interrupted (see core.accounts)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stalled-after', type=int, default=600,
+                            help='Seconds without progress after which a running deletion is resumed')
+        parser.add_argument('--retry', action='store_true', help='Also retry failed deletions')
+
+    def handle(self, *args, **options):
+        statuses = ['pending', 'failed'] if options['retry'] else ['pending']
+        stalled = timezone.now() - timedelta(seconds=options['stalled_after'])
+        deletions = AccountDeletion.objects.filter(status__in=statuses) | AccountDeletion.objects.filter(
+            status='running', updated_at__lt=stalled
+        )
+        for deletion in deletions.order_by('requested_at'):
+            try:
+                run_account_deletion(deletion)
+                self.stdout.write(f'{deletion.username}: deleted {sum(deletion.progress.values())} rows')
+            except Exception as e:
+                AccountDeletion.objects.filter(pk=deletion.pk).update(status='failed', error=str(e)[:1000])
+                self.stderr.write(f'{deletion.username}: {e}')
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import FilePurge
+from core.purge import SWEEP_BATCH_SIZE, sweep_all
+
+
+class Command(BaseCommand):
+    help = 'Delete the stored files queued by core.purge (run from cron, or with --loop as a worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=SWEEP_BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true', help='Keep sweeping every --interval seconds')
+        parser.add_argument('--interval', type=float, default=10.0)
+
+    def handle(self, *args, **options):
+        while True:
+            deleted, failed = sweep_all(options['batch_size'])
+            if deleted or failed or not options['loop']:
+                waiting = FilePurge.objects.count()
+                self.stdout.write(f'{deleted} files deleted, {failed} failed, {waiting} waiting for a retry')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,58 @@
+import posixpath
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import FilePurge
+from core.purge import all_referenced_files, queue_purge, sweep_all
+
+
+class Command(BaseCommand):
+    help = (
+        'List files in storage (MEDIA_ROOT) that no row references and that are not queued for purging; '
+        'with --purge, queue them'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='', help='Only scan below this directory')
+        parser.add_argument(
+            '--min-age', type=float, default=24,
+            help='Hours a file must have existed, so uploads whose rows are not committed yet are kept'
+        )
+        parser.add_argument('--purge', action='store_true', help='Queue the orphans and delete them')
+
+    def handle(self, *args, **options):
+        referenced = all_referenced_files() | set(FilePurge.objects.values_list('name', flat=True))
+        cutoff = timezone.now() - timedelta(hours=options['min_age'])
+
+        orphans, scanned = [], 0
+        for name in self.walk(options['prefix'].strip('/')):
+            scanned += 1
+            if name in referenced:
+                continue
+            try:
+                if default_storage.get_modified_time(name) > cutoff:
+                    continue
+            except NotImplementedError:
+                pass
+            orphans.append(name)
+
+        for name in orphans[:20]:
+            self.stdout.write(f'  {name}')
+        if len(orphans) > 20:
+            self.stdout.write(f'  ... and {len(orphans) - 20} more')
+        self.stdout.write(f'{scanned} files scanned, {len(orphans)} orphaned')
+        if options['purge']:
+            # Also deletes whatever was already queued
+            queue_purge(orphans)
+            deleted, failed = sweep_all()
+            self.stdout.write(f'{deleted} files deleted, {failed} failed')
+
+    def walk(self, directory):
+        directories, files = default_storage.listdir(directory)
+        for name in files:
+            yield posixpath.join(directory, name)
+        for name in directories:
+            yield from self.walk(posixpath.join(directory, name))
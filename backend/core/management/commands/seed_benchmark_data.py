@@ -0,0 +1,294 @@
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from authentication.models import UserProfile
+from core.caching import versions
+from feeds.models import Post, PostComment, PostImage, PostLike
+from job_postings.models import Job, JobApplication
+from job_postings.autocomplete import invalidate_autocomplete
+from job_postings.recommendations import invalidate_job_recommendations
+from job_postings.terms import rebuild_terms
+from locations.gazetteer import assign_locations
+from profile_app.models import EmployeeProfile
+from relationships.models import Follow
+
+
+USERNAME_PREFIX = 'bench_'
+PASSWORD = 'benchmark123'
+
+# Row counts per preset; `large` is the production-like scale
+SCALES = {
+    'small': {'users': 2000, 'jobs': 2000, 'applications': 20000, 'posts': 10000, 'follows_per_user': 20},
+    'medium': {'users': 20000, 'jobs': 20000, 'applications': 200000, 'posts': 100000, 'follows_per_user': 50},
+    'large': {'users': 100000, 'jobs': 100000, 'applications': 1000000, 'posts': 500000, 'follows_per_user': 100},
+}
+
+# Share of users per role
+ROLE_WEIGHTS = {'employee': 0.8, 'employer': 0.15, 'company': 0.05}
+
+SKILLS = [
+    'python', 'django', 'react', 'javascript', 'typescript', 'sql', 'postgresql', 'aws',
+    'docker', 'kubernetes', 'java', 'spring', 'go', 'rust', 'c++', 'node.js', 'vue',
+    'angular', 'machine learning', 'data analysis', 'excel', 'figma', 'communication',
+    'project management', 'sales', 'marketing', 'seo', 'accounting', 'linux', 'git',
+]
+TITLES = [
+    'Software Engineer', 'Backend Developer', 'Frontend Developer', 'Data Scientist',
+    'DevOps Engineer', 'Product Manager', 'QA Engineer', 'UX Designer', 'Data Analyst',
+    'Marketing Specialist', 'Sales Executive', 'Accountant', 'Mobile Developer',
+]
+LOCATIONS = [
+    'Kochi', 'Bangalore', 'Chennai', 'Hyderabad', 'Mumbai', 'Pune', 'Delhi',
+    'Trivandrum', 'Kozhikode', 'Remote', 'Bangalore (Remote)', 'Dubai',
+    # Spellings the gazetteer folds into the places above
+    'Bengaluru', 'Bangalore, India', 'Cochin', 'Kochi, Kerala', 'Gurgaon', 'Thrissur', 'Mysore',
+]
+COMPANIES = [
+    'Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Stark Industries', 'Wayne Tech',
+    'Hooli', 'Pied Piper', 'Soylent', 'Cyberdyne', 'Tyrell', 'Wonka Digital',
+]
+WORDS = (
+    'team build ship product customers scale data platform growth design review code '
+    'deliver learn mentor cloud api service quality fast reliable modern remote office '
+    'culture impact launch milestone hiring project award release users feedback'
+).split()
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = 'Generate a synthetic dataset (users, jobs, applications, posts, follows) for benchmarking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='small')
+        parser.add_argument('--users', type=int, help='Override the preset user count')
+        parser.add_argument('--jobs', type=int, help='Override the preset job count')
+        parser.add_argument('--applications', type=int, help='Override the preset application count')
+        parser.add_argument('--posts', type=int, help='Override the preset post count')
+        parser.add_argument('--follows-per-user', type=int, help='Override the preset average follows per user')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42, help='Random seed, so runs are reproducible')
+        parser.add_argument('--clear', action='store_true', help='Delete previously generated benchmark data first')
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        counts = dict(SCALES[options['scale']])
+        for key in counts:
+            if options.get(key) is not None:
+                counts[key] = options[key]
+
+        existing = User.objects.filter(username__startswith=USERNAME_PREFIX)
+        if options['clear']:
+            self.step('Deleting previous benchmark data', lambda: existing.delete())
+        elif existing.exists():
+            raise CommandError('Benchmark data already exists; pass --clear to regenerate it')
+
+        with transaction.atomic():
+            users = self.step('Users and profiles', lambda: self.create_users(counts['users']))
+            jobs = self.step('Jobs', lambda: self.create_jobs(users['employer'] + users['company'], counts['jobs']))
+            self.step('Applications', lambda: self.create_applications(jobs, users['employee'], counts['applications']))
+            posts = self.step('Posts', lambda: self.create_posts(users['all'], counts['posts']))
+            self.step('Post images, likes and comments', lambda: self.create_engagement(posts, users['all']))
+            self.step('Follows', lambda: self.create_follows(users, counts['follows_per_user']))
+
+        # Bulk inserts skip the signals that keep these caches and tables fresh
+        invalidate_job_recommendations()
+        invalidate_autocomplete()
+        for model in (UserProfile, JobApplication, Follow):
+            versions.bump(model)
+        self.step('Search terms', rebuild_terms)
+        self.step('Places', self.assign_places)
+
+        self.stdout.write(self.style.SUCCESS(f'Benchmark data created (password for every user: {PASSWORD})'))
+
+    def assign_places(self):
+        assign_locations(Job.objects.filter(posted_by__username__startswith=USERNAME_PREFIX), 'location', 'place')
+        assign_locations(
+            EmployeeProfile.objects.filter(user__username__startswith=USERNAME_PREFIX),
+            'preferred_location', 'preferred_place',
+        )
+
+    def step(self, label, func):
+        self.stdout.write(f'{label}...', ending='')
+        self.stdout.flush()
+        start = time.perf_counter()
+        result = func()
+        self.stdout.write(f' {time.perf_counter() - start:.1f}s')
+        return result
+
+    def bulk_create(self, model, objects, **kwargs):
+        for batch in batched(objects, self.batch_size):
+            model.objects.bulk_create(batch, batch_size=self.batch_size, **kwargs)
+
+    def spread(self, days=365):
+        """Random timestamp within the last `days` days"""
+        return self.now - timedelta(seconds=self.random.randint(0, days * 86400))
+
+    def text(self, words):
+        return ' '.join(self.random.choices(WORDS, k=words))
+
+    def create_users(self, count):
+        password = make_password(PASSWORD)
+        roles = self.random.choices(list(ROLE_WEIGHTS), weights=list(ROLE_WEIGHTS.values()), k=count)
+        self.bulk_create(User, (
+            User(
+                username=f'{USERNAME_PREFIX}{i}', email=f'{USERNAME_PREFIX}{i}@example.com',
+                first_name=f'Bench{i}', last_name=roles[i].title(), password=password
+            )
+            for i in range(count)
+        ))
+
+        rows = User.objects.filter(username__startswith=USERNAME_PREFIX).values_list('id', 'username')
+        users = {'all': [], 'employee': [], 'employer': [], 'company': []}
+        profiles, employee_profiles = [], []
+        for user_id, username in rows:
+            role = roles[int(username[len(USERNAME_PREFIX):])]
+            users['all'].append(user_id)
+            users[role].append(user_id)
+            skills = ', '.join(self.random.sample(SKILLS, self.random.randint(2, 8)))
+            profiles.append(UserProfile(
+                user_id=user_id, role=role, is_email_verified=True, skills=skills if role == 'employee' else None,
+                company_name=self.random.choice(COMPANIES) if role == 'company' else None,
+            ))
+            if role == 'employee':
+                employee_profiles.append(EmployeeProfile(
+                    user_id=user_id, skills=skills,
+                    experience_years=self.random.randint(0, 15),
+                    preferred_job_type=self.random.choice(Job.JOB_TYPE_CHOICES)[0],
+                    preferred_location=self.random.choice(LOCATIONS),
+                    open_to_remote=self.random.random() < 0.6,
+                    expected_salary_min=self.random.randrange(200000, 1500000, 50000),
+                ))
+        self.bulk_create(UserProfile, profiles)
+        self.bulk_create(EmployeeProfile, employee_profiles)
+        return users
+
+    def create_jobs(self, posters, count):
+        if not posters:
+            raise CommandError('No employer or company users to post jobs')
+        job_types = [choice[0] for choice in Job.JOB_TYPE_CHOICES]
+        levels = [choice[0] for choice in Job.EXPERIENCE_CHOICES]
+
+        def jobs():
+            for _ in range(count):
+                salary_min = self.random.randrange(200000, 2000000, 50000)
+                title = self.random.choice(TITLES)
+                yield Job(
+                    posted_by_id=self.random.choice(posters), title=title,
+                    description=f'{title}. {self.text(60)}', company_name=self.random.choice(COMPANIES),
+                    location=self.random.choice(LOCATIONS), job_type=self.random.choice(job_types),
+                    experience_level=self.random.choice(levels),
+                    salary_min=salary_min, salary_max=salary_min + self.random.randrange(0, 1000000, 50000),
+                    skills_required=', '.join(self.random.sample(SKILLS, self.random.randint(3, 7))),
+                    is_active=self.random.random() < 0.9,
+                )
+
+        self.bulk_create(Job, jobs())
+        # bulk_create sets auto_now_add fields to now; spread them out afterwards
+        job_ids = list(Job.objects.filter(posted_by__username__startswith=USERNAME_PREFIX).values_list('id', flat=True))
+        self.spread_created_at(Job, job_ids)
+        return job_ids
+
+    def spread_created_at(self, model, ids, field='created_at'):
+        objects = [model(id=pk, **{field: self.spread()}) for pk in ids]
+        for batch in batched(objects, self.batch_size):
+            model.objects.bulk_update(batch, [field])
+
+    def create_applications(self, job_ids, applicant_ids, count):
+        if not job_ids or not applicant_ids:
+            return
+        statuses = [choice[0] for choice in JobApplication.STATUS_CHOICES]
+        # Popular jobs get most applications, like in production
+        cum_weights = list(accumulate(1.0 / (rank + 1) ** 0.8 for rank in range(len(job_ids))))
+        count = min(count, len(job_ids) * len(applicant_ids))
+
+        def applications():
+            seen = set()
+            while len(seen) < count:
+                pair = (
+                    self.random.choices(job_ids, cum_weights=cum_weights)[0] if len(seen) % 2 else self.random.choice(job_ids),
+                    self.random.choice(applicant_ids),
+                )
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                yield JobApplication(
+                    job_id=pair[0], applicant_id=pair[1], status=self.random.choice(statuses),
+                    cover_letter=self.text(30), applicant_email=f'applicant{pair[1]}@example.com',
+                    match_score=round(self.random.random(), 4),
+                )
+
+        self.bulk_create(JobApplication, applications(), ignore_conflicts=True)
+
+    def create_posts(self, author_ids, count):
+        post_types = [choice[0] for choice in Post.POST_TYPES]
+        self.bulk_create(Post, (
+            Post(
+                author_id=self.random.choice(author_ids), title=self.text(5).capitalize(),
+                content=self.text(self.random.randint(10, 80)), post_type=self.random.choice(post_types),
+            )
+            for _ in range(count)
+        ))
+        post_ids = list(Post.objects.filter(author__username__startswith=USERNAME_PREFIX).values_list('id', flat=True))
+        self.spread_created_at(Post, post_ids)
+        return post_ids
+
+    def create_engagement(self, post_ids, user_ids):
+        images, likes, comments, posts = [], [], [], []
+        for post_id in post_ids:
+            for n in range(self.random.choices([0, 1, 2, 4], weights=[0.4, 0.35, 0.15, 0.1])[0]):
+                images.append(PostImage(post_id=post_id, image=f'posts/bench/{post_id}_{n}.jpg'))
+            likers = self.random.sample(user_ids, min(len(user_ids), int(self.random.expovariate(1 / 8))))
+            likes.extend(PostLike(post_id=post_id, user_id=user_id) for user_id in likers)
+            comment_count = int(self.random.expovariate(1 / 3))
+            comments.extend(
+                PostComment(post_id=post_id, author_id=self.random.choice(user_ids), content=self.text(12))
+                for _ in range(comment_count)
+            )
+            posts.append(Post(id=post_id, likes_count=len(likers), comments_count=comment_count))
+
+            if len(likes) + len(comments) + len(images) >= self.batch_size * 4:
+                self.flush_engagement(images, likes, comments, posts)
+                images, likes, comments, posts = [], [], [], []
+        self.flush_engagement(images, likes, comments, posts)
+
+    def flush_engagement(self, images, likes, comments, posts):
+        self.bulk_create(PostImage, images)
+        self.bulk_create(PostLike, likes, ignore_conflicts=True)
+        self.bulk_create(PostComment, comments)
+        for batch in batched(posts, self.batch_size):
+            Post.objects.bulk_update(batch, ['likes_count', 'comments_count'])
+
+    def create_follows(self, users, follows_per_user):
+        # A few popular accounts attract most follows, the rest is random
+        everyone, companies = users['all'], users['company']
+        popular = everyone[:max(1, len(everyone) // 100)]
+
+        def follows():
+            for follower_id in everyone:
+                # Companies can only follow other companies (Follow.clean)
+                targets = companies if follower_id in company_set else everyone
+                count = min(len(targets) - 1, int(self.random.expovariate(1 / follows_per_user)))
+                chosen = set(self.random.sample(targets, max(count, 0)))
+                if targets is everyone:
+                    chosen.update(self.random.sample(popular, min(len(popular), 3)))
+                chosen.discard(follower_id)
+                for following_id in chosen:
+                    yield Follow(follower_id=follower_id, following_id=following_id)
+
+        company_set = set(companies)
+        self.bulk_create(Follow, follows(), ignore_conflicts=True)
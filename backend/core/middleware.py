@@ -0,0 +1,234 @@
+"""
+Request-scoped database middleware. Each one is hybrid: under ASGI it is
+called as a coroutine and its view hooks are coroutines too, so async views
+run on the event loop instead of in a thread per request.
+"""
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+
+from .db import (
+    RequestConnections, get_statement_timeout, release_request_queries, wrap_request_queries,
+    wrap_streamed_queries
+)
+from .routers import (
+    begin_request, end_request, use_replica,
+    client_key, pin_to_primary, is_pinned_to_primary, apin_to_primary, ais_pinned_to_primary
+)
+from .instrumentation import (
+    collect_timings, request_metrics, get_query_budget,
+    server_timing_header, response_size, QueryBudgetExceeded
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_view_class(view_func):
+    """Return the class behind an as_view() callable (Django and DRF views)"""
+    return getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class HybridMiddleware:
+    """
+    Sync or async to match the handler. Subclasses implement __call__ for
+    sync requests and __acall__ for async ones, and may give a view hook an
+    async twin named a<hook> (Django would run a sync hook in a thread).
+    """
+    sync_capable = True
+    async_capable = True
+    async_hooks = ()
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            for hook in self.async_hooks:
+                setattr(self, hook, getattr(self, f'a{hook}'))
+
+
+class ReplicaRoutingMiddleware(HybridMiddleware):
+    """
+    Routes reads of views marked `read_replica = True` to a replica, unless
+    the client wrote within the last REPLICA_STICKY_SECONDS. Any write made
+    while handling a request pins the client to the primary.
+    """
+    async_hooks = ('process_view',)
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state, token = begin_request()
+        request._routing_state = state
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        if state.wrote:
+            pin_to_primary(client_key(request))
+        return response
+    
+    async def __acall__(self, request):
+        state, token = begin_request()
+        request._routing_state = state
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        if state.wrote:
+            await apin_to_primary(client_key(request))
+        return response
+    
+    def reads_replica(self, request, view_func):
+        view_class = get_view_class(view_func)
+        return request.method in SAFE_METHODS and getattr(view_class, 'read_replica', False)
+    
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.reads_replica(request, view_func) and not is_pinned_to_primary(client_key(request)):
+            use_replica(request._routing_state)
+        return None
+    
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        if self.reads_replica(request, view_func) and not await ais_pinned_to_primary(client_key(request)):
+            use_replica(request._routing_state)
+        return None
+
+
+class DatabaseConnectionMiddleware(HybridMiddleware):
+    """
+    Checks out connections on the request's first query through them
+    (recording checkout metrics) and applies the statement timeout of the
+    view's endpoint class there, e.g.
+
+        class JobSearchAPI(APIView):
+            statement_timeout = 'search'
+
+    This holds in sync_to_async() and gather_queries() threads and streamed
+    bodies too (see core.db). The timeout is reset afterwards so
+    pooled/persistent connections go back with the server default from
+    settings.DATABASES.
+    """
+    async_hooks = ('process_view',)
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request._connections = connections = RequestConnections()
+        with wrap_request_queries(connections):
+            response = self.get_response(request)
+        wrap_streamed_queries(response, connections)
+        return response
+    
+    async def __acall__(self, request):
+        request._connections = connections = RequestConnections()
+        with wrap_request_queries(connections):
+            try:
+                response = await self.get_response(request)
+            finally:
+                # Sync views and the async ORM ran on the request's thread-sensitive thread
+                await sync_to_async(release_request_queries)()
+        wrap_streamed_queries(response, connections)
+        return response
+    
+    def set_timeout(self, request, view_func):
+        view_class = get_view_class(view_func)
+        request._connections.timeout_ms = get_statement_timeout(getattr(view_class, 'statement_timeout', None))
+    
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.set_timeout(request, view_func)
+        return None
+    
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.set_timeout(request, view_func)
+        return None
+
+
+class RequestInstrumentationMiddleware(HybridMiddleware):
+    """
+    Records query count, SQL/serializer/render time and response size for
+    each request, adds them as a `Server-Timing` header and aggregates them
+    per URL name. Requests over the view's query budget raise
+    QueryBudgetExceeded when settings.QUERY_BUDGET_ENFORCE is on; streamed
+    responses are recorded and checked once their body is sent.
+    """
+    async_hooks = ('process_view', 'process_template_response')
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request._query_budget = None
+        with collect_timings() as timings:
+            request._timings = timings
+            response = self.get_response(request)
+        return self.finish(request, timings, response)
+    
+    async def __acall__(self, request):
+        request._query_budget = None
+        with collect_timings() as timings:
+            request._timings = timings
+            response = await self.get_response(request)
+        return self.finish(request, timings, response)
+    
+    def finish(self, request, timings, response):
+        response['Server-Timing'] = server_timing_header(timings, timings.elapsed())
+        if response.streaming and not response.is_async:
+            # The body is produced after this returns; it is recorded once sent
+            wrap_streamed_queries(response, timings.sql_wrapper)
+            response.streaming_content = self.recorded_stream(request, timings, response.streaming_content)
+        else:
+            self.record(request, timings, response_size(response))
+        return response
+    
+    def recorded_stream(self, request, timings, content):
+        size = 0
+        for chunk in content:
+            size += len(chunk)
+            yield chunk
+        self.record(request, timings, size)
+    
+    def record(self, request, timings, size):
+        match = request.resolver_match
+        name = match.view_name if match else 'unresolved'
+        budget = request._query_budget
+        over_budget = budget is not None and timings.queries > budget
+        
+        request_metrics.record(name, timings, timings.elapsed(), size, over_budget)
+        
+        if over_budget:
+            message = f'{name} ran {timings.queries} queries (budget {budget})'
+            if getattr(settings, 'QUERY_BUDGET_ENFORCE', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+    
+    def set_budget(self, request, view_func):
+        request._query_budget = get_query_budget(request.resolver_match.view_name, get_view_class(view_func))
+    
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.set_budget(request, view_func)
+        return None
+    
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.set_budget(request, view_func)
+        return None
+    
+    def time_render(self, request, response):
+        # DRF responses are rendered after the view returns
+        timings = request._timings
+        start = time.perf_counter()
+        
+        def rendered(response):
+            timings.render_seconds += time.perf_counter() - start
+        
+        response.add_post_render_callback(rendered)
+        return response
+    
+    def process_template_response(self, request, response):
+        return self.time_render(request, response)
+    
+    async def aprocess_template_response(self, request, response):
+        return self.time_render(request, response)
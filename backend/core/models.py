@@ -0,0 +1,69 @@
+from django.db import models
+from django.utils import timezone
+
+
+class FilePurge(models.Model):
+    """A stored file whose row is gone, waiting for the sweeper to delete it (see core.purge)"""
+    name = models.CharField(max_length=500)
+    queued_at = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_attempt_at', 'id'], name='file_purge_due_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class AccountDeletion(models.Model):
+    """A deactivated account whose rows are being deleted in chunks (see core.accounts)"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    # Not a foreign key: the record outlives the user row
+    user_pk = models.IntegerField(unique=True)
+    username = models.CharField(max_length=150)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    # {model label: rows} counted when the run started, and deleted so far
+    planned = models.JSONField(default=dict, blank=True)
+    progress = models.JSONField(default=dict, blank=True)
+    current_step = models.CharField(max_length=100, blank=True, default='')
+    error = models.TextField(blank=True, default='')
+    requested_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='account_deletion_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.username} ({self.status})'
+
+    @property
+    def percent_done(self):
+        if self.status == 'done':
+            return 100
+        planned = sum(self.planned.values())
+        return min(99, 100 * sum(self.progress.values()) // planned) if planned else 0
+
+
+class ViewerSketch(models.Model):
+    """Unique viewers of one item, as HyperLogLog registers (see core.sketches)"""
+    viewers = models.BinaryField(default=bytes)
+    # hll_count(viewers), kept so reading it needs neither the registers nor numpy
+    unique_viewers = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
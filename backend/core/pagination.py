@@ -0,0 +1,108 @@
+"""
+Bounded list responses.
+
+Every list endpoint returns one page at a time and never more than
+MAX_PAGE_SIZE rows per page. Page numbers are capped at MAX_PAGE, so a huge
+?page= is an empty page rather than an OFFSET the database rejects. A client that needs a whole result set asks
+for ?stream=true instead. The rows are then read through a server-side
+cursor (QuerySet.iterator) and serialized STREAM_CHUNK_SIZE at a time. A
+StreamingHttpResponse writes the JSON as it goes, so memory stays flat
+however many rows there are, up to MAX_STREAM_ROWS.
+
+A streamed body has the same envelope as a page. "count" and "truncated"
+come after "data", because they are only known once the rows are written.
+"""
+from itertools import islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+from .renderers import dumps
+
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = getattr(settings, 'MAX_PAGE_SIZE', 50)
+MAX_PAGE = getattr(settings, 'MAX_PAGE', 10000)
+STREAM_CHUNK_SIZE = getattr(settings, 'STREAM_CHUNK_SIZE', 500)
+MAX_STREAM_ROWS = getattr(settings, 'MAX_STREAM_ROWS', 100000)
+
+
+def positive_int(value, default, maximum=None):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return default
+    if value <= 0:
+        return default
+    return value if maximum is None else min(value, maximum)
+
+
+def get_page_params(params, default_size=DEFAULT_PAGE_SIZE):
+    """(page, page_size, start, end) from query parameters; invalid values fall back to the defaults"""
+    page = positive_int(params.get('page'), 1, MAX_PAGE)
+    page_size = positive_int(params.get('page_size'), default_size, MAX_PAGE_SIZE)
+    start = (page - 1) * page_size
+    return page, page_size, start, start + page_size
+
+
+class PagePagination(BasePagination):
+    """Default pagination for DRF generic list views: same parameters and envelope as the APIViews"""
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page, self.page_size, start, end = get_page_params(request.query_params)
+        self.count = queryset.count()
+        return list(queryset[start:end])
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'page': self.page,
+            'page_size': self.page_size,
+            'total_pages': (self.count + self.page_size - 1) // self.page_size,
+            'data': data
+        })
+
+
+def wants_stream(request):
+    return request.GET.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def _stream_body(message, queryset, serialize, extra, chunk_size):
+    yield dumps({'message': message, **extra})[:-1] + b',"data":['
+
+    count, truncated = 0, False
+    # One row past the cap tells a capped stream from one that just ended there
+    rows = queryset[:MAX_STREAM_ROWS + 1].iterator(chunk_size=chunk_size)
+    for chunk in _chunks(rows, chunk_size):
+        if count + len(chunk) > MAX_STREAM_ROWS:
+            chunk, truncated = chunk[:MAX_STREAM_ROWS - count], True
+        if chunk:
+            data = dumps(serialize(chunk))[1:-1]
+            yield b',' + data if count else data
+            count += len(chunk)
+    yield b'],"count":%d,"truncated":%s}' % (count, b'true' if truncated else b'false')
+
+
+def stream_response(message, queryset, serialize, chunk_size=STREAM_CHUNK_SIZE, **extra):
+    """
+    Stream every row of queryset as {"message", **extra, "data", "count", "truncated"}.
+
+    serialize(rows) turns one chunk of rows into a list of dicts, e.g.
+    `lambda rows: JobSerializer(rows, many=True).data` for model instances
+    or `JobRows.many` for a queryset from `JobRows.values()`. Prefetches on
+    the queryset run once per chunk.
+    """
+    # The body is produced after the view returns, when the middleware has
+    # already reset replica routing; pin the connection chosen for this request
+    queryset = queryset.using(queryset.db)
+    return StreamingHttpResponse(
+        _stream_body(message, queryset, serialize, extra, chunk_size), content_type='application/json'
+    )
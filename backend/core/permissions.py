@@ -1,5 +1,5 @@
 from rest_framework.permissions import BasePermission
-from authentication.models import UserProfile
+from authentication.roles import get_role
 
 
 class IsEmployeeUser(BasePermission):
@@ -9,11 +9,7 @@ class IsEmployeeUser(BasePermission):
         if not request.user.is_authenticated:
             return False
         
-        try:
-            profile = UserProfile.objects.get(user=request.user)
-            return profile.role == 'employee'
-        except UserProfile.DoesNotExist:
-            return False
+        return get_role(request.user.id) == 'employee'
 
 
 class IsEmployerOrCompanyUser(BasePermission):
@@ -23,11 +19,7 @@ class IsEmployerOrCompanyUser(BasePermission):
         if not request.user.is_authenticated:
             return False
         
-        try:
-            profile = UserProfile.objects.get(user=request.user)
-            return profile.role in ['employer', 'company']
-        except UserProfile.DoesNotExist:
-            return False
+        return get_role(request.user.id) in ['employer', 'company']
 
 
 class IsJobOwnerOrReadOnly(BasePermission):
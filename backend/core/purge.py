@@ -0,0 +1,181 @@
+"""
+Deferred deletion of stored files.
+
+Deleting a post used to delete its image files one storage call at a time
+inside the request. Deleting a job or user cascaded through the database
+but left every resume and image of the deleted rows on disk.
+
+delete_with_files() instead collects the file names held by the rows and
+by everything the delete cascades to, with one query per model that has
+file fields. It queues them in FilePurge and bulk-deletes the rows, in one
+transaction, so a rolled back delete takes its queue entries with it.
+After commit a background sweeper deletes the queued files in batches.
+`manage.py purge_files` does the same from cron or a worker loop, and
+`manage.py scan_orphan_files` finds files that nothing references any
+more. Deleting a file twice is harmless, so sweepers may overlap.
+
+All files live in the default storage, which every FileField here uses.
+Field defaults (e.g. the shared default resume) are never queued.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, models, transaction
+from django.utils import timezone
+
+from .images import variant_names, variants_field
+from .models import FilePurge
+
+
+logger = logging.getLogger(__name__)
+
+SWEEP_BATCH_SIZE = getattr(settings, 'FILE_PURGE_BATCH_SIZE', 500)
+RETRY_DELAY = getattr(settings, 'FILE_PURGE_RETRY_DELAY', 60)
+MAX_CASCADE_DEPTH = 6
+
+_lock = threading.Lock()
+_sweeping = False
+
+
+def file_fields(model):
+    return [field for field in model._meta.concrete_fields if isinstance(field, models.FileField)]
+
+
+def field_defaults(model):
+    return {field.default for field in file_fields(model) if isinstance(field.default, str) and field.default}
+
+
+def _columns(model):
+    """(file column, variants column or None) for each file field of model"""
+    names = {field.name for field in model._meta.concrete_fields}
+    return [
+        (field.attname, variants_field(field.name) if variants_field(field.name) in names else None)
+        for field in file_fields(model)
+    ]
+
+
+def referenced_files(queryset):
+    """Names of the files, including image variants, held by the rows of queryset"""
+    columns = _columns(queryset.model)
+    if not columns:
+        return set()
+    lookups = [column for pair in columns for column in pair if column]
+    names = set()
+    for row in queryset.values_list(*lookups).iterator(chunk_size=2000):
+        values = iter(row)
+        for _, variants in columns:
+            names.add(next(values))
+            if variants:
+                names |= variant_names(next(values))
+    names.discard(None)
+    names.discard('')
+    return names - field_defaults(queryset.model)
+
+
+def cascade_querysets(queryset):
+    """The rows deleting queryset cascades to directly, as one queryset per relation"""
+    for relation in queryset.model._meta.related_objects:
+        if relation.on_delete is models.CASCADE:
+            yield relation.related_model._base_manager.filter(**{f'{relation.field.name}__in': queryset})
+
+
+def _cascades(queryset, depth=0):
+    yield queryset
+    if depth < MAX_CASCADE_DEPTH:
+        for related in cascade_querysets(queryset):
+            yield from _cascades(related, depth + 1)
+
+
+def cascaded_files(queryset):
+    """referenced_files() of queryset and of everything its delete cascades to"""
+    names = set()
+    for related in _cascades(queryset):
+        names |= referenced_files(related)
+    return names
+
+
+def queue_purge(names):
+    FilePurge.objects.bulk_create([FilePurge(name=name) for name in sorted(names)], batch_size=1000)
+
+
+def delete_with_files(target):
+    """
+    Bulk-delete a queryset or model instance like .delete() does, and queue
+    its files, and those of the rows it cascades to, for the sweeper.
+    """
+    queryset = target if isinstance(target, models.QuerySet) else type(target)._base_manager.filter(pk=target.pk)
+    with transaction.atomic():
+        names = cascaded_files(queryset)
+        queue_purge(names)
+        result = queryset.delete()
+    if names:
+        transaction.on_commit(start_sweeper)
+    return result
+
+
+def sweep(batch_size=SWEEP_BATCH_SIZE):
+    """Delete one batch of due files; returns (deleted, failed)"""
+    now = timezone.now()
+    batch = list(FilePurge.objects.filter(next_attempt_at__lte=now).order_by('next_attempt_at', 'id')[:batch_size])
+    done, failed = [], []
+    for entry in batch:
+        try:
+            default_storage.delete(entry.name)
+            done.append(entry.id)
+        except Exception as e:
+            entry.attempts += 1
+            # Back off exponentially, up to about 17 hours at the default delay
+            entry.next_attempt_at = now + timedelta(seconds=RETRY_DELAY * 2 ** min(entry.attempts, 10))
+            entry.last_error = str(e)[:1000]
+            failed.append(entry)
+    FilePurge.objects.filter(id__in=done).delete()
+    FilePurge.objects.bulk_update(failed, ['attempts', 'next_attempt_at', 'last_error'])
+    return len(done), len(failed)
+
+
+def sweep_all(batch_size=SWEEP_BATCH_SIZE):
+    """Sweep until no file is due; returns (deleted, failed)"""
+    deleted = failed = 0
+    while True:
+        done, errors = sweep(batch_size)
+        deleted, failed = deleted + done, failed + errors
+        if done + errors < batch_size:
+            return deleted, failed
+
+
+def _sweep_in_background():
+    global _sweeping
+    try:
+        sweep_all()
+    except Exception:
+        logger.exception('Sweeping purged files failed')
+    finally:
+        close_old_connections()
+        with _lock:
+            _sweeping = False
+
+
+def start_sweeper():
+    """Sweep in a background thread unless one is already running in this process"""
+    global _sweeping
+    if not getattr(settings, 'FILE_PURGE_IN_PROCESS', True):
+        return
+    with _lock:
+        if _sweeping:
+            return
+        _sweeping = True
+    threading.Thread(target=_sweep_in_background, daemon=True).start()
+
+
+def all_referenced_files():
+    """Every file name any row references, plus field defaults, for the orphan scan"""
+    names = set()
+    for model in apps.get_models():
+        if file_fields(model):
+            names |= referenced_files(model._base_manager.all())
+            names |= field_defaults(model)
+    return names
@@ -0,0 +1,104 @@
+"""
+Read-replica routing.
+
+Views opt in with a `read_replica = True` class attribute, and
+core.middleware.ReplicaRoutingMiddleware then sends the reads of safe
+requests to one of settings.DATABASE_REPLICAS. A client that wrote recently
+is pinned to the primary for REPLICA_STICKY_SECONDS so it reads its own
+writes (e.g. a job it just applied to does not reappear in AvailableJobsAPI).
+"""
+import hashlib
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+_state = ContextVar('db_routing_state', default=None)
+
+
+class RoutingState:
+    """Routing decision for the request being handled"""
+    __slots__ = ('replica', 'wrote')
+
+    def __init__(self):
+        self.replica = None
+        self.wrote = False
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def begin_request():
+    state = RoutingState()
+    return state, _state.set(state)
+
+
+def end_request(token):
+    _state.reset(token)
+
+
+def use_replica(state):
+    replicas = get_replicas()
+    if replicas:
+        state.replica = random.choice(replicas)
+
+
+def current_read_alias():
+    """Alias that reads in the current request are routed to"""
+    state = _state.get()
+    if state is not None and state.replica and not state.wrote:
+        return state.replica
+    return 'default'
+
+
+def client_key(request):
+    """Identify the client without touching the database (token, session or IP)"""
+    credential = (
+        request.META.get('HTTP_AUTHORIZATION')
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or request.META.get('REMOTE_ADDR', '')
+    )
+    return hashlib.sha1(credential.encode()).hexdigest()
+
+
+def pin_to_primary(key):
+    cache.set(f'db:pinned:{key}', True, getattr(settings, 'REPLICA_STICKY_SECONDS', 5))
+
+
+def is_pinned_to_primary(key):
+    return cache.get(f'db:pinned:{key}', False)
+
+
+async def apin_to_primary(key):
+    await cache.aset(f'db:pinned:{key}', True, getattr(settings, 'REPLICA_STICKY_SECONDS', 5))
+
+
+async def ais_pinned_to_primary(key):
+    return await cache.aget(f'db:pinned:{key}', False)
+
+
+class ReplicaRouter:
+    """Reads go to the request's replica (if any); writes always go to default"""
+
+    def db_for_read(self, model, **hints):
+        alias = current_read_alias()
+        return alias if alias != 'default' else None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            # Later reads in this request must see the write
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas mirror the primary, so objects may relate across aliases
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replicas():
+            return False
+        return None
@@ -0,0 +1,155 @@
+"""
+Fixed-size probabilistic sketches for counting and deduplicating clients.
+
+HyperLogLog counts the unique viewers of a job or post: HLL_PRECISION 12
+gives 4096 one-byte registers, about 1.6% standard error at any count. A
+Bloom filter remembers which anonymous clients liked a post, with
+BLOOM_BYTES of bits sized for BLOOM_CAPACITY entries at about 1% false
+positives. Both are plain bytes, stored in BinaryField columns of a
+one-to-one table per item (JobSketch, PostSketch), so each item costs the
+same few kilobytes however busy it is.
+
+Views are not written to the database one by one. record_view() notes the
+register a viewer raises in a per-process buffer, and a background thread
+merges the buffer into the stored registers every SKETCH_FLUSH_SECONDS,
+in one transaction per model. Merging takes the maximum of each register,
+so flushes from several processes commute and a repeated flush changes
+nothing.
+
+Anonymous clients are told apart by a fingerprint of their IP (see DRF's
+get_ident and NUM_PROXIES) and user agent, which is as good as it gets
+without cookies.
+"""
+import hashlib
+import math
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from rest_framework.throttling import BaseThrottle
+
+from .buffering import ProcessLocal, WriteBuffer
+
+
+HLL_PRECISION = 12
+HLL_REGISTERS = 1 << HLL_PRECISION
+BLOOM_BYTES = 4096
+BLOOM_HASHES = 7
+# Entries per Bloom filter generation for ~1% false positives
+BLOOM_CAPACITY = int(BLOOM_BYTES * 8 * math.log(2) ** 2 / math.log(100))
+FLUSH_SECONDS = getattr(settings, 'SKETCH_FLUSH_SECONDS', 10)
+
+_HASH_BITS = 64
+_RANK_BITS = _HASH_BITS - HLL_PRECISION
+_ALPHA = 0.7213 / (1 + 1.079 / HLL_REGISTERS)
+
+
+def hash64(value):
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), 'big')
+
+
+def hll_register(value):
+    """(register index, rank) that value raises in a HyperLogLog"""
+    hashed = hash64(value)
+    rest = hashed & ((1 << _RANK_BITS) - 1)
+    return hashed >> _RANK_BITS, _RANK_BITS - rest.bit_length() + 1
+
+
+def hll_merge(registers, updates):
+    """registers (bytes, empty when new) raised by updates, {index: rank}"""
+    merged = bytearray(registers or bytes(HLL_REGISTERS))
+    for index, rank in updates.items():
+        if rank > merged[index]:
+            merged[index] = rank
+    return bytes(merged)
+
+
+def hll_count(registers):
+    """Estimated number of distinct values added to registers"""
+    if not registers:
+        return 0
+    values = np.frombuffer(registers, dtype=np.uint8)
+    estimate = _ALPHA * HLL_REGISTERS ** 2 / np.ldexp(1.0, -values.astype(np.int64)).sum()
+    zeros = HLL_REGISTERS - np.count_nonzero(values)
+    if estimate <= 2.5 * HLL_REGISTERS and zeros:
+        # Linear counting is more accurate while most registers are empty
+        estimate = HLL_REGISTERS * math.log(HLL_REGISTERS / zeros)
+    return int(round(estimate))
+
+
+def bloom_bits(value):
+    """Bit positions of value in a Bloom filter, by double hashing"""
+    digest = hashlib.blake2b(str(value).encode(), digest_size=16).digest()
+    first, second = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+    return [(first + i * second) % (BLOOM_BYTES * 8) for i in range(BLOOM_HASHES)]
+
+
+def bloom_contains(bits, positions):
+    return bool(bits) and all(bits[position >> 3] & (1 << (position & 7)) for position in positions)
+
+
+def bloom_add(bits, positions):
+    """bits (bytes, empty when new) with positions set"""
+    updated = bytearray(bits or bytes(BLOOM_BYTES))
+    for position in positions:
+        updated[position >> 3] |= 1 << (position & 7)
+    return bytes(updated)
+
+
+_idents = BaseThrottle()
+
+
+def client_fingerprint(request):
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    return hashlib.blake2b(f'{_idents.get_ident(request)}|{user_agent}'.encode(), digest_size=16).hexdigest()
+
+
+def viewer_id(request, user=None):
+    """Identifies the viewer of a request: the user when known, the client fingerprint otherwise"""
+    user = user if user is not None else getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    return f'anon:{client_fingerprint(request)}'
+
+
+class ViewRecorder(WriteBuffer):
+    """Per-process buffer of HyperLogLog updates for the sketch tables"""
+
+    def empty(self):
+        # sketch model -> item pk -> {register index: rank}
+        return defaultdict(lambda: defaultdict(dict))
+
+    def record(self, model, pk, viewer):
+        index, rank = hll_register(viewer)
+        with self.lock:
+            registers = self.pending[model][pk]
+            if rank > registers.get(index, 0):
+                registers[index] = rank
+
+    def write(self, pending):
+        for model, updates in pending.items():
+            merge_views(model, updates)
+
+
+def merge_views(model, updates):
+    """Raise the stored registers of model's rows (keyed by item pk) by updates"""
+    item_field = model._meta.pk
+    item_model = item_field.related_model
+    with transaction.atomic():
+        # The items may have been deleted since they were viewed
+        pks = sorted(item_model._base_manager.filter(pk__in=list(updates)).values_list('pk', flat=True))
+        model.objects.bulk_create([model(**{item_field.attname: pk}) for pk in pks], ignore_conflicts=True)
+        sketches = list(model.objects.select_for_update().filter(pk__in=pks).order_by('pk'))
+        for sketch in sketches:
+            sketch.viewers = hll_merge(sketch.viewers, updates[sketch.pk])
+            sketch.unique_viewers = hll_count(sketch.viewers)
+        model.objects.bulk_update(sketches, ['viewers', 'unique_viewers'], batch_size=500)
+
+
+recorder = ProcessLocal(lambda: ViewRecorder(FLUSH_SECONDS, name='sketch-flush'))
+
+
+def record_view(model, pk, request, user=None):
+    """Count the viewer of request as a viewer of the item with pk, in sketch model"""
+    recorder.get().record(model, pk, viewer_id(request, user))
@@ -0,0 +1,753 @@
+import json
+import shutil
+import tempfile
+import time
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.http import QueryDict
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from authentication.models import UserProfile
+from feeds.models import Post, PostComment, PostImage, PostLike
+from feeds.serializers import PostImageSerializer
+from job_postings.models import Job, JobApplication, JobSketch
+from relationships.models import Follow
+
+from . import accounts, cachebus, images, purge, throttling
+from .accounts import request_account_deletion, run_account_deletion
+from .aio import gather_queries
+from .buffering import ProcessLocal, WriteBuffer
+from .caching import MISSING, TieredCache, handle_message, versions
+from .db import RequestConnections, connection_metrics, wrap_request_queries
+from .images import process_image
+from .instrumentation import QueryBudgetExceeded, collect_timings, request_metrics
+from .models import AccountDeletion, FilePurge
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE, MAX_PAGE_SIZE, get_page_params
+from .purge import delete_with_files, queue_purge, sweep_all
+from .sketches import (
+    BLOOM_CAPACITY, ViewRecorder, bloom_add, bloom_bits, bloom_contains, hll_count, hll_merge, hll_register
+)
+from .routers import begin_request, end_request, use_replica
+from .rows import Column, RowSerializer
+
+
+def slow_title(title):
+    time.sleep(0.01)
+    return title
+
+
+class SlowJobRows(RowSerializer):
+    columns = {'id': 'id', 'title': Column('title', convert=slow_title)}
+
+
+def show_statement_timeout():
+    with connection.cursor() as cursor:
+        cursor.execute('SHOW statement_timeout')
+        return cursor.fetchone()[0]
+
+
+# Not TestCase: gather_queries() workers use their own connections, which
+# would not see (or could be locked out by) an open test transaction
+class DatabaseConnectionTests(TransactionTestCase):
+    def test_requests_without_queries_check_out_no_connection(self):
+        checkouts = connection_metrics.checkouts
+        response = self.client.get(reverse('recommended-jobs'))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(connection_metrics.checkouts, checkouts)
+
+    def test_connection_is_checked_out_on_first_query(self):
+        checkouts = connection_metrics.checkouts
+        response = self.client.get(reverse('job-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(connection_metrics.checkouts, checkouts + 1)
+
+    def test_query_workers_check_out_their_own_connections(self):
+        checkouts = connection_metrics.checkouts
+        response = self.client.get(reverse('job-advanced-search-async'))
+        self.assertEqual(response.status_code, 200)
+        # The count and the page, each on a worker thread
+        self.assertEqual(connection_metrics.checkouts, checkouts + 2)
+
+    @skipUnless(connection.vendor == 'postgresql', 'statement timeouts are PostgreSQL only')
+    def test_statement_timeout_applies_in_query_workers(self):
+        default = show_statement_timeout()
+        with wrap_request_queries(RequestConnections(timeout_ms=1234)):
+            self.assertEqual(show_statement_timeout(), '1234ms')
+            self.assertEqual(async_to_sync(gather_queries)(show_statement_timeout), ['1234ms'])
+        self.assertEqual(show_statement_timeout(), default)
+
+
+class AsyncMiddlewareTests(TransactionTestCase):
+    def setUp(self):
+        request_metrics.reset()
+
+    async def test_async_views_are_not_run_in_a_thread(self):
+        adapted = []
+        def adapt(func, *args, **kwargs):
+            adapted.append(getattr(func, '__module__', None))
+            return sync_to_async(func, *args, **kwargs)
+        with mock.patch('django.core.handlers.base.sync_to_async', adapt):
+            response = await self.async_client.get(reverse('job-advanced-search-async'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('core.middleware', adapted)
+        self.assertNotIn('job_postings.async_views', adapted)
+
+    async def test_async_requests_are_instrumented(self):
+        checkouts = connection_metrics.checkouts
+        response = await self.async_client.get(reverse('job-advanced-search-async'))
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+        self.assertEqual(connection_metrics.checkouts, checkouts + 2)
+        response = await self.async_client.get(reverse('job-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(request_metrics.snapshot()['job-list']['requests'], 1)
+
+
+class RequestInstrumentationTests(TransactionTestCase):
+    def setUp(self):
+        request_metrics.reset()
+        user = User.objects.create_user('employer')
+        Job.objects.bulk_create([Job(
+            posted_by=user, title=f'Python Developer {i}', description='-', company_name='-',
+            location='Remote', job_type='full_time', experience_level='junior', skills_required='python',
+        ) for i in range(3)])
+
+    def test_query_worker_queries_are_counted(self):
+        response = self.client.get(reverse('job-advanced-search-async'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+        self.assertEqual(request_metrics.snapshot()['job-advanced-search-async']['max_queries'], 2)
+
+    @override_settings(QUERY_BUDGETS={'job-advanced-search-async': 1})
+    def test_query_worker_queries_count_against_the_budget(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse('job-advanced-search-async'))
+
+    def test_streamed_body_queries_are_recorded_once_sent(self):
+        response = self.client.get(reverse('job-text-search'), {'search': 'python', 'stream': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('job-text-search', request_metrics.snapshot())
+        body = b''.join(response.streaming_content)
+        metrics = request_metrics.snapshot()['job-text-search']
+        self.assertGreater(metrics['max_queries'], 0)
+        self.assertEqual(metrics['avg_response_bytes'], len(body))
+
+    @override_settings(QUERY_BUDGETS={'job-text-search': 0})
+    def test_streamed_body_queries_count_against_the_budget(self):
+        response = self.client.get(reverse('job-text-search'), {'search': 'python', 'stream': 'true'})
+        with self.assertRaises(QueryBudgetExceeded):
+            b''.join(response.streaming_content)
+
+
+class RowSerializerTimingTests(TestCase):
+    def test_row_serializers_count_as_serializer_time(self):
+        user = User.objects.create_user('employer')
+        Job.objects.bulk_create([Job(
+            posted_by=user, title='Python Developer', description='-', company_name='-',
+            location='-', job_type='full_time', experience_level='junior', skills_required='-',
+        ) for _ in range(2)])
+        with collect_timings() as timings:
+            rows = SlowJobRows.serialize(Job.objects.all())
+            self.assertEqual(len(rows), 2)
+            self.assertGreaterEqual(timings.serializer_seconds, 0.02)
+            self.assertEqual(timings.queries, 1)
+
+            SlowJobRows.many([(1, 'Python Developer')])
+            self.assertGreaterEqual(timings.serializer_seconds, 0.03)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        # Rows only the replica has, so a read shows which database answered it
+        # (bulk_create: the job signals would write to the primary)
+        replicated = User.objects.using('replica').create(username='replicated')
+        Job.objects.using('replica').bulk_create([Job(
+            posted_by=replicated, title='Replicated', description='-', company_name='-',
+            location='-', job_type='full_time', experience_level='junior', skills_required='-',
+        )])
+
+    def route_to_replica(self):
+        state, token = begin_request()
+        self.addCleanup(end_request, token)
+        use_replica(state)
+        return state
+
+    def usernames(self):
+        return list(User.objects.values_list('username', flat=True))
+
+    def test_reads_go_to_the_replica(self):
+        self.route_to_replica()
+        self.assertEqual(self.usernames(), ['replicated'])
+
+    def test_writes_go_to_the_primary(self):
+        self.route_to_replica()
+        user = User.objects.create(username='written')
+        self.assertEqual(user._state.db, 'default')
+        self.assertTrue(User.objects.using('default').filter(username='written').exists())
+        self.assertFalse(User.objects.using('replica').filter(username='written').exists())
+
+    def test_reads_stay_on_the_primary_after_a_write(self):
+        state = self.route_to_replica()
+        User.objects.create(username='written')
+        self.assertTrue(state.wrote)
+        self.assertEqual(self.usernames(), ['written'])
+
+    def test_client_reads_the_primary_after_writing(self):
+        client = APIClient()
+        response = client.get(reverse('job-list'))
+        self.assertEqual([job['title'] for job in response.json()['data']], ['Replicated'])
+
+        user = User.objects.create_user('writer')
+        UserProfile.objects.create(user=user)
+        client.force_authenticate(user)
+        response = client.post(reverse('saved-searches'), {'params': {'search': 'python'}}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        response = client.get(reverse('job-list'))
+        self.assertEqual(response.json()['data'], [])
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class ThrottlingTests(TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        for patcher in (
+            mock.patch.object(throttling, 'time', self.clock),
+            mock.patch.object(throttling, '_leases', {}),
+            mock.patch.object(throttling, '_buckets', throttling.LocalBuckets()),
+            mock.patch.dict(throttling.RATES, {'search': {'anon': (3, 1.0)}}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_parses_rates(self):
+        self.assertEqual(throttling.parse_rate('120/min'), (120, 2.0))
+        self.assertEqual(throttling.parse_rate('10/s'), (10, 10.0))
+
+    def test_bucket_allows_a_burst_then_refills(self):
+        buckets = throttling.LocalBuckets()
+        self.assertEqual(buckets.take('k', 3, 1.0, 5), (3, 0.0))
+        self.assertEqual(buckets.take('k', 3, 1.0, 1), (0, 1.0))
+        self.clock.now += 1.5
+        self.assertEqual(buckets.take('k', 3, 1.0, 2), (1, 0.0))
+
+    def test_leases_never_grant_more_than_the_bucket(self):
+        waits = [throttling.take('k', 20, 1.0) for _ in range(25)]
+        self.assertEqual(waits[:20], [0] * 20)
+        self.assertTrue(all(wait > 0 for wait in waits[20:]))
+        # Leased tokens left unused lapse instead of being handed out later
+        self.clock.now += throttling.LEASE_SECONDS + 1
+        self.assertEqual(throttling.take('k', 20, 1.0), 0)
+
+    def test_store_failures_let_requests_through(self):
+        with mock.patch.object(throttling.LocalBuckets, 'take', side_effect=ConnectionError), \
+                self.assertLogs('core.throttling', 'WARNING'):
+            self.assertEqual(throttling.take('k', 1, 1.0), 0)
+            self.assertEqual(throttling.take('k', 1, 1.0), 0)
+
+    def test_throttled_requests_get_retry_after(self):
+        for name in ('job-advanced-search', 'job-advanced-search-async'):
+            throttling._leases.clear()
+            throttling._buckets.buckets.clear()
+            with self.subTest(name):
+                statuses = [self.client.get(reverse(name)).status_code for _ in range(4)]
+                self.assertEqual(statuses, [200, 200, 200, 429])
+                response = self.client.get(reverse(name))
+                self.assertEqual(response['Retry-After'], '1')
+
+
+def hll_of(values):
+    updates = {}
+    for value in values:
+        index, rank = hll_register(value)
+        updates[index] = max(rank, updates.get(index, 0))
+    return hll_merge(b'', updates)
+
+
+class SketchTests(TestCase):
+    def test_hyperloglog_counts_within_its_error(self):
+        self.assertEqual(hll_count(b''), 0)
+        self.assertEqual(hll_count(hll_of(['a', 'b', 'c', 'a'])), 3)
+        for count in (1000, 50000):
+            estimate = hll_count(hll_of(range(count)))
+            # Four standard errors (1.6% each)
+            self.assertLess(abs(estimate - count) / count, 0.065, count)
+
+    def test_hyperloglog_merges_commute_and_repeat_harmlessly(self):
+        first, second = hll_of(range(0, 3000)), hll_of(range(2000, 5000))
+        merged = hll_merge(first, dict(enumerate(second)))
+        self.assertEqual(merged, hll_merge(second, dict(enumerate(first))))
+        self.assertEqual(merged, hll_merge(merged, dict(enumerate(second))))
+        self.assertEqual(merged, hll_of(range(5000)))
+
+    def test_bloom_filter_has_no_false_negatives_and_few_false_positives(self):
+        bits = b''
+        for n in range(BLOOM_CAPACITY):
+            bits = bloom_add(bits, bloom_bits(f'in:{n}'))
+        self.assertTrue(all(bloom_contains(bits, bloom_bits(f'in:{n}')) for n in range(BLOOM_CAPACITY)))
+        false_positives = sum(bloom_contains(bits, bloom_bits(f'out:{n}')) for n in range(10000))
+        self.assertLess(false_positives, 200)
+        self.assertFalse(bloom_contains(b'', bloom_bits('in:0')))
+
+    def test_recorded_views_merge_into_the_stored_sketch(self):
+        user = User.objects.create_user('employer')
+        job, deleted = Job.objects.bulk_create([Job(
+            posted_by=user, title='Python Developer', description='-', company_name='-',
+            location='-', job_type='full_time', experience_level='junior', skills_required='-',
+        ) for _ in range(2)])
+        recorder = ViewRecorder()
+        for viewer in ('user:1', 'user:2', 'user:1'):
+            recorder.record(JobSketch, job.pk, viewer)
+        recorder.record(JobSketch, deleted.pk, 'user:1')
+        deleted.delete()
+        recorder.flush()
+        self.assertEqual(JobSketch.objects.get(pk=job.pk).unique_viewers, 2)
+        self.assertFalse(JobSketch.objects.filter(pk=deleted.pk).exists())
+
+        # Only the new viewer raises the count
+        recorder.record(JobSketch, job.pk, 'user:2')
+        recorder.record(JobSketch, job.pk, 'user:3')
+        recorder.flush()
+        self.assertEqual(JobSketch.objects.get(pk=job.pk).unique_viewers, 3)
+
+
+class Hits(WriteBuffer):
+    def empty(self):
+        return []
+
+    def add(self, key):
+        with self.lock:
+            self.pending.append(key)
+
+    def write(self, pending):
+        self.written.append(pending)
+
+
+class WriteBufferTests(SimpleTestCase):
+    def setUp(self):
+        self.hits = Hits()
+        self.hits.written = []
+
+    def test_flush_writes_what_is_pending_once(self):
+        self.hits.add('a')
+        self.hits.add('b')
+        self.hits.flush()
+        self.hits.flush()
+        self.assertEqual(self.hits.written, [['a', 'b']])
+        self.assertEqual(self.hits.snapshot(), {'pending': 0, 'flushes': 1, 'failures': 0})
+
+    def test_failed_writes_are_dropped(self):
+        self.hits.add('a')
+        with mock.patch.object(Hits, 'write', side_effect=RuntimeError), self.assertRaises(RuntimeError):
+            self.hits.flush()
+        self.hits.flush()
+        self.assertEqual(self.hits.written, [])
+
+    def test_close_flushes_only_in_the_creating_process(self):
+        self.hits.add('a')
+        self.hits.pid += 1
+        self.hits.close()
+        self.assertEqual(self.hits.written, [])
+        self.hits.pid -= 1
+        self.hits.close()
+        self.assertEqual(self.hits.written, [['a']])
+
+    def test_process_local_is_recreated_after_a_fork(self):
+        local = ProcessLocal(Hits)
+        first = local.get()
+        self.assertIs(local.get(), first)
+        first.pid += 1
+        self.assertIsNot(local.get(), first)
+
+
+def make_job(posted_by, **fields):
+    return Job.objects.create(posted_by=posted_by, **{
+        'title': 'Python Developer', 'description': '-', 'company_name': '-', 'location': '-',
+        'job_type': 'full_time', 'experience_level': 'junior', 'skills_required': 'python', **fields,
+    })
+
+
+# The sweeper thread would race the test transaction; the purge tests sweep directly
+@override_settings(FILE_PURGE_IN_PROCESS=False)
+class AccountDeletionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('leaving', password='secret')
+        UserProfile.objects.create(user=self.user)
+        self.other = User.objects.create_user('staying')
+        UserProfile.objects.create(user=self.other)
+        self.job = make_job(self.user)
+        JobApplication.objects.create(job=self.job, applicant=self.other)
+        self.post = Post.objects.create(author=self.user, title='Hello')
+        PostImage.objects.create(post=self.post, image='posts/hello.jpg')
+        PostComment.objects.create(post=self.post, author=self.other, content='Hi')
+        Follow.objects.create(follower=self.other, following=self.user)
+
+        # The leaving user liked and commented on someone else's post
+        self.liked = Post.objects.create(author=self.other, likes_count=2, comments_count=3)
+        PostLike.objects.create(post=self.liked, user=self.user)
+        PostLike.objects.create(post=self.liked, user=self.other)
+        PostComment.objects.bulk_create([
+            PostComment(post=self.liked, author=author, content='-') for author in (self.user, self.user, self.other)
+        ])
+
+    def test_wrong_password_is_rejected(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.delete(reverse('account_delete'), {'password': 'wrong'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(User.objects.get(pk=self.user.pk).is_active)
+        self.assertFalse(AccountDeletion.objects.exists())
+
+    def test_account_and_content_are_hidden_at_once(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = client.delete(reverse('account_delete'), {'password': 'secret'}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(User.objects.get(pk=self.user.pk).is_active)
+        self.assertFalse(Job.objects.filter(posted_by=self.user, is_active=True).exists())
+        self.assertFalse(Post.objects.filter(author=self.user, is_active=True).exists())
+        # The rows themselves go in the background
+        self.assertTrue(Job.objects.filter(posted_by=self.user).exists())
+        self.assertEqual(AccountDeletion.objects.get(user_pk=self.user.pk).status, 'pending')
+
+    def run_deletion(self):
+        return run_account_deletion(request_account_deletion(self.user))
+
+    def assert_deleted(self, deletion):
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(Job.objects.filter(posted_by_id=self.user.pk).exists())
+        self.assertFalse(JobApplication.objects.filter(job_id=self.job.pk).exists())
+        self.assertFalse(Post.objects.filter(author_id=self.user.pk).exists())
+        self.assertFalse(PostComment.objects.filter(author_id=self.user.pk).exists())
+        self.assertFalse(Follow.objects.filter(following_id=self.user.pk).exists())
+        self.assertEqual(deletion.status, 'done')
+        self.assertEqual(deletion.progress, deletion.planned)
+        self.assertIn('posts/hello.jpg', FilePurge.objects.values_list('name', flat=True))
+
+    def test_chunked_deletion_removes_every_row(self):
+        with mock.patch.object(accounts, 'CHUNK_SIZE', 1):
+            deletion = self.run_deletion()
+        self.assert_deleted(deletion)
+        self.assertTrue(User.objects.filter(pk=self.other.pk).exists())
+        self.assertEqual(deletion.progress['feeds.PostComment'], 3)
+
+    def test_counters_on_other_posts_are_decreased(self):
+        self.run_deletion()
+        self.liked.refresh_from_db()
+        self.assertEqual((self.liked.likes_count, self.liked.comments_count), (1, 1))
+
+    def test_failed_chunk_can_be_resumed(self):
+        delete_chunk = accounts._delete_chunk
+        calls = []
+
+        def flaky(model, ids):
+            calls.append(model)
+            if len(calls) == 3:
+                raise RuntimeError('connection lost')
+            delete_chunk(model, ids)
+
+        deletion = request_account_deletion(self.user)
+        with mock.patch.object(accounts, 'CHUNK_SIZE', 1), mock.patch.object(accounts, '_delete_chunk', flaky):
+            with self.assertLogs('core.accounts', 'ERROR'):
+                accounts._run_in_background(deletion.pk)
+        deletion.refresh_from_db()
+        self.assertEqual((deletion.status, deletion.error), ('failed', 'connection lost'))
+        self.assertEqual(sum(deletion.progress.values()), 2)
+
+        self.assert_deleted(run_account_deletion(deletion))
+        self.liked.refresh_from_db()
+        self.assertEqual((self.liked.likes_count, self.liked.comments_count), (1, 1))
+
+
+def use_temporary_media(test):
+    """Point default_storage at a fresh MEDIA_ROOT for the rest of the test"""
+    root = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, root, ignore_errors=True)
+    media = override_settings(MEDIA_ROOT=root)
+    media.enable()
+    test.addCleanup(media.disable)
+
+
+@override_settings(FILE_PURGE_IN_PROCESS=False)
+class FilePurgeTests(TestCase):
+    def setUp(self):
+        use_temporary_media(self)
+        self.user = User.objects.create_user('author')
+        self.post = Post.objects.create(author=self.user, title='Hello')
+        self.image = PostImage.objects.create(post=self.post, image=self.store('posts/hello.jpg'), image_variants={
+            'source': 'posts/hello.jpg',
+            'sizes': {'thumbnail': {'name': self.store('posts/variants/hello_thumbnail.webp')}},
+        })
+
+    def store(self, name):
+        return default_storage.save(name, ContentFile(b'-'))
+
+    def queued(self):
+        return set(FilePurge.objects.values_list('name', flat=True))
+
+    def test_cascaded_files_are_queued_and_swept_after_commit(self):
+        with mock.patch.object(purge, 'start_sweeper') as start_sweeper:
+            with self.captureOnCommitCallbacks(execute=True):
+                delete_with_files(self.user)
+                self.assertEqual(self.queued(), {'posts/hello.jpg', 'posts/variants/hello_thumbnail.webp'})
+                start_sweeper.assert_not_called()
+            start_sweeper.assert_called_once_with()
+        self.assertFalse(PostImage.objects.exists())
+        # Still on disk until the sweeper runs
+        self.assertTrue(default_storage.exists('posts/hello.jpg'))
+
+    def test_rolled_back_delete_queues_nothing(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                delete_with_files(self.post)
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.queued(), set())
+        self.assertTrue(PostImage.objects.exists())
+
+    def test_sweeper_deletes_and_dequeues(self):
+        delete_with_files(self.post)
+        stuck = self.store('posts/stuck.jpg')
+        queue_purge({stuck})
+        delete = default_storage.delete
+
+        def flaky_delete(name):
+            if name == stuck:
+                raise OSError('busy')
+            delete(name)
+
+        with mock.patch.object(default_storage, 'delete', flaky_delete):
+            self.assertEqual(sweep_all(), (2, 1))
+        self.assertFalse(default_storage.exists('posts/hello.jpg'))
+        self.assertFalse(default_storage.exists('posts/variants/hello_thumbnail.webp'))
+        retry = FilePurge.objects.get()
+        self.assertEqual((retry.name, retry.attempts, retry.last_error), (stuck, 1, 'busy'))
+        self.assertGreater(retry.next_attempt_at, timezone.now())
+
+        # Not due yet, so the command leaves it alone
+        call_command('purge_files', stdout=StringIO())
+        self.assertEqual(FilePurge.objects.count(), 1)
+
+    def test_orphan_scan_spares_referenced_files(self):
+        orphan = self.store('posts/orphan.jpg')
+        out = StringIO()
+        call_command('scan_orphan_files', '--min-age', '0', '--purge', stdout=out)
+        self.assertIn('1 orphaned', out.getvalue())
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertTrue(default_storage.exists('posts/hello.jpg'))
+        self.assertTrue(default_storage.exists('posts/variants/hello_thumbnail.webp'))
+        self.assertEqual(self.queued(), set())
+
+
+def image_upload(name, size, image_format='JPEG'):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'teal').save(buffer, image_format)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class InlineExecutor:
+    def submit(self, func, *args):
+        func(*args)
+
+
+@override_settings(FILE_PURGE_IN_PROCESS=False)
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        use_temporary_media(self)
+        self.user = User.objects.create_user('author')
+        UserProfile.objects.create(user=self.user)
+        self.post = Post.objects.create(author=self.user)
+
+    def add_image(self, size):
+        return PostImage.objects.create(post=self.post, image=image_upload('photo.jpg', size))
+
+    def test_variants_are_webp_within_their_bounds(self):
+        image = self.add_image((2000, 1000))
+        variants = process_image(PostImage, image.pk, 'image')
+        self.assertEqual((variants['source'], variants['width'], variants['height']), (image.image.name, 2000, 1000))
+        bounds = {size: (entry['width'], entry['height']) for size, entry in variants['sizes'].items()}
+        self.assertEqual(bounds, {'thumbnail': (320, 160), 'medium': (768, 384), 'large': (1600, 800)})
+        for entry in variants['sizes'].values():
+            with default_storage.open(entry['name']) as f, Image.open(f) as stored:
+                self.assertEqual((stored.format, stored.size), ('WEBP', (entry['width'], entry['height'])))
+        image.refresh_from_db()
+        self.assertEqual(image.image_variants, variants)
+
+    def test_small_images_are_not_upscaled(self):
+        image = self.add_image((500, 250))
+        sizes = process_image(PostImage, image.pk, 'image')['sizes']
+        self.assertEqual((sizes['thumbnail']['width'], sizes['medium']['width']), (320, 500))
+        self.assertEqual(sizes['large'], sizes['medium'])
+
+    def test_serializer_emits_variant_urls(self):
+        image = self.add_image((1000, 1000))
+        process_image(PostImage, image.pk, 'image')
+        image.refresh_from_db()
+        request = RequestFactory().get('/')
+        data = PostImageSerializer(image, context={'request': request}).data['image_variants']
+        self.assertEqual(set(data['sizes']), {'thumbnail', 'medium', 'large'})
+        thumbnail = data['sizes']['thumbnail']
+        self.assertTrue(thumbnail['url'].startswith('http://testserver/'))
+        self.assertTrue(thumbnail['url'].endswith('_thumbnail.webp'))
+        self.assertIn(f"{thumbnail['url']} 320w", data['srcset'])
+
+        # A replaced image has no variants until they are generated again
+        image.image = 'posts/other.jpg'
+        self.assertIsNone(PostImageSerializer(image, context={'request': request}).data['image_variants'])
+
+    def test_corrupt_image_does_not_break_post_creation(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        corrupt = SimpleUploadedFile('broken.jpg', b'not an image', content_type='image/jpeg')
+        with (
+            mock.patch.object(images, 'get_executor', return_value=InlineExecutor()),
+            # It would close the test transaction's connection
+            mock.patch.object(images, 'close_old_connections'),
+            self.assertLogs('core.images', 'ERROR'),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            response = client.post(reverse('post-create'), {'title': 'Broken', 'images': [corrupt]}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        image = response.json()['data']['images'][0]
+        self.assertIsNone(image['image_variants'])
+        self.assertEqual(PostImage.objects.get(pk=image['id']).image_variants, {})
+
+
+tiered = TieredCache('tests', 'core.FilePurge', timeout=60)
+
+
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        versions.local.clear()
+        tiered.l1.clear()
+        tiered.l1_hits = tiered.l2_hits = tiered.misses = 0
+
+    def test_reads_fill_l1_from_l2(self):
+        compute = mock.Mock(return_value='value')
+        self.assertIsNone(tiered.get('key'))
+        self.assertEqual(tiered.get_or_set('key', compute), 'value')
+        self.assertEqual(tiered.get_or_set('key', compute), 'value')
+        compute.assert_called_once_with()
+        self.assertEqual((tiered.l1_hits, tiered.l2_hits, tiered.misses), (1, 0, 2))
+
+        # Another process, or this one once its L1 entry expired
+        tiered.l1.clear()
+        self.assertEqual(tiered.get('key'), 'value')
+        self.assertEqual(tiered.get('key'), 'value')
+        self.assertEqual((tiered.l1_hits, tiered.l2_hits), (2, 1))
+
+    def test_version_bumps_stale_every_entry(self):
+        tiered.set_many({'a': 1, 'b': 2})
+        version = versions.get('core.FilePurge')
+        self.assertEqual(versions.bump('core.FilePurge'), version + 1)
+        self.assertIsNone(tiered.get('a'))
+        self.assertEqual(tiered.get_or_set('b', lambda: 3), 3)
+
+    def test_versions_only_move_forward(self):
+        version = versions.get('core.FilePurge')
+        versions.receive('core.FilePurge', version - 1)
+        self.assertEqual(versions.get('core.FilePurge'), version)
+        versions.receive('core.FilePurge', version + 5)
+        self.assertEqual(versions.get('core.FilePurge'), version + 5)
+
+    def test_deletes_reach_the_l1_of_every_process(self):
+        tiered.set('key', 'value')
+        full_key = tiered.make_key('key')
+        with mock.patch.object(cachebus, 'publish') as publish:
+            tiered.delete('key')
+        publish.assert_called_once_with({'cache': 'tests', 'keys': [full_key]}, True)
+        # The message as another process receives it
+        tiered.set('key', 'value')
+        handle_message({'cache': 'tests', 'keys': [full_key]})
+        self.assertIs(tiered.l1.get(full_key), MISSING)
+        self.assertIsNone(tiered.get('key'))
+
+
+class CacheBusTests(SimpleTestCase):
+    def setUp(self):
+        self.received = []
+        handlers = mock.patch.object(cachebus, 'handlers', [self.received.append])
+        handlers.start()
+        self.addCleanup(handlers.stop)
+
+    def test_local_bus_reaches_only_this_process(self):
+        bus = cachebus.Bus()
+        bus.publish({'cache': 'tests', 'keys': ['a']})
+        bus.publish({'cache': 'tests', 'keys': ['b']}, local=False)
+        self.assertEqual(self.received, [{'cache': 'tests', 'keys': ['a']}])
+        self.assertEqual(bus.snapshot()['published'], 2)
+
+    def test_unix_bus_reaches_the_other_sockets(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        sender, receiver = cachebus.create_bus(f'unix://{directory}'), cachebus.create_bus(f'unix://{directory}')
+        self.addCleanup(sender.close)
+        self.addCleanup(receiver.close)
+
+        sender.publish({'version': 'core.FilePurge', 'value': 7}, local=False)
+        deadline = time.monotonic() + 5
+        while not self.received and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.received, [{'version': 'core.FilePurge', 'value': 7}])
+        self.assertEqual((receiver.received, sender.received), (1, 0))
+
+
+class PaginationTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('employer')
+        for i in range(3):
+            make_job(user, title=f'Python Developer {i}')
+
+    def test_page_params_are_bounded(self):
+        def params(query_string):
+            return get_page_params(QueryDict(query_string))
+
+        self.assertEqual(params(''), (1, DEFAULT_PAGE_SIZE, 0, DEFAULT_PAGE_SIZE))
+        self.assertEqual(params('page=3&page_size=5'), (3, 5, 10, 15))
+        self.assertEqual(params(f'page_size={MAX_PAGE_SIZE + 1}')[1], MAX_PAGE_SIZE)
+        self.assertEqual(params(f'page={10 ** 30}')[0], MAX_PAGE)
+        for invalid in ('page=0&page_size=-2', 'page=two&page_size=', 'page=1.5&page_size=1e3'):
+            self.assertEqual(params(invalid)[:2], (1, DEFAULT_PAGE_SIZE))
+
+    def test_huge_pages_are_empty(self):
+        for name in ('job-list', 'job-advanced-search'):
+            response = self.client.get(reverse(name), {'page': 10 ** 30})
+            self.assertEqual(response.status_code, 200, name)
+            self.assertEqual((response.json()['page'], response.json()['data']), (MAX_PAGE, []), name)
+
+    @mock.patch('core.pagination.MAX_STREAM_ROWS', 2)
+    def test_streams_stop_at_max_stream_rows(self):
+        response = self.client.get(reverse('job-text-search'), {'search': 'python', 'stream': 'true'})
+        body = json.loads(b''.join(response.streaming_content))
+        self.assertEqual((len(body['data']), body['count'], body['truncated']), (2, 2, True))
+
+    def test_streams_end_with_the_rows(self):
+        response = self.client.get(reverse('job-text-search'), {'search': 'python', 'stream': 'true'})
+        body = json.loads(b''.join(response.streaming_content))
+        self.assertEqual((len(body['data']), body['count'], body['truncated']), (3, 3, False))
@@ -0,0 +1,197 @@
+"""
+Token-bucket rate limits by endpoint class.
+
+A view opts in with an endpoint class, like statement_timeout:
+
+    class JobSearchAPI(APIView):
+        throttle_scope = 'search'
+
+settings.THROTTLE_BUCKETS gives each scope a rate for authenticated users,
+keyed by user id, and one for anonymous clients, keyed by IP (DRF's
+get_ident, which honours NUM_PROXIES). 'N/period' is a bucket of N tokens
+refilled at N per period: a client can burst N requests, then sustain the
+rate. A refused request gets 429 with Retry-After.
+
+Buckets live in Redis when the shared cache is Redis (REDIS_URL), where one
+Lua script refills and takes tokens atomically, so every worker enforces
+the same limit. Otherwise they are per process. The shared store is kept
+off the hot path by leases: a process takes tokens in batches and hands
+them out locally. An allowed request then costs a dict lookup, a clock
+read and a next() on an itertools.count, which is atomic under the GIL, so
+no lock is taken. Lease size starts at one token and doubles each time a
+client uses up a whole lease, up to a tenth of the bucket. Slow clients
+therefore never strand tokens, and leased tokens that are not used within
+LEASE_SECONDS lapse.
+
+If the shared store fails, requests are let through.
+"""
+import itertools
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.throttling import BaseThrottle
+
+
+logger = logging.getLogger(__name__)
+
+LEASE_SECONDS = getattr(settings, 'THROTTLE_LEASE_SECONDS', 1.0)
+# Leases are at most this fraction of the bucket
+LEASE_FRACTION = 10
+# Expired leases and full local buckets are pruned past this many keys
+MAX_KEYS = 100000
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'N/period' -> (bucket size, tokens per second)"""
+    count, _, period = rate.partition('/')
+    count = int(count)
+    return count, count / PERIODS[period.strip()[0]]
+
+
+# scope -> {'user' or 'anon': (bucket size, tokens per second)}
+RATES = {
+    scope: {kind: parse_rate(rate) for kind, rate in kinds.items()}
+    for scope, kinds in getattr(settings, 'THROTTLE_BUCKETS', {}).items()
+}
+
+
+class LocalBuckets:
+    """Buckets in this process's memory"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def take(self, key, capacity, rate, want):
+        """(tokens granted, seconds until one is available when none was)"""
+        now = time.monotonic()
+        with self.lock:
+            tokens, stamp, _ = self.buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - stamp) * rate)
+            granted = min(want, int(tokens))
+            tokens -= granted
+            self.buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            if len(self.buckets) > MAX_KEYS:
+                # A bucket that is full again is the same as no bucket
+                self.buckets = {key: bucket for key, bucket in self.buckets.items() if bucket[2] > now}
+        return granted, 0.0 if granted else (1 - tokens) / rate
+
+
+# KEYS[1] bucket; ARGV: bucket size, tokens per second, tokens wanted.
+# Returns {granted, seconds to wait as a string}; Redis truncates Lua numbers to integers.
+BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local want = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+local tokens = tonumber(state[1]) or capacity
+local stamp = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - stamp) * rate)
+local granted = math.min(want, math.floor(tokens))
+tokens = tokens - granted
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'stamp', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+local wait = 0
+if granted == 0 then
+    wait = (1 - tokens) / rate
+end
+return {granted, tostring(wait)}
+"""
+
+
+class RedisBuckets:
+    """Buckets shared by every process through the Redis cache"""
+
+    def __init__(self, backend):
+        self.script = backend._cache.get_client(write=True).register_script(BUCKET_SCRIPT)
+
+    def take(self, key, capacity, rate, want):
+        granted, wait = self.script(keys=[f'throttle:{key}'], args=[capacity, rate, want])
+        return int(granted), float(wait)
+
+
+class Lease:
+    __slots__ = ('size', 'counter', 'expires_at')
+
+    def __init__(self, size):
+        self.size = size
+        self.counter = itertools.count()
+        self.expires_at = time.monotonic() + LEASE_SECONDS
+
+
+_leases = {}
+_buckets = None
+_idents = BaseThrottle()
+
+
+def get_buckets():
+    global _buckets
+    if _buckets is None:
+        backend = caches['default']
+        _buckets = RedisBuckets(backend) if isinstance(backend, RedisCache) else LocalBuckets()
+    return _buckets
+
+
+def take(key, capacity, rate):
+    """0 when a token was taken for key, else seconds until one is available"""
+    global _leases
+    lease = _leases.get(key)
+    now = time.monotonic()
+    if lease is not None and lease.expires_at > now and next(lease.counter) < lease.size:
+        return 0
+    # Used up within its lifetime: the client is busy, so lease more next time
+    want = min(lease.size * 2, max(1, capacity // LEASE_FRACTION)) if lease and lease.expires_at > now else 1
+    try:
+        granted, wait = get_buckets().take(key, capacity, rate, want)
+    except Exception:
+        logger.warning('Rate limit check failed; allowing the request', exc_info=True)
+        return 0
+    if not granted:
+        return wait
+    # This request takes the first token
+    lease = Lease(granted)
+    next(lease.counter)
+    _leases[key] = lease
+    if len(_leases) > MAX_KEYS:
+        _leases = {key: lease for key, lease in _leases.items() if lease.expires_at > now}
+    return 0
+
+
+def client_key(request, scope, user=None):
+    """(bucket key, rate) for the client of request in scope, or None when scope is not limited"""
+    rates = RATES.get(scope)
+    if not rates:
+        return None
+    if user is not None and user.is_authenticated:
+        kind, ident = 'user', user.pk
+    else:
+        kind, ident = 'anon', _idents.get_ident(request)
+    rate = rates.get(kind)
+    return (f'{scope}:{kind}:{ident}', rate) if rate else None
+
+
+def throttle_wait(request, scope, user=None):
+    """0 when the request may proceed, else seconds to wait"""
+    bucket = client_key(request, scope, user)
+    return take(bucket[0], *bucket[1]) if bucket else 0
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Applies settings.THROTTLE_BUCKETS to views with a throttle_scope"""
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        self.wait_seconds = throttle_wait(request, scope, request.user) if scope else 0
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
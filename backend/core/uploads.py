@@ -0,0 +1,80 @@
+"""
+Storing several uploaded files for one request.
+
+Saving FileField values one model at a time writes the files one after
+another inside the request, and a failure halfway leaves some rows and
+files behind. store_files() writes a batch of uploads concurrently on a
+thread pool, before any transaction is opened, so no database locks are
+held during storage I/O. stored_files() then guards the transaction that
+creates the rows: if anything fails, the files written for it are deleted
+again.
+
+    with stored_files(field, request.FILES.getlist('images')) as names, transaction.atomic():
+        post = Post.objects.create(...)
+        PostImage.objects.bulk_create(PostImage(post=post, image=name) for name in names)
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_WORKERS = getattr(settings, 'UPLOAD_WORKERS', 4)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix='uploads')
+    return _executor
+
+
+def delete_files(storage, names):
+    """Best-effort delete; a failure is logged and does not stop the rest"""
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.warning('Could not delete %s', name, exc_info=True)
+
+
+def _save(field, instance, upload):
+    name = field.generate_filename(instance, upload.name)
+    return field.storage.save(name, upload, max_length=field.max_length)
+
+
+def store_files(field, uploads, instance=None):
+    """
+    Write uploads to field's storage concurrently and return their stored
+    names in upload order. On any failure the files already written are
+    deleted and the first error is raised.
+    """
+    if len(uploads) <= 1:
+        return [_save(field, instance, upload) for upload in uploads]
+    futures = [get_executor().submit(_save, field, instance, upload) for upload in uploads]
+    names, error = [], None
+    for future in futures:
+        try:
+            names.append(future.result())
+        except Exception as e:
+            error = error or e
+    if error is not None:
+        delete_files(field.storage, names)
+        raise error
+    return names
+
+
+@contextmanager
+def stored_files(field, uploads, instance=None):
+    """store_files() for the duration of a block; the files are deleted if the block raises"""
+    names = store_files(field, uploads, instance)
+    try:
+        yield names
+    except BaseException:
+        delete_files(field.storage, names)
+        raise
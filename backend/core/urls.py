@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import CacheMetricsAPI, DatabaseMetricsAPI, RequestMetricsAPI
+
+urlpatterns = [
+    path('db/', DatabaseMetricsAPI.as_view(), name='metrics-db'),
+    path('requests/', RequestMetricsAPI.as_view(), name='metrics-requests'),
+    path('cache/', CacheMetricsAPI.as_view(), name='metrics-cache'),
+]
@@ -0,0 +1,80 @@
+import os
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import AllowAny, IsAdminUser
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from .caching import cache_metrics
+from .db import connection_metrics
+from .instrumentation import request_metrics
+from .warmup import is_warm, state as warmup_state
+
+
+class DatabaseMetricsAPI(APIView):
+    """Admin: connection checkout metrics for this worker process"""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        db_settings = settings.DATABASES['default']
+        return Response({
+            'message': 'Database metrics retrieved successfully',
+            'data': {
+                'pool_enabled': 'pool' in db_settings.get('OPTIONS', {}),
+                'conn_max_age': db_settings.get('CONN_MAX_AGE', 0),
+                'vendor': connection.vendor,
+                'connections': connection_metrics.snapshot(),
+            }
+        }, status=status.HTTP_200_OK)
+
+
+class RequestMetricsAPI(APIView):
+    """Admin: per-URL-name request timings and query counts for this worker process"""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        return Response({
+            'message': 'Request metrics retrieved successfully',
+            'data': request_metrics.snapshot()
+        }, status=status.HTTP_200_OK)
+    
+    def delete(self, request):
+        request_metrics.reset()
+        return Response({'message': 'Request metrics reset successfully'}, status=status.HTTP_200_OK)
+
+
+class CacheMetricsAPI(APIView):
+    """Admin: two-level cache hit ratios and evictions, and invalidation bus counters, for this worker process"""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        return Response({
+            'message': 'Cache metrics retrieved successfully',
+            'data': cache_metrics()
+        }, status=status.HTTP_200_OK)
+
+
+class HealthAPI(APIView):
+    """Readiness probe: 200 once this process has warmed its caches and reaches the database and cache"""
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        checks = {'warmup': warmup_state['status']}
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            checks['database'] = 'ok'
+        except Exception as e:
+            checks['database'] = str(e)
+        try:
+            cache.set('health:ping', 1, 10)
+            checks['cache'] = 'ok' if cache.get('health:ping') == 1 else 'miss'
+        except Exception as e:
+            checks['cache'] = str(e)
+        ready = is_warm() and checks['database'] == 'ok' and checks['cache'] == 'ok'
+        data = {'status': 'ok' if ready else 'unavailable', 'checks': checks}
+        if 'SERVER_MASTER_PID' in os.environ:
+            data['master'] = int(os.environ['SERVER_MASTER_PID'])
+        return Response(data, status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE)
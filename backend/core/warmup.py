@@ -0,0 +1,76 @@
+"""
+Cache warm-up at server start.
+
+warm_caches() runs every function in settings.CACHE_WARMERS once (the job
+typeahead index and job facets). wsgi.py and asgi.py call
+it on import. Under the production server (serve.py / gunicorn.conf.py) the
+app is preloaded in the master process and the warm-up runs there before
+any worker is forked, so each worker starts with warm process-local caches
+that share memory with the master until written. Elsewhere (runserver,
+plain uvicorn) it runs in a background thread so startup is not delayed.
+
+The health endpoint reports the warm-up state of the serving process; it
+is not ready until the warm-up has finished.
+"""
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WARMERS = [
+    'job_postings.autocomplete.warm_autocomplete',
+    'job_postings.facets.warm_job_facets',
+]
+
+# Set by gunicorn.conf.py, which loads before the app does
+SYNC_ENV = 'WARM_CACHES_SYNC'
+
+_lock = threading.Lock()
+state = {'status': 'pending', 'started_at': None, 'seconds': {}, 'errors': {}}
+
+
+def _warm():
+    state['status'], state['started_at'] = 'running', time.time()
+    for path in getattr(settings, 'CACHE_WARMERS', DEFAULT_WARMERS):
+        started = time.perf_counter()
+        try:
+            import_string(path)()
+        except Exception as e:
+            # A cold cache is slower, not broken; the process still serves
+            logger.exception('Cache warmer %s failed', path)
+            state['errors'][path] = str(e)
+        state['seconds'][path] = round(time.perf_counter() - started, 3)
+    state['status'] = 'done'
+    logger.info('Caches warmed in %.2fs', time.time() - state['started_at'])
+
+
+def _warm_in_background():
+    from django.db import close_old_connections
+    try:
+        _warm()
+    finally:
+        close_old_connections()
+
+
+def warm_caches(background=None):
+    """Warm once per process; synchronously when SYNC_ENV is set, else in a background thread"""
+    with _lock:
+        if state['status'] != 'pending':
+            return
+        state['status'] = 'running'
+    if background is None:
+        background = not os.environ.get(SYNC_ENV)
+    if background:
+        threading.Thread(target=_warm_in_background, daemon=True).start()
+    else:
+        _warm()
+
+
+def is_warm():
+    return state['status'] == 'done'
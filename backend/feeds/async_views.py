@@ -0,0 +1,48 @@
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.views import View
+from core.aio import (
+    authenticate, gather_queries, paginated_response,
+    unauthorized_response, error_response
+)
+from core.pagination import get_page_params
+from relationships.models import Follow
+from .models import Post
+from .serializers import PostListSerializer
+from .views import with_list_relations
+
+
+def _serialize_posts(posts, request):
+    return PostListSerializer(posts, many=True, context={'request': request}).data
+
+
+class AsyncPostFeedView(View):
+    """Async PostListAPI (feed), paginated; count and page are fetched concurrently"""
+    read_replica = True
+    
+    async def get(self, request):
+        user = await authenticate(request)
+        if user is None:
+            return unauthorized_response()
+        
+        try:
+            # Posts from followed users + own posts
+            following_users = Follow.objects.filter(follower=user).values('following')
+            posts = Post.objects.filter(
+                Q(author__in=following_users) | Q(author=user),
+                is_active=True
+            )
+            
+            # Filter by post type if provided
+            post_type = request.GET.get('type')
+            if post_type:
+                posts = posts.filter(post_type=post_type)
+            
+            page, page_size, start, end = get_page_params(request.GET)
+            posts_page = with_list_relations(posts)[start:end]
+            
+            total_count, posts_page = await gather_queries(posts.count, lambda: list(posts_page))
+            data = await sync_to_async(_serialize_posts)(posts_page, request)
+            return paginated_response('Feed retrieved successfully', total_count, page, page_size, data)
+        except Exception as e:
+            return error_response(e)
@@ -0,0 +1,50 @@
+"""
+Anonymous likes, one per client and post.
+
+PostLikeByImageAPI used to add one to likes_count for every anonymous POST,
+so reloading a page and liking again inflated the count without bound.
+Each post now keeps a Bloom filter of the fingerprints of the clients that
+liked it (core.sketches) in its PostSketch. A like counts only when the
+fingerprint is in neither generation of the filter. The current generation
+becomes the previous one once it holds BLOOM_CAPACITY likes or is older
+than ANONYMOUS_LIKE_WINDOW, which keeps false positives near 1% and lets a
+client like a post again after one to two windows.
+
+A false positive drops a like that should have counted. A false negative
+cannot happen within a window.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.sketches import BLOOM_CAPACITY, bloom_add, bloom_bits, bloom_contains
+
+from .models import Post, PostSketch
+
+
+WINDOW = timedelta(days=getattr(settings, 'ANONYMOUS_LIKE_WINDOW_DAYS', 30))
+
+
+def add_anonymous_like(post, fingerprint):
+    """Count a like of post by the anonymous client fingerprint; False when it already liked it"""
+    positions = bloom_bits(fingerprint)
+    with transaction.atomic():
+        # The sketch row serialises anonymous likes of one post
+        PostSketch.objects.bulk_create([PostSketch(post=post)], ignore_conflicts=True)
+        sketch = PostSketch.objects.select_for_update().get(post=post)
+        if bloom_contains(sketch.likers, positions) or bloom_contains(sketch.previous_likers, positions):
+            return False
+        now = timezone.now()
+        if sketch.likers_added >= BLOOM_CAPACITY or now - sketch.likers_rotated_at >= WINDOW:
+            sketch.previous_likers, sketch.likers = sketch.likers, b''
+            sketch.likers_added = 0
+            sketch.likers_rotated_at = now
+        sketch.likers = bloom_add(sketch.likers, positions)
+        sketch.likers_added += 1
+        sketch.save(update_fields=['likers', 'previous_likers', 'likers_added', 'likers_rotated_at'])
+        Post.objects.filter(pk=post.pk).update(likes_count=F('likes_count') + 1)
+    post.refresh_from_db(fields=['likes_count'])
+    return True
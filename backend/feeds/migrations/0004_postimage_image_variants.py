@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feeds', '0003_remove_post_image_postimage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postimage',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
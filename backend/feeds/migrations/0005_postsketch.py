@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:27
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feeds', '0004_postimage_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSketch',
+            fields=[
+                ('viewers', models.BinaryField(default=bytes)),
+                ('unique_viewers', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sketch', serialize=False, to='feeds.post')),
+                ('likers', models.BinaryField(default=bytes)),
+                ('previous_likers', models.BinaryField(default=bytes)),
+                ('likers_added', models.PositiveIntegerField(default=0)),
+                ('likers_rotated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
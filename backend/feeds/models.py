@@ -1,5 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from core.models import ViewerSketch
 
 
 class Post(models.Model):
@@ -42,6 +45,7 @@ class PostImage(models.Model):
     """Multiple images for posts"""
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='posts/%Y/%m/')
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -76,4 +80,18 @@ class PostComment(models.Model):
         ordering = ['created_at']
     
     def __str__(self):
-        return f"{self.author.get_full_name()} commented on {self.post.title}"
\ No newline at end of file
+        return f"{self.author.get_full_name()} commented on {self.post.title}"
+
+
+class PostSketch(ViewerSketch):
+    """Unique viewers of a post, and the anonymous clients that liked it (see core.sketches, likes.py)"""
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='sketch')
+    # Bloom filters of client fingerprints: likes go into the current
+    # generation, which replaces the previous one when full or too old
+    likers = models.BinaryField(default=bytes)
+    previous_likers = models.BinaryField(default=bytes)
+    likers_added = models.PositiveIntegerField(default=0)
+    likers_rotated_at = models.DateTimeField(default=timezone.now)
+    
+    def __str__(self):
+        return f"{self.post_id}: ~{self.unique_viewers} viewers"
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Post, PostLike, PostComment, PostImage
 from authentication.models import UserProfile
+from core.images import ImageVariantsField
 
 
 class PostAuthorSerializer(serializers.ModelSerializer):
@@ -24,6 +25,7 @@ class PostCommentSerializer(serializers.ModelSerializer):
 
 class PostImageSerializer(serializers.ModelSerializer):
     """Post images with post details, counts and comments"""
+    image_variants = ImageVariantsField('image')
     title = serializers.CharField(source='post.title', read_only=True)
     content = serializers.CharField(source='post.content', read_only=True)
     likes_count = serializers.IntegerField(source='post.likes_count', read_only=True)
@@ -33,12 +35,14 @@ class PostImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = PostImage
         fields = [
-            'id', 'image', 'created_at', 'title', 'content',
+            'id', 'image', 'image_variants', 'created_at', 'title', 'content',
             'likes_count', 'comments_count', 'comments'
         ]
     
     def get_comments(self, obj):
-        comments = obj.post.comments.all().select_related('author')
+        comments = obj.post.comments.all()
+        if 'comments' not in getattr(obj.post, '_prefetched_objects_cache', {}):
+            comments = comments.select_related('author')
         return [{
             'id': comment.id,
             'content': comment.content,
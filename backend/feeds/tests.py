@@ -1,3 +1,88 @@
-from django.test import TestCase
+import os
+import re
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.models import UserProfile
+from core import uploads
+from core.tests import use_temporary_media
+
+from .models import Post, PostComment, PostImage
+
+
+# Not TestCase: the feed's count and page run on gather_queries() workers
+class AsyncPostFeedTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('author')
+        self.token = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def add_posts(self, count):
+        posts = Post.objects.bulk_create([Post(author=self.user, title='Shipped') for _ in range(count)])
+        PostImage.objects.bulk_create([
+            PostImage(post=post, image=f'posts/{post.pk}-{i}.jpg') for post in posts for i in range(2)
+        ])
+        PostComment.objects.bulk_create([PostComment(post=post, author=self.user, content='Nice') for post in posts])
+
+    def feed_queries(self):
+        response = self.client.get(reverse('post-feed-async'), HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(response.status_code, 200)
+        return int(re.search(r'desc="(\d+) queries"', response['Server-Timing']).group(1))
+
+    def test_feed_queries_do_not_grow_with_posts_or_images(self):
+        self.add_posts(1)
+        # The user, the count, the page, its images, their comments and authors
+        self.assertEqual(self.feed_queries(), 6)
+        self.add_posts(3)
+        self.assertEqual(self.feed_queries(), 6)
+
+
+def stored_file_names():
+    return [name for _, _, files in os.walk(settings.MEDIA_ROOT) for name in files]
+
+
+class PostCreateTests(TestCase):
+    def setUp(self):
+        use_temporary_media(self)
+        user = User.objects.create_user('author')
+        UserProfile.objects.create(user=user)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def create_post(self, count=3):
+        images = [SimpleUploadedFile(f'photo{i}.jpg', b'-', content_type='image/jpeg') for i in range(count)]
+        return self.client.post(reverse('post-create'), {'title': 'Shipped', 'images': images}, format='multipart')
+
+    def test_images_are_stored_with_the_post(self):
+        response = self.create_post()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(PostImage.objects.filter(post__title='Shipped').count(), 3)
+        self.assertEqual(len(stored_file_names()), 3)
+
+    def test_a_failed_upload_leaves_no_files_or_rows(self):
+        save = uploads._save
+
+        def failing_save(field, instance, upload):
+            if upload.name == 'photo1.jpg':
+                raise OSError('disk full')
+            return save(field, instance, upload)
+
+        with mock.patch.object(uploads, '_save', failing_save), self.assertLogs('django.request', 'ERROR'):
+            response = self.create_post()
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(stored_file_names(), [])
+
+    def test_a_failed_insert_leaves_no_files_or_rows(self):
+        with mock.patch.object(PostImage.objects, 'bulk_create', side_effect=RuntimeError('insert failed')):
+            with self.assertLogs('django.request', 'ERROR'):
+                response = self.create_post()
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(stored_file_names(), [])
@@ -4,12 +4,14 @@ from .views import (
     PostLikeAPI, PostCommentAPI, PostImageDeleteAPI, PostImagesListAPI, PostDeleteAPI, AllPostsAPI,
     PostUpdateByImageAPI, PostLikeByImageAPI, PostCommentByImageAPI
 )
+from .async_views import AsyncPostFeedView
 
 urlpatterns = [
     # Post Management
     path('create/', PostCreateAPI.as_view(), name='post-create'),
     path('feed/', PostListAPI.as_view(), name='post-feed'),
     path('all-posts/', AllPostsAPI.as_view(), name='all-posts'),
+    path('async/feed/', AsyncPostFeedView.as_view(), name='post-feed-async'),
     path('post/<int:post_id>/', PostDetailAPI.as_view(), name='post-detail'),
     
     # User Posts
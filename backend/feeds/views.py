@@ -3,13 +3,26 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.db import transaction
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
-from .models import Post, PostLike, PostComment, PostImage
+from .likes import add_anonymous_like
+from .models import Post, PostLike, PostComment, PostImage, PostSketch
 from .serializers import (
     PostListSerializer, PostDetailSerializer, PostCreateSerializer,
     PostCommentSerializer, PostCommentCreateSerializer
 )
 from relationships.models import Follow
+from core.images import schedule_variants
+from core.pagination import get_page_params, stream_response, wants_stream
+from core.purge import delete_with_files
+from core.sketches import client_fingerprint, record_view
+from core.uploads import stored_files
+
+
+def with_list_relations(posts):
+    """Posts with what PostListSerializer reads, loaded per page/chunk instead of per row"""
+    return posts.select_related('author__userprofile').prefetch_related('images', 'comments__author')
 
 
 class PostCreateAPI(APIView):
@@ -22,12 +35,16 @@ class PostCreateAPI(APIView):
             serializer = PostCreateSerializer(data=request.data, context={'request': request})
             
             if serializer.is_valid():
-                post = serializer.save()
-                
-                # Handle multiple images
+                # Images are written to storage concurrently before the transaction
+                # opens, and deleted again if creating the post or its rows fails
                 images = request.FILES.getlist('images')
-                for image in images:
-                    PostImage.objects.create(post=post, image=image)
+                with stored_files(PostImage._meta.get_field('image'), images) as names, transaction.atomic():
+                    post = serializer.save()
+                    post_images = PostImage.objects.bulk_create([PostImage(post=post, image=name) for name in names])
+                
+                # bulk_create sends no post_save, so queue the variants here
+                for post_image in post_images:
+                    schedule_variants(post_image, 'image')
                 
                 return Response({
                     'message': 'Post created successfully',
@@ -48,6 +65,7 @@ class PostListAPI(APIView):
     """List posts (feed)"""
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
+    read_replica = True
     
     def get(self, request):
         try:
@@ -65,10 +83,23 @@ class PostListAPI(APIView):
             if post_type:
                 posts = posts.filter(post_type=post_type)
             
-            serializer = PostListSerializer(posts, many=True, context={'request': request})
+            posts = with_list_relations(posts).order_by('-created_at', '-id')
+            if wants_stream(request):
+                return stream_response(
+                    'Feed retrieved successfully', posts,
+                    lambda rows: PostListSerializer(rows, many=True, context={'request': request}).data
+                )
+            
+            page, page_size, start, end = get_page_params(request.query_params)
+            total_count = posts.count()
+            
+            serializer = PostListSerializer(posts[start:end], many=True, context={'request': request})
             return Response({
                 'message': 'Feed retrieved successfully',
-                'count': posts.count(),
+                'count': total_count,
+                'page': page,
+                'page_size': page_size,
+                'total_pages': (total_count + page_size - 1) // page_size,
                 'data': serializer.data
             }, status=status.HTTP_200_OK)
             
@@ -85,12 +116,15 @@ class PostDetailAPI(APIView):
     
     def get(self, request, post_id):
         try:
-            post = get_object_or_404(Post, id=post_id, is_active=True)
+            post = get_object_or_404(
+                Post.objects.annotate(unique_viewers=Coalesce('sketch__unique_viewers', 0)), id=post_id, is_active=True
+            )
+            record_view(PostSketch, post.pk, request)
             serializer = PostDetailSerializer(post, context={'request': request})
             
             return Response({
                 'message': 'Post retrieved successfully',
-                'data': serializer.data
+                'data': {**serializer.data, 'unique_viewers': post.unique_viewers}
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
@@ -137,13 +171,8 @@ class PostDetailAPI(APIView):
                     'error': 'You can only delete your own posts'
                 }, status=status.HTTP_403_FORBIDDEN)
             
-            # Delete all images
-            for image in post.images.all():
-                image.image.delete()
-                image.delete()
-            
-            # Delete the post
-            post.delete()
+            # Rows go in bulk; the image files are queued for the background sweeper
+            delete_with_files(post)
             
             return Response({
                 'message': 'Post deleted successfully'
@@ -159,6 +188,7 @@ class UserPostsAPI(APIView):
     """Get user's posts"""
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
+    read_replica = True
     
     def get(self, request, user_id=None):
         try:
@@ -175,10 +205,23 @@ class UserPostsAPI(APIView):
             if post_type:
                 posts = posts.filter(post_type=post_type)
             
-            serializer = PostListSerializer(posts, many=True, context={'request': request})
+            posts = with_list_relations(posts).order_by('-created_at', '-id')
+            if wants_stream(request):
+                return stream_response(
+                    f'Posts by {user.get_full_name()}', posts,
+                    lambda rows: PostListSerializer(rows, many=True, context={'request': request}).data
+                )
+            
+            page, page_size, start, end = get_page_params(request.query_params)
+            total_count = posts.count()
+            
+            serializer = PostListSerializer(posts[start:end], many=True, context={'request': request})
             return Response({
                 'message': f'Posts by {user.get_full_name()}',
-                'count': posts.count(),
+                'count': total_count,
+                'page': page,
+                'page_size': page_size,
+                'total_pages': (total_count + page_size - 1) // page_size,
                 'data': serializer.data
             }, status=status.HTTP_200_OK)
             
@@ -192,6 +235,7 @@ class PostLikeAPI(APIView):
     """Like/Unlike post"""
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'like'
     
     def post(self, request, post_id):
         try:
@@ -274,9 +318,7 @@ class PostImageDeleteAPI(APIView):
                     'error': 'You can only delete images from your own posts'
                 }, status=status.HTTP_403_FORBIDDEN)
             
-            # Delete the image file
-            image.image.delete()
-            image.delete()
+            delete_with_files(image)
             
             return Response({
                 'message': 'Image deleted successfully'
@@ -299,14 +341,29 @@ class PostImagesListAPI(APIView):
     
     def get(self, request):
         try:
-            images = PostImage.objects.filter(post__author=request.user).select_related('post')
+            images = (
+                PostImage.objects.filter(post__author=request.user)
+                .select_related('post').prefetch_related('post__comments__author')
+                .order_by('created_at', 'id')
+            )
             
             from .serializers import PostImageSerializer
-            serializer = PostImageSerializer(images, many=True)
+            if wants_stream(request):
+                return stream_response(
+                    'Your images retrieved successfully', images,
+                    lambda rows: PostImageSerializer(rows, many=True).data
+                )
+            
+            page, page_size, start, end = get_page_params(request.query_params)
+            total_count = images.count()
+            serializer = PostImageSerializer(images[start:end], many=True)
             
             return Response({
                 'message': 'Your images retrieved successfully',
-                'count': images.count(),
+                'count': total_count,
+                'page': page,
+                'page_size': page_size,
+                'total_pages': (total_count + page_size - 1) // page_size,
                 'data': serializer.data
             }, status=status.HTTP_200_OK)
             
@@ -331,13 +388,8 @@ class PostDeleteAPI(APIView):
                     'error': 'You can only delete your own posts'
                 }, status=status.HTTP_403_FORBIDDEN)
             
-            # Delete all images
-            for image in post.images.all():
-                image.image.delete()
-                image.delete()
-            
-            # Delete the post
-            post.delete()
+            # Rows go in bulk; the image files are queued for the background sweeper
+            delete_with_files(post)
             
             return Response({
                 'message': 'Post deleted successfully'
@@ -357,15 +409,27 @@ class AllPostsAPI(APIView):
     """List all posts from all users"""
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
+    read_replica = True
     
     def get(self, request):
         try:
-            posts = Post.objects.filter(is_active=True).select_related('author')
+            posts = with_list_relations(Post.objects.filter(is_active=True)).order_by('-created_at', '-id')
+            if wants_stream(request):
+                return stream_response(
+                    'All posts retrieved successfully', posts,
+                    lambda rows: PostListSerializer(rows, many=True, context={'request': request}).data
+                )
+            
+            page, page_size, start, end = get_page_params(request.query_params)
+            total_count = posts.count()
             
-            serializer = PostListSerializer(posts, many=True, context={'request': request})
+            serializer = PostListSerializer(posts[start:end], many=True, context={'request': request})
             return Response({
                 'message': 'All posts retrieved successfully',
-                'count': posts.count(),
+                'count': total_count,
+                'page': page,
+                'page_size': page_size,
+                'total_pages': (total_count + page_size - 1) // page_size,
                 'data': serializer.data
             }, status=status.HTTP_200_OK)
             
@@ -419,6 +483,7 @@ class PostUpdateByImageAPI(APIView):
 
 class PostLikeByImageAPI(APIView):
     """Like/Unlike post using image ID - Available for all users"""
+    throttle_scope = 'like'
     
     def post(self, request, image_id):
         try:
@@ -444,11 +509,9 @@ class PostLikeByImageAPI(APIView):
                     post.save(update_fields=['likes_count'])
                     message = 'Post unliked successfully via image'
             else:
-                # Anonymous user - just increment count
-                post.likes_count += 1
-                post.save(update_fields=['likes_count'])
-                created = True
-                message = 'Post liked successfully (anonymous)'
+                # Anonymous user - one like per client (see likes.py)
+                created = add_anonymous_like(post, client_fingerprint(request))
+                message = 'Post liked successfully (anonymous)' if created else 'Post already liked (anonymous)'
             
             return Response({
                 'message': message,
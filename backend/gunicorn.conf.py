@@ -0,0 +1,67 @@
+"""
+Gunicorn settings for the production server; run it through serve.py.
+
+The app is preloaded in the master, which warms the caches (core.warmup)
+before forking the workers, so workers share that memory and are ready as
+soon as they start. Override any value from the environment:
+
+    SERVER_INTERFACE   wsgi (default) or asgi; asgi runs uvicorn workers
+                       so the async views (*/async/* URLs) run concurrently
+    SERVER_BIND        default 0.0.0.0:8000
+    WEB_CONCURRENCY    worker processes, default 2 x CPU cores + 1
+    WEB_THREADS        threads per WSGI worker, default 4; keep
+                       workers x threads within what the database allows
+                       (DB_POOL_MAX_SIZE is per worker)
+    CACHE_BUS_URL      default unix:///tmp/job_portal_cache_bus
+    SERVER_TIMEOUT, SERVER_GRACEFUL_TIMEOUT, SERVER_MAX_REQUESTS,
+    SERVER_PIDFILE, SERVER_LOG_LEVEL
+"""
+import multiprocessing
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_portal.settings')
+# Warm in the master, before the fork, instead of in a thread per process
+os.environ.setdefault('WARM_CACHES_SYNC', '1')
+# Workers share this host, so they can exchange cache invalidations over
+# sockets unless another bus is configured (see core.cachebus)
+os.environ.setdefault('CACHE_BUS_URL', 'unix:///tmp/job_portal_cache_bus')
+
+interface = os.environ.get('SERVER_INTERFACE', 'wsgi')
+
+bind = os.environ.get('SERVER_BIND', '0.0.0.0:8000')
+wsgi_app = 'job_portal.asgi:application' if interface == 'asgi' else 'job_portal.wsgi:application'
+worker_class = 'uvicorn.workers.UvicornWorker' if interface == 'asgi' else 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('WEB_THREADS', '4'))
+preload_app = True
+
+timeout = int(os.environ.get('SERVER_TIMEOUT', '30'))
+# Time in-flight requests get to finish on reload or stop
+graceful_timeout = int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+# Recycle workers now and then; the jitter keeps them from restarting together
+max_requests = int(os.environ.get('SERVER_MAX_REQUESTS', '10000'))
+max_requests_jitter = max_requests // 10
+# Heartbeat files on tmpfs, so a slow disk cannot make workers look stuck
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+pidfile = os.environ.get('SERVER_PIDFILE', '/tmp/job_portal_server.pid')
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('SERVER_LOG_LEVEL', 'info')
+
+
+def pre_fork(server, worker):
+    # The warm-up opened connections in the master; workers must open their own
+    from django.core.cache import caches
+    from django.db import connections
+    connections.close_all()
+    caches.close_all()
+
+
+def post_fork(server, worker):
+    # Lets /health/ say which master a worker belongs to, for serve.py reload
+    os.environ['SERVER_MASTER_PID'] = str(server.pid)
+    # Subscribe to cache invalidations before serving from the inherited L1
+    from core.cachebus import get_bus
+    get_bus()
@@ -2,6 +2,8 @@
 ASGI config for job_portal project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The async read views (``*/async/*`` URLs) only run concurrently when served by
+an ASGI server, e.g. ``uvicorn job_portal.asgi:application --workers 4``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -14,3 +16,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_portal.settings')
 
 application = get_asgi_application()
+
+# Warm the typeahead index, job facets and role lookups (see core.warmup)
+from core.warmup import warm_caches  # noqa: E402
+
+warm_caches()
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import sys
+from copy import deepcopy
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,6 +43,7 @@ INSTALLED_APPS = [
     'corsheaders',
     'rest_framework.authtoken',
     'authentication',
+    'locations',
     'profile_app',
     'job_postings',
     'relationships',
@@ -52,12 +55,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestInstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
+    'core.middleware.DatabaseConnectionMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -84,17 +90,90 @@ WSGI_APPLICATION = 'job_portal.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# Connection reuse is environment driven: DB_POOL=true uses psycopg's pool
+# (Django requires CONN_MAX_AGE=0 then), otherwise DB_CONN_MAX_AGE keeps
+# per-thread persistent connections.
+DB_POOL = os.environ.get('DB_POOL', 'False').lower() == 'true'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'job_portal_db',
-        'USER': 'postgres',
-        'PASSWORD': 'farseena',
-        'HOST': 'localhost',
-        'PORT': '5432',
+        'NAME': os.environ.get('DB_NAME', 'job_portal_db'),
+        'USER': os.environ.get('DB_USER', 'postgres'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', 'farseena'),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '5432'),
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'True').lower() == 'true',
+        'OPTIONS': {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', '5')),
+            # Server-side default; endpoint classes override it per request
+            'options': f"-c statement_timeout={os.environ.get('DB_STATEMENT_TIMEOUT', '10000')}",
+        },
+    }
+}
+
+if DB_POOL:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
     }
+
+# Read replicas: DB_REPLICA_HOSTS=host1,host2 adds 'replica_1', 'replica_2', ...
+# aliases that views marked `read_replica = True` read from (core.routers)
+DATABASE_REPLICAS = []
+for index, host in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    alias = f'replica_{index}'
+    DATABASES[alias] = deepcopy(DATABASES['default'])
+    DATABASES[alias]['HOST'] = host.strip()
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+TESTING = sys.argv[1:2] == ['test']
+
+# `manage.py test` gets a separate 'replica' database for the router tests
+# (core.tests), which route to it with override_settings(DATABASE_REPLICAS=...)
+if TESTING:
+    DATABASES['replica'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / 'replica.sqlite3'}
+
+# Seconds a client keeps reading from the primary after it wrote
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', '5'))
+
+# Statement timeouts (ms) for endpoint classes, selected by a view's
+# `statement_timeout` attribute (see core.middleware.DatabaseConnectionMiddleware)
+DATABASE_STATEMENT_TIMEOUTS = {
+    'search': int(os.environ.get('DB_SEARCH_STATEMENT_TIMEOUT', '3000')),
+    'report': int(os.environ.get('DB_REPORT_STATEMENT_TIMEOUT', '30000')),
 }
 
+# Per-request query budgets by URL name; these override a view's
+# `query_budget` attribute (see core.middleware.RequestInstrumentationMiddleware).
+# With QUERY_BUDGET_ENFORCE on (the default under `manage.py test`), going
+# over budget raises instead of logging.
+QUERY_BUDGETS = {}
+QUERY_BUDGET_ENFORCE = os.environ.get('QUERY_BUDGET_ENFORCE', str(TESTING)).lower() == 'true'
+
+# Shared cache: Redis when REDIS_URL is set, otherwise Django's per-process
+# memory cache
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+
+# Two-level cache (core.caching): a per-process LRU of this many entries,
+# kept for at most CACHE_L1_TTL seconds, in front of the shared cache.
+# CACHE_BUS_URL carries invalidations between processes (core.cachebus):
+# '' for none, unix:///<dir> on one host, or redis://...
+CACHE_L1_MAX_ENTRIES = int(os.environ.get('CACHE_L1_MAX_ENTRIES', '10000'))
+CACHE_L1_TTL = int(os.environ.get('CACHE_L1_TTL', '30'))
+CACHE_BUS_URL = os.environ.get('CACHE_BUS_URL', '')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -137,6 +216,42 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# WebP variants of uploaded images (longest edge in px), written by a
+# background thread pool next to the original (see core.images)
+IMAGE_VARIANT_SIZES = {'thumbnail': 320, 'medium': 768, 'large': 1600}
+IMAGE_VARIANT_QUALITY = 80
+IMAGE_WORKERS = 2
+# Threads writing a request's uploads to storage concurrently (see core.uploads)
+UPLOAD_WORKERS = 4
+# Files of deleted rows are queued and deleted in batches by a background
+# sweeper after commit, or by `manage.py purge_files` (see core.purge)
+FILE_PURGE_IN_PROCESS = True
+FILE_PURGE_BATCH_SIZE = 500
+# Deleted accounts are deactivated at once and their rows deleted in chunks
+# in the background (see core.accounts); pause is in seconds between chunks
+ACCOUNT_DELETION_CHUNK_SIZE = 500
+ACCOUNT_DELETION_CHUNK_PAUSE = 0
+# Unique viewers of jobs and posts are HyperLogLog sketches, merged from each
+# process's buffer every SKETCH_FLUSH_SECONDS; an anonymous client can like a
+# post once per one to two windows (see core.sketches, feeds/likes.py)
+SKETCH_FLUSH_SECONDS = 10
+ANONYMOUS_LIKE_WINDOW_DAYS = 30
+# Job views and search impressions are counted per process and added to the
+# daily rollup (JobDailyStats) every this many seconds (see job_postings/tracking.py)
+JOB_STATS_FLUSH_SECONDS = 5
+# Under `manage.py test` these buffers have no flush thread (which would write
+# to the test database behind the tests' backs); tests call flush() themselves
+if TESTING:
+    SKETCH_FLUSH_SECONDS = JOB_STATS_FLUSH_SECONDS = None
+# Saved searches are matched against new and updated jobs and their matches
+# emailed as digests by `manage.py send_search_digests` (see job_postings/saved_searches.py)
+MAX_SAVED_SEARCHES_PER_USER = 20
+# Run once per process at startup, before serve.py forks workers (see core.warmup)
+CACHE_WARMERS = [
+    'job_postings.autocomplete.warm_autocomplete',
+    'job_postings.facets.warm_job_facets',
+]
+
 # Email settings
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
@@ -155,11 +270,34 @@ REST_FRAMEWORK = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
         'rest_framework.authentication.TokenAuthentication',
     ],
+    # orjson when installed, DRF's JSONRenderer otherwise (see core.renderers)
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.FastJSONRenderer',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.PagePagination',
+    # Only limits views that set throttle_scope (see THROTTLE_BUCKETS)
+    'DEFAULT_THROTTLE_CLASSES': [
+        'core.throttling.TokenBucketThrottle',
+    ],
+}
+
+# Token-bucket rate limits by endpoint class (a view's throttle_scope): per
+# user id when authenticated, per client IP otherwise. 'N/period' allows a
+# burst of N, then N per period. Buckets are shared through Redis when
+# REDIS_URL is set (see core.throttling)
+THROTTLE_BUCKETS = {
+    'search': {'user': '120/min', 'anon': '60/min'},
+    'like': {'user': '60/min', 'anon': '20/min'},
 }
 
+# No list endpoint returns more than MAX_PAGE_SIZE rows per page, or pages
+# past MAX_PAGE; ?stream=true returns up to MAX_STREAM_ROWS rows as a
+# streamed body (see core.pagination)
+MAX_PAGE_SIZE = 50
+MAX_PAGE = 10000
+STREAM_CHUNK_SIZE = 500
+MAX_STREAM_ROWS = 100000
+
 from datetime import timedelta
 
 # JWT Settings
@@ -26,6 +26,7 @@ from simple_profile import SimpleProfileAPI
 from header_debug import HeaderDebugAPI
 from open_test import OpenTestAPI
 from stats_view import StatsAPI
+from core.views import HealthAPI
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -34,6 +35,8 @@ urlpatterns = [
     path('jobs/', include('job_postings.urls')),
     path('relationships/', include('relationships.urls')),
     path('feeds/', include('feeds.urls')),
+    path('metrics/', include('core.urls')),
+    path('health/', HealthAPI.as_view(), name='health'),
     path('debug-token/', DebugTokenAPI.as_view(), name='debug-token'),
     path('test-jobs/', TestJobsAPI.as_view(), name='test-jobs'),
     path('token-debug/', TokenDebugAPI.as_view(), name='token-debug'),
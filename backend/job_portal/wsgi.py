@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_portal.settings')
 
 application = get_wsgi_application()
+
+# Warm the typeahead index, job facets and role lookups (see core.warmup)
+from core.warmup import warm_caches  # noqa: E402
+
+warm_caches()
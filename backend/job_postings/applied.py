@@ -0,0 +1,31 @@
+"""
+Per-user cache of the job ids a user has applied to.
+
+Browsing AvailableJobsAPI and computing recommendations both need to exclude
+applied jobs; keeping the id set in the cache avoids re-running that lookup on
+every page. Entries are dropped by the JobApplication signals in signals.py.
+"""
+from django.conf import settings
+
+from core.caching import TieredCache
+
+from .models import JobApplication
+
+
+# Above this many applied jobs, AvailableJobsAPI uses a NOT EXISTS anti-join
+# instead of sending the ids inline
+APPLIED_IDS_INLINE_LIMIT = getattr(settings, 'APPLIED_IDS_INLINE_LIMIT', 500)
+CACHE_TIMEOUT = getattr(settings, 'APPLIED_IDS_CACHE_TIMEOUT', 60 * 60)
+
+applied_job_ids = TieredCache('applied_job_ids', JobApplication, timeout=CACHE_TIMEOUT, max_entries=2000)
+
+
+def get_applied_job_ids(user_id):
+    """Return a frozenset of job ids the user has applied to"""
+    return applied_job_ids.get_or_set(user_id, lambda: frozenset(
+        JobApplication.objects.filter(applicant_id=user_id).values_list('job_id', flat=True)
+    ))
+
+
+def invalidate_applied_job_ids(user_id):
+    applied_job_ids.delete(user_id)
@@ -0,0 +1,60 @@
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Count
+from django.db.models.functions import Coalesce
+from django.http import JsonResponse
+from django.views import View
+from rest_framework import status
+from core.aio import gather_queries, paginated_response, error_response, throttled_response
+from core.throttling import throttle_wait
+from .models import Job
+from .serializers import JobSerializer
+from .query import JOB_QUERY_BUDGET, JobQuery, active_jobs, get_plan
+from .rows import JobRows
+from .tracking import track_impressions, track_view
+
+
+class AsyncJobSearchView(View):
+    """Async JobSearchAPI: the count and the page are fetched concurrently"""
+    throttle_scope = 'search'
+    statement_timeout = 'search'
+    read_replica = True
+    query_budget = JOB_QUERY_BUDGET
+    
+    async def get(self, request):
+        # Not authenticated here, so limited per client IP
+        wait = throttle_wait(request, self.throttle_scope)
+        if wait:
+            return throttled_response(wait)
+        try:
+            query = JobQuery.from_params(request.GET)
+            plan = get_plan(query.shape)
+            jobs = plan.filter(query, active_jobs())
+            
+            total_count, data = await gather_queries(
+                jobs.order_by().count, lambda: JobRows.serialize(plan.page(query, jobs))
+            )
+            track_impressions(data)
+            return paginated_response('Jobs search completed successfully', total_count, query.page, query.page_size, data)
+        except Exception as e:
+            return error_response(e)
+
+
+class AsyncJobDetailView(View):
+    """Async JobDetailAPI"""
+    read_replica = True
+    
+    async def get(self, request, job_id):
+        job = await Job.objects.filter(id=job_id, is_active=True).select_related('posted_by').annotate(
+            num_applications=Count('applications'), unique_viewers=Coalesce('sketch__unique_viewers', 0)
+        ).afirst()
+        if job is None:
+            return JsonResponse({
+                'error': 'Job not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        # Not authenticated here, so viewers are told apart by client fingerprint
+        track_view(request, job.pk, user=AnonymousUser())
+        return JsonResponse({
+            'message': 'Job retrieved successfully',
+            'data': {**JobSerializer(job).data, 'unique_viewers': job.unique_viewers}
+        }, status=status.HTTP_200_OK)
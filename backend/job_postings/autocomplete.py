@@ -0,0 +1,231 @@
+"""
+In-memory typeahead for job titles, companies, skills and locations.
+
+Each field has a PrefixIndex: a sorted list of (word start, term) pairs, so
+"dev" finds "Senior Python Developer", plus a weight per term (the number
+of active jobs using it). A lookup is two bisects and a scan of the
+matching slice. Prefixes that match many terms, such as a single letter,
+keep their top results until the index next changes. Lookups never touch
+the database.
+
+The index is process-local. It is built at startup (see warm_autocomplete,
+run by core.warmup) and kept current by the Job signals of the
+process that saved the job. Other processes see the shared version key move
+and rebuild in the background, at most once per REBUILD_INTERVAL.
+Meanwhile they keep answering from the index they have.
+"""
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Job
+from .terms import normalize
+
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('title', 'company', 'skill', 'location')
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+# Prefixes matching more entries than this keep their top results
+SCAN_LIMIT = 256
+MAX_CACHED_PREFIXES = 10000
+
+REBUILD_INTERVAL = getattr(settings, 'AUTOCOMPLETE_REBUILD_INTERVAL', 30)
+VERSION_KEY = 'autocomplete:jobs_version'
+
+# Job columns the terms come from
+TERM_COLUMNS = ('title', 'company_name', 'location', 'place__name', 'skills_required', 'is_active')
+
+
+def job_terms(title, company_name, location, place_name, skills_required, is_active):
+    """{field: [labels]} a job contributes; inactive jobs contribute nothing"""
+    if not is_active:
+        return {}
+    return {
+        'title': [title],
+        'company': [company_name],
+        # Spellings of one place are folded into its canonical name
+        'location': [place_name or location],
+        'skill': list({normalize(s): s.strip() for s in (skills_required or '').split(',') if s.strip()}.values()),
+    }
+
+
+def instance_terms(job):
+    place_name = job.place.name if job.place_id else None
+    return job_terms(
+        job.title, job.company_name, job.location, place_name, job.skills_required, job.is_active
+    )
+
+
+class PrefixIndex:
+    """Sorted word-start entries for one field, with a weight per term"""
+
+    def __init__(self):
+        self.weights = {}
+        self.labels = {}
+        self.entries = []
+        self.top = {}
+
+    @staticmethod
+    def word_starts(key):
+        words = key.split(' ')
+        return {' '.join(words[i:]) for i in range(len(words))}
+
+    @classmethod
+    def build(cls, counts, labels):
+        index = cls()
+        index.weights = dict(counts)
+        index.labels = dict(labels)
+        index.entries = sorted((start, key) for key in counts for start in cls.word_starts(key))
+        return index
+
+    def add(self, label, count=1):
+        key = normalize(label)
+        if not key:
+            return
+        if key not in self.weights:
+            self.weights[key] = 0
+            self.labels[key] = label.strip()
+            for start in self.word_starts(key):
+                insort(self.entries, (start, key))
+        self.weights[key] += count
+        self.top = {}
+
+    def remove(self, label, count=1):
+        key = normalize(label)
+        if key not in self.weights:
+            return
+        self.weights[key] -= count
+        if self.weights[key] <= 0:
+            del self.weights[key], self.labels[key]
+            for start in self.word_starts(key):
+                i = bisect_left(self.entries, (start, key))
+                if i < len(self.entries) and self.entries[i] == (start, key):
+                    del self.entries[i]
+        self.top = {}
+
+    def complete(self, prefix, limit=DEFAULT_LIMIT):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        top = self.top.get(prefix)
+        if top is None:
+            start = bisect_left(self.entries, (prefix,))
+            end = bisect_left(self.entries, (prefix + '\uffff',), start)
+            keys = {key for _, key in self.entries[start:end]}
+            top = heapq.nsmallest(MAX_LIMIT, keys, key=lambda k: (-self.weights[k], k))
+            if end - start > SCAN_LIMIT and len(self.top) < MAX_CACHED_PREFIXES:
+                self.top[prefix] = top
+        return [{'value': self.labels[key], 'count': self.weights[key]} for key in top[:limit]]
+
+
+def build_indexes():
+    counts = {field: {} for field in FIELDS}
+    labels = {field: {} for field in FIELDS}
+    rows = Job.objects.filter(is_active=True).values_list(*TERM_COLUMNS).iterator(chunk_size=5000)
+    for row in rows:
+        for field, values in job_terms(*row).items():
+            for label in values:
+                key = normalize(label)
+                if key:
+                    counts[field][key] = counts[field].get(key, 0) + 1
+                    labels[field].setdefault(key, label.strip())
+    return {field: PrefixIndex.build(counts[field], labels[field]) for field in FIELDS}
+
+
+def get_version():
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def bump_version():
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
+        return 2
+
+
+class Autocomplete:
+    def __init__(self):
+        self.indexes = None
+        self.version = None
+        self.built_at = 0.0
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._rebuilding = False
+
+    def rebuild(self):
+        with self._build_lock:
+            version = get_version()
+            # A concurrent build (e.g. the startup warm-up) may have just finished
+            if self.indexes is None or self.version != version:
+                indexes = build_indexes()
+                with self._lock:
+                    self.indexes, self.version, self.built_at = indexes, version, time.monotonic()
+            self._rebuilding = False
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception('Rebuilding the autocomplete index failed')
+            with self._lock:
+                self._rebuilding = False
+
+    def refresh(self):
+        """Build the index if missing, or start a rebuild when another process changed jobs"""
+        if self.indexes is None:
+            self.rebuild()
+            return
+        if self._rebuilding or self.version == get_version():
+            return
+        if time.monotonic() - self.built_at < REBUILD_INTERVAL:
+            return
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_in_background, daemon=True).start()
+
+    def complete(self, prefix, fields=FIELDS, limit=DEFAULT_LIMIT):
+        self.refresh()
+        # apply() changes the indexes in place; a lookup racing it could read
+        # half-updated entries or cache top results the change just cleared
+        with self._lock:
+            indexes = self.indexes
+            return {field: indexes[field].complete(prefix, limit) for field in fields}
+
+    def apply(self, removed, added):
+        """Apply one job's term changes locally and tell other processes"""
+        version = bump_version()
+        with self._lock:
+            if self.indexes is None:
+                return
+            for terms, update in ((removed, 'remove'), (added, 'add')):
+                for field, values in terms.items():
+                    for label in values:
+                        getattr(self.indexes[field], update)(label)
+            # Already current unless another process changed jobs in between
+            if self.version == version - 1:
+                self.version = version
+
+
+autocomplete = Autocomplete()
+
+
+def warm_autocomplete():
+    """Build the index at startup; core.warmup decides whether in the background"""
+    if getattr(settings, 'AUTOCOMPLETE_WARM_ON_STARTUP', True):
+        autocomplete.rebuild()
+
+
+def invalidate_autocomplete():
+    """Make every process rebuild, e.g. after bulk inserts that skip signals"""
+    bump_version()
+    autocomplete.built_at = 0.0
@@ -0,0 +1,46 @@
+"""
+Cached job facets: counts by type and experience level, top companies and
+locations.
+
+JobSearchStatsView used to run five aggregate queries over the active jobs
+on every request. The result only changes when a job does, so it is cached
+under the Job version, which every Job save and delete bumps (see
+signals.py). It is warmed at server start (core.warmup).
+"""
+from django.conf import settings
+from django.db.models import Count
+
+from core.caching import TieredCache
+
+from .models import Job
+
+
+CACHE_TIMEOUT = getattr(settings, 'JOB_FACETS_CACHE_TIMEOUT', 60 * 60)
+TOP_LIMIT = 10
+
+job_facets = TieredCache('job_facets', Job, timeout=CACHE_TIMEOUT, max_entries=1)
+
+
+def compute_job_facets():
+    jobs = Job.objects.filter(is_active=True)
+    total = jobs.count()
+    return {
+        'total_jobs': total,
+        'jobs_by_type': dict(jobs.values_list('job_type').annotate(count=Count('id'))),
+        'jobs_by_experience': dict(jobs.values_list('experience_level').annotate(count=Count('id'))),
+        'top_companies': list(
+            jobs.values('company_name').annotate(job_count=Count('id')).order_by('-job_count')[:TOP_LIMIT]
+        ),
+        'top_locations': list(
+            jobs.values('location').annotate(job_count=Count('id')).order_by('-job_count')[:TOP_LIMIT]
+        ),
+        'recent_jobs_count': total,  # Simplified for now
+    }
+
+
+def get_job_facets():
+    return job_facets.get_or_set('all', compute_job_facets)
+
+
+def warm_job_facets():
+    get_job_facets()
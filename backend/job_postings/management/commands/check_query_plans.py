@@ -0,0 +1,111 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, F
+
+from job_postings.models import Job, JobApplication
+from job_postings.query import JobQuery, active_jobs, get_plan
+
+
+def job_page(**params):
+    query = JobQuery(**params)
+    plan = get_plan(query.shape)
+    return plan.page(query, plan.filter(query, active_jobs()))
+
+
+def job_count(**params):
+    query = JobQuery(**params)
+    return get_plan(query.shape).filter(query, active_jobs()).order_by()
+
+
+# A full table read: "Seq Scan on t" (PostgreSQL) or "SCAN t" with no index (SQLite)
+SEQ_SCAN = re.compile(r'Seq Scan on (\w+)|\bSCAN (\w+)$', re.MULTILINE)
+
+
+def seq_scans(plan):
+    return sorted({postgresql or sqlite for postgresql, sqlite in SEQ_SCAN.findall(plan)})
+
+
+def plan_cases():
+    """(name, queryset, indexes any of which its plan should use) for the main job/application queries"""
+    applicant_id = (
+        JobApplication.objects.values('applicant').annotate(n=Count('id')).order_by('-n')
+        .values_list('applicant', flat=True).first()
+    )
+    job_id = (
+        JobApplication.objects.values('job').annotate(n=Count('id')).order_by('-n')
+        .values_list('job', flat=True).first()
+    )
+    poster_id = Job.objects.values_list('posted_by', flat=True).first()
+    salary = active_jobs().order_by('-salary_max').values_list('salary_max', flat=True)[
+        max(active_jobs().count() // 100, 1)
+    ]
+
+    cases = [
+        ('job list page', job_page(), ['job_active_created_idx']),
+        ('jobs by type and level', job_count(job_types=('full_time',), experience_levels=('senior',)),
+         ['job_active_type_level_idx']),
+        ('jobs by minimum salary', job_count(salary_min=salary), ['job_active_salary_max_idx']),
+        ('my jobs', Job.objects.filter(posted_by_id=poster_id).order_by('-created_at')[:10],
+         ['job_posted_by_created_idx']),
+        ('my applications',
+         JobApplication.objects.filter(applicant_id=applicant_id).order_by('-applied_at')[:10],
+         ['application_applicant_date_idx']),
+        ('applications received by status',
+         JobApplication.objects.filter(job_id=job_id, status='applied').order_by('-applied_at')[:10],
+         ['application_job_status_idx']),
+        ('applications ranked by match',
+         JobApplication.objects.filter(job_id=job_id).order_by(
+             F('match_score').desc(nulls_last=True), '-applied_at')[:10],
+         ['application_job_score_idx']),
+    ]
+    if connection.vendor == 'postgresql':
+        cases.append((
+            'job text search', job_count(search='engineer'),
+            [f'job_active_{column}_trgm_idx' for column in ('title', 'description')],
+        ))
+    return cases
+
+
+def check_plan(plan, expected):
+    """Problems with a plan: a sequential scan, or none of the expected indexes used"""
+    problems = [f'sequential scan on {table}' for table in seq_scans(plan)]
+    if not any(index in plan for index in expected):
+        problems.append(f'expected one of {", ".join(expected)}')
+    return problems
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN the main job/application queries and check the planner uses the expected indexes, '
+        'with no sequential scans. '
+        'Run against a seeded database (see seed_benchmark_data); exits non-zero on a mismatch.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-analyze', action='store_true', help='Skip refreshing planner statistics first')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not just failures')
+
+    def handle(self, *args, **options):
+        if not Job.objects.exists() or not JobApplication.objects.exists():
+            raise CommandError('No jobs or applications; run seed_benchmark_data first')
+        if not options['no_analyze']:
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        failures = 0
+        for name, queryset, expected in plan_cases():
+            plan = queryset.explain()
+            problems = check_plan(plan, expected)
+            if problems:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f'FAIL  {name}: {"; ".join(problems)}'))
+            else:
+                used = [index for index in expected if index in plan]
+                self.stdout.write(self.style.SUCCESS(f'ok    {name}: {", ".join(used)}'))
+            if options['verbose_plans'] or problems:
+                self.stdout.write(plan + '\n')
+
+        if failures:
+            raise CommandError(f'{failures} queries scan a table or miss their expected index')
@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from job_postings.models import Job, SavedSearch
+from job_postings.saved_searches import index_search, match_job
+
+
+class Command(BaseCommand):
+    help = 'Match recently changed (or the given) jobs against the saved searches; --reindex re-keys every search first'
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_ids', nargs='*', type=int)
+        parser.add_argument('--since-minutes', type=int, default=60,
+                            help='Jobs updated within this many minutes, when no ids are given')
+        parser.add_argument('--reindex', action='store_true',
+                            help='Store every active search under its cheapest keys again')
+
+    def handle(self, *args, **options):
+        if options['reindex']:
+            searches = SavedSearch.objects.filter(is_active=True)
+            for search in searches.iterator():
+                index_search(search)
+            self.stdout.write(f'Reindexed {searches.count()} saved searches')
+
+        jobs = Job.objects.filter(is_active=True)
+        if options['job_ids']:
+            jobs = jobs.filter(id__in=options['job_ids'])
+        else:
+            jobs = jobs.filter(updated_at__gte=timezone.now() - timedelta(minutes=options['since_minutes']))
+
+        count = matched = 0
+        for job_id in jobs.values_list('id', flat=True).iterator():
+            matched += len(match_job(job_id))
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Matched {count} jobs against saved searches ({matched} matches)'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from job_postings.terms import rebuild_terms
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the location/company/publisher trigram side table used for substring filters and suggestions'
+
+    def handle(self, *args, **options):
+        count = rebuild_terms()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} search terms'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from job_postings.models import Job
+from job_postings.ranking import update_match_scores
+
+
+class Command(BaseCommand):
+    help = 'Recompute JobApplication.match_score for every job (or the given job ids)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_ids', nargs='*', type=int)
+
+    def handle(self, *args, **options):
+        jobs = Job.objects.all()
+        if options['job_ids']:
+            jobs = jobs.filter(id__in=options['job_ids'])
+
+        total = 0
+        for job in jobs.iterator():
+            total += update_match_scores(job)
+
+        self.stdout.write(self.style.SUCCESS(f'Scored {total} applications'))
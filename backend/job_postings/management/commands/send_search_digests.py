@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from job_postings.saved_searches import send_digests
+
+
+class Command(BaseCommand):
+    help = 'Email each user the jobs their saved searches matched since their last digest (run from cron, e.g. hourly)'
+
+    def handle(self, *args, **options):
+        sent = send_digests()
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} saved search digests'))
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_postings', '0004_alter_jobapplication_applicant_email_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='match_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['job', '-match_score'], name='application_job_score_idx'),
+        ),
+    ]
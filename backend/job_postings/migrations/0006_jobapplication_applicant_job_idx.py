@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_postings', '0005_jobapplication_match_score'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['applicant', 'job'], name='application_applicant_job_idx'),
+        ),
+    ]
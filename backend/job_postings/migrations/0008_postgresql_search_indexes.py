@@ -0,0 +1,50 @@
+from django.db import migrations
+
+
+# Django compiles icontains to UPPER(column) LIKE UPPER(pattern) on
+# PostgreSQL, so the trigram indexes are on UPPER(column)
+TRIGRAM_COLUMNS = ['title', 'description', 'company_name', 'skills_required', 'location']
+
+# PostgreSQL sorts NULLs first in DESC order; the ranked applications query
+# asks for NULLS LAST, which only an index built that way can serve
+SCORE_INDEX_SQL = (
+    'CREATE INDEX application_job_score_idx ON job_postings_jobapplication '
+    '(job_id, match_score DESC{nulls}, applied_at DESC)'
+)
+
+
+def trigram_index_name(column):
+    return f'job_active_{column}_trgm_idx'
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {trigram_index_name(column)} ON job_postings_job '
+            f'USING gin (UPPER({column}) gin_trgm_ops) WHERE is_active'
+        )
+    schema_editor.execute('DROP INDEX IF EXISTS application_job_score_idx')
+    schema_editor.execute(SCORE_INDEX_SQL.format(nulls=' NULLS LAST'))
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {trigram_index_name(column)}')
+    schema_editor.execute('DROP INDEX IF EXISTS application_job_score_idx')
+    schema_editor.execute(SCORE_INDEX_SQL.format(nulls=''))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_postings', '0007_job_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+PUBLISHER_TRIGRAM_COLUMNS = ['username', 'first_name', 'last_name']
+
+# SearchTerm.field -> Job lookup, as in job_postings.terms
+TERM_LOOKUPS = {
+    'location': 'location',
+    'company': 'company_name',
+    'publisher_username': 'posted_by__username',
+    'publisher_first_name': 'posted_by__first_name',
+    'publisher_last_name': 'posted_by__last_name',
+}
+
+
+def normalize(value):
+    return ' '.join((value or '').lower().split())
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def populate_search_terms(apps, schema_editor):
+    Job = apps.get_model('job_postings', 'Job')
+    SearchTerm = apps.get_model('job_postings', 'SearchTerm')
+    SearchTermGram = apps.get_model('job_postings', 'SearchTermGram')
+    db_alias = schema_editor.connection.alias
+
+    postgresql = schema_editor.connection.vendor == 'postgresql'
+    fields = ['location', 'company'] if postgresql else list(TERM_LOOKUPS)
+    for field in fields:
+        jobs = Job.objects.using(db_alias).order_by()
+        values = {v for v in jobs.values_list(TERM_LOOKUPS[field], flat=True).distinct() if normalize(v)}
+        SearchTerm.objects.using(db_alias).bulk_create([
+            SearchTerm(field=field, value=v, normalized=normalize(v)[:200], gram_count=len(trigrams(normalize(v)[:200])))
+            for v in values
+        ], batch_size=5000)
+    terms = SearchTerm.objects.using(db_alias).values_list('id', 'field', 'normalized')
+    SearchTermGram.objects.using(db_alias).bulk_create([
+        SearchTermGram(term_id=term_id, field=field, gram=gram)
+        for term_id, field, normalized in terms.iterator()
+        for gram in trigrams(normalized)
+    ], batch_size=5000)
+
+
+def create_publisher_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in PUBLISHER_TRIGRAM_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS auth_user_{column}_trgm_idx ON auth_user '
+            f'USING gin (UPPER({column}) gin_trgm_ops)'
+        )
+
+
+def drop_publisher_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in PUBLISHER_TRIGRAM_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS auth_user_{column}_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_postings', '0008_postgresql_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(choices=[('location', 'Location'), ('company', 'Company'), ('publisher_username', 'Publisher Username'), ('publisher_first_name', 'Publisher First Name'), ('publisher_last_name', 'Publisher Last Name')], max_length=30)),
+                ('value', models.CharField(max_length=200)),
+                ('normalized', models.CharField(max_length=200)),
+                ('gram_count', models.PositiveSmallIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SearchTermGram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(max_length=30)),
+                ('gram', models.CharField(max_length=3)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['location'], name='job_active_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['company_name'], name='job_active_company_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='searchterm',
+            index=models.Index(fields=['field', 'normalized'], name='search_term_normalized_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='searchterm',
+            unique_together={('field', 'value')},
+        ),
+        migrations.AddField(
+            model_name='searchtermgram',
+            name='term',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grams', to='job_postings.searchterm'),
+        ),
+        migrations.AddIndex(
+            model_name='searchtermgram',
+            index=models.Index(fields=['field', 'gram', 'term'], name='search_term_gram_idx'),
+        ),
+        migrations.RunPython(populate_search_terms, migrations.RunPython.noop),
+        migrations.RunPython(create_publisher_trigram_indexes, drop_publisher_trigram_indexes),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_postings', '0010_job_place'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSketch',
+            fields=[
+                ('viewers', models.BinaryField(default=bytes)),
+                ('unique_viewers', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sketch', serialize=False, to='job_postings.job')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
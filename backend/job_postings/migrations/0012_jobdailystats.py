@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_postings', '0011_jobsketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('impressions', models.PositiveIntegerField(default=0)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='job_postings.job')),
+            ],
+            options={
+                'unique_together': {('job', 'date')},
+            },
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+from core.models import ViewerSketch
+
 
 class Job(models.Model):
     JOB_TYPE_CHOICES = [
@@ -22,6 +24,10 @@ class Job(models.Model):
     description = models.TextField()
     company_name = models.CharField(max_length=200)
     location = models.CharField(max_length=200)
+    # Canonical place the free-text location resolves to (see locations.gazetteer)
+    place = models.ForeignKey(
+        'locations.Location', on_delete=models.SET_NULL, blank=True, null=True, related_name='jobs'
+    )
     job_type = models.CharField(max_length=20, choices=JOB_TYPE_CHOICES)
     experience_level = models.CharField(max_length=20, choices=EXPERIENCE_CHOICES)
     salary_min = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
@@ -33,10 +39,40 @@ class Job(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        # Every list reads active jobs only, newest first with a pk tie-break
+        # (see query.JobQueryPlan), so most indexes are partial on is_active
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'], name='job_active_created_idx',
+                condition=models.Q(is_active=True)
+            ),
+            models.Index(
+                fields=['job_type', 'experience_level', '-created_at'], name='job_active_type_level_idx',
+                condition=models.Q(is_active=True)
+            ),
+            models.Index(
+                fields=['salary_max'], name='job_active_salary_max_idx',
+                condition=models.Q(is_active=True)
+            ),
+            models.Index(
+                fields=['salary_min'], name='job_active_salary_min_idx',
+                condition=models.Q(is_active=True)
+            ),
+            models.Index(fields=['posted_by', '-created_at'], name='job_posted_by_created_idx'),
+            # Substring filters resolve to exact values on backends without pg_trgm
+            models.Index(fields=['location'], name='job_active_location_idx', condition=models.Q(is_active=True)),
+            models.Index(fields=['company_name'], name='job_active_company_idx', condition=models.Q(is_active=True)),
+        ]
 
     def __str__(self):
         return f"{self.title} at {self.company_name}"
     
+    def save(self, *args, update_fields=None, **kwargs):
+        # The place is resolved from the location (signals.job_place) and saved with it
+        if update_fields is not None and 'location' in update_fields:
+            update_fields = {*update_fields, 'place'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+    
     @property
     def applications_count(self):
         return self.applications.count()
@@ -70,12 +106,135 @@ class JobApplication(models.Model):
     expected_salary = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     available_from = models.DateField(blank=True, null=True)
     
+    # Applicant fit against the job, maintained by job_postings.ranking
+    match_score = models.FloatField(blank=True, null=True)
+    
     applied_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         unique_together = ['job', 'applicant']
         ordering = ['-applied_at']
+        indexes = [
+            # Ranked ordering; migration 0008 rebuilds it with NULLS LAST on PostgreSQL
+            models.Index(fields=['job', '-match_score', '-applied_at'], name='application_job_score_idx'),
+            models.Index(fields=['applicant', 'job'], name='application_applicant_job_idx'),
+            models.Index(fields=['applicant', '-applied_at'], name='application_applicant_date_idx'),
+            models.Index(fields=['job', 'status', '-applied_at'], name='application_job_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.applicant.get_full_name()} applied for {self.job.title}"
+
+
+class SearchTerm(models.Model):
+    """Distinct location/company/publisher value, indexed by trigrams (see terms.py)"""
+    FIELD_CHOICES = [
+        ('location', 'Location'),
+        ('company', 'Company'),
+        ('publisher_username', 'Publisher Username'),
+        ('publisher_first_name', 'Publisher First Name'),
+        ('publisher_last_name', 'Publisher Last Name'),
+    ]
+    
+    field = models.CharField(max_length=30, choices=FIELD_CHOICES)
+    value = models.CharField(max_length=200)
+    normalized = models.CharField(max_length=200)
+    gram_count = models.PositiveSmallIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['field', 'value']
+        indexes = [
+            models.Index(fields=['field', 'normalized'], name='search_term_normalized_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.field}: {self.value}"
+
+
+class SearchTermGram(models.Model):
+    """One lowercase trigram of a SearchTerm"""
+    term = models.ForeignKey(SearchTerm, on_delete=models.CASCADE, related_name='grams')
+    field = models.CharField(max_length=30)
+    gram = models.CharField(max_length=3)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['field', 'gram', 'term'], name='search_term_gram_idx'),
+        ]
+
+
+class JobSketch(ViewerSketch):
+    """Unique viewers of a job (see core.sketches)"""
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='sketch')
+    
+    def __str__(self):
+        return f"{self.job_id}: ~{self.unique_viewers} viewers"
+
+
+class JobDailyStats(models.Model):
+    """Detail views and search impressions of a job per day (see tracking.py)"""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    impressions = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        # Also the conflict target of the flush's upsert
+        unique_together = ['job', 'date']
+    
+    def __str__(self):
+        return f"{self.job_id} on {self.date}: {self.views} views, {self.impressions} impressions"
+
+
+class SavedSearch(models.Model):
+    """A user's stored job search, matched against new and updated jobs (see saved_searches.py)"""
+    FREQUENCY_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='saved_searches')
+    name = models.CharField(max_length=100, blank=True, default='')
+    # JobSearchAPI query parameters, canonicalized by saved_searches.saved_params
+    params = models.JSONField(default=dict)
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES, default='daily')
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_notified_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='saved_search_user_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username}: {self.name or self.params}"
+
+
+class SavedSearchKey(models.Model):
+    """Reverse index entry: a job that has this key may match the search"""
+    key = models.CharField(max_length=40)
+    search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='keys')
+    
+    class Meta:
+        # (key, search) serves the matcher's key IN (...) lookup from the index alone
+        unique_together = ['key', 'search']
+
+
+class SavedSearchMatch(models.Model):
+    """A job that matched a saved search, waiting for its digest until notified_at is set"""
+    search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='matches')
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='saved_search_matches')
+    matched_at = models.DateTimeField(auto_now_add=True)
+    notified_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        unique_together = ['search', 'job']
+        indexes = [
+            models.Index(fields=['notified_at', 'search'], name='saved_search_match_due_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.applicant.get_full_name()} applied for {self.job.title}"
\ No newline at end of file
+        return f"{self.job_id} matched {self.search_id}"
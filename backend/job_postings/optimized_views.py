@@ -1,11 +1,13 @@
-from rest_framework import generics, filters
+from rest_framework import generics
 from rest_framework.response import Response
 from rest_framework import status
-from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Count, Prefetch
-from .models import Job, JobApplication
+from .models import Job
 from .serializers import JobSerializer
-from .filters import JobFilter
+from .facets import get_job_facets
+from .query import JobQuery, active_jobs, did_you_mean, run_job_query
+from .rows import JobRows
+from .tracking import employer_performance, get_days, track_impressions
+from authentication.roles import get_role
 
 
 class OptimizedJobListView(generics.ListAPIView):
@@ -15,102 +17,37 @@ class OptimizedJobListView(generics.ListAPIView):
     Features:
     - Search across multiple fields
     - Advanced filtering options
-    - Sorting/ordering capabilities
-    - Optimized queryset with prefetch_related
-    - Pagination support
+    - Sorting/ordering capabilities (including by application count)
+    - Filtering, ordering and pagination by the shared job query engine
     """
     
     serializer_class = JobSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_class = JobFilter
-    
-    # Search configuration
-    search_fields = [
-        'title',
-        'description', 
-        'skills_required',
-        'company_name',
-        'location',
-        'posted_by__first_name',
-        'posted_by__last_name'
-    ]
-    
-    # Ordering configuration
-    ordering_fields = [
-        'created_at',
-        'title', 
-        'job_type',
-        'salary_min',
-        'salary_max',
-        'applications_count'  # Custom field for application count
-    ]
-    
-    ordering = ['-created_at']  # Default ordering
+    throttle_scope = 'search'
+    statement_timeout = 'search'
+    read_replica = True
     
     def get_queryset(self):
-        """
-        Optimized queryset with:
-        - Select related for foreign keys
-        - Prefetch related for reverse foreign keys
-        - Annotation for application count
-        - Only active jobs
-        """
-        return Job.objects.filter(is_active=True).select_related(
-            'posted_by'
-        ).prefetch_related(
-            Prefetch(
-                'applications',
-                queryset=JobApplication.objects.select_related('applicant')
-            )
-        ).annotate(
-            applications_count=Count('applications')
-        )
+        return active_jobs()
     
     def list(self, request, *args, **kwargs):
         """Custom list method with enhanced response"""
-        queryset = self.filter_queryset(self.get_queryset())
-        
-        # Get total count before pagination
-        total_count = queryset.count()
-        
-        # Apply pagination
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            paginated_response = self.get_paginated_response(serializer.data)
-            
-            # Add custom metadata
-            paginated_response.data.update({
-                'message': 'Jobs retrieved successfully',
-                'total_count': total_count,
-                'filters_applied': self.get_applied_filters(),
-                'available_filters': self.get_available_filters()
-            })
-            
-            return paginated_response
+        query = JobQuery.from_params(request.query_params)
+        # JobRows produces what serializer_class would, without building instances
+        total_count, jobs_data = run_job_query(query, base=self.get_queryset(), rows=JobRows)
+        track_impressions(jobs_data)
         
-        serializer = self.get_serializer(queryset, many=True)
         return Response({
             'message': 'Jobs retrieved successfully',
             'count': total_count,
-            'data': serializer.data,
-            'filters_applied': self.get_applied_filters(),
+            'page': query.page,
+            'page_size': query.page_size,
+            'total_pages': (total_count + query.page_size - 1) // query.page_size,
+            'data': jobs_data,
+            'filters_applied': query.applied_filters(),
+            'did_you_mean': did_you_mean(query) if not total_count else {},
             'available_filters': self.get_available_filters()
         })
     
-    def get_applied_filters(self):
-        """Get currently applied filters"""
-        applied_filters = {}
-        
-        for param, value in self.request.query_params.items():
-            if param in ['search', 'title', 'company', 'location', 'job_type', 
-                        'experience_level', 'posted_after', 'posted_before',
-                        'salary_min', 'salary_max', 'skills', 
-                        'publisher_first_name', 'publisher_last_name', 'ordering']:
-                applied_filters[param] = value
-        
-        return applied_filters
-    
     def get_available_filters(self):
         """Get available filter options"""
         return {
@@ -135,38 +72,16 @@ class JobSearchStatsView(generics.GenericAPIView):
     """
     Get search statistics and aggregated data
     """
+    statement_timeout = 'report'
+    read_replica = True
     
     def get(self, request):
         """Get job statistics"""
         try:
-            stats = {
-                'total_jobs': Job.objects.filter(is_active=True).count(),
-                'jobs_by_type': dict(
-                    Job.objects.filter(is_active=True)
-                    .values_list('job_type')
-                    .annotate(count=Count('id'))
-                ),
-                'jobs_by_experience': dict(
-                    Job.objects.filter(is_active=True)
-                    .values_list('experience_level')
-                    .annotate(count=Count('id'))
-                ),
-                'top_companies': list(
-                    Job.objects.filter(is_active=True)
-                    .values('company_name')
-                    .annotate(job_count=Count('id'))
-                    .order_by('-job_count')[:10]
-                ),
-                'top_locations': list(
-                    Job.objects.filter(is_active=True)
-                    .values('location')
-                    .annotate(job_count=Count('id'))
-                    .order_by('-job_count')[:10]
-                ),
-                'recent_jobs_count': Job.objects.filter(
-                    is_active=True
-                ).count()  # Simplified for now
-            }
+            stats = get_job_facets()
+            if request.user.is_authenticated and get_role(request.user.id) in ['employer', 'company']:
+                # The shared facets stay cached; the employer's own numbers are added per request
+                stats = {**stats, 'my_jobs': employer_performance(request.user, get_days(request.query_params))}
             
             return Response({
                 'message': 'Job statistics retrieved successfully',
@@ -0,0 +1,328 @@
+"""
+Job query engine shared by every job list endpoint.
+
+Request parameters are parsed once into a typed JobQuery. Filters that cannot
+narrow the result (e.g. every job type selected) are dropped while parsing.
+The query's shape, meaning which filters are present plus the sort, selects a
+JobQueryPlan. Plans are built once per shape and cached. A plan applies the
+filters in an index-friendly form, e.g. date ranges on created_at rather than
+created_at::date. It orders with a pk tie-break so pages are stable, and it
+only joins or annotates what the query needs.
+
+A radius search (near=<place or "lat,lng">&radius_km=<n>) resolves the
+centre through the gazetteer, finds the places within the radius with a
+geohash prefix scan plus a vectorized haversine (see locations.gazetteer),
+and filters jobs by their canonical place.
+"""
+from dataclasses import dataclass, fields
+from datetime import datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE, MAX_PAGE_SIZE, positive_int
+from locations.gazetteer import DEFAULT_RADIUS_KM, MAX_RADIUS_KM, locations_within, resolve_point
+
+from .models import Job, JobApplication
+from .terms import SUGGEST_FIELDS, TERM_LOOKUPS, substring_filter, suggest
+
+
+JOB_TYPES = frozenset(choice[0] for choice in Job.JOB_TYPE_CHOICES)
+EXPERIENCE_LEVELS = frozenset(choice[0] for choice in Job.EXPERIENCE_CHOICES)
+
+DEFAULT_SORT = '-created_at'
+
+SEARCH_FIELDS = ('title', 'description', 'company_name', 'skills_required', 'location')
+# Publisher names the search text also matches, through their substring filters
+SEARCH_TERM_FIELDS = ('publisher_first_name', 'publisher_last_name')
+# Every job column a search matches a substring of
+SEARCH_COLUMNS = SEARCH_FIELDS + tuple(TERM_LOOKUPS[field] for field in SEARCH_TERM_FIELDS)
+
+# Most queries a job list request makes: user, count and page, plus one
+# side-table lookup per substring filter (search included), two per
+# suggestion field and two for a radius search (centre, places in range)
+JOB_QUERY_BUDGET = 3 + len(TERM_LOOKUPS) + len(SEARCH_TERM_FIELDS) + 2 * len(SUGGEST_FIELDS) + 2
+
+# Public sort keys and the column (or annotation) they order by
+SORT_FIELDS = {
+    'created_at': 'created_at',
+    'title': 'title',
+    'salary_min': 'salary_min',
+    'salary_max': 'salary_max',
+    'company_name': 'company_name',
+    'location': 'location',
+    'job_type': 'job_type',
+    'applications_count': 'num_applications',
+}
+
+# Endpoints grew different names for the same parameter; all are accepted
+PARAM_ALIASES = {
+    'company': ('company_name', 'company'),
+    'posted_after': ('posted_after', 'date_from'),
+    'posted_before': ('posted_before', 'date_to'),
+    'sort': ('sort_by', 'ordering'),
+    'radius_km': ('radius_km', 'radius'),
+}
+
+# Fields that parameterize another filter rather than filter on their own
+MODIFIER_FIELDS = ('radius_km',)
+
+
+def _first(params, name):
+    for alias in PARAM_ALIASES.get(name, (name,)):
+        value = params.get(alias)
+        if value is not None and str(value).strip():
+            return str(value).strip()
+    return None
+
+
+def _choices(params, name, allowed):
+    """Multi-valued choice parameter (?a=x&a=y or ?a=x,y); all choices means no filter"""
+    values = set()
+    for value in params.getlist(name) if hasattr(params, 'getlist') else [params.get(name) or '']:
+        values.update(v.strip() for v in value.split(',') if v.strip())
+    if values >= allowed:
+        return ()
+    return tuple(sorted(values))
+
+
+def _decimal(value):
+    try:
+        value = Decimal(value)
+    except (TypeError, InvalidOperation):
+        return None
+    return value if value.is_finite() else None
+
+
+def _date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class JobQuery:
+    search: str = None
+    title: str = None
+    company: str = None
+    location: str = None
+    job_types: tuple = ()
+    experience_levels: tuple = ()
+    salary_min: Decimal = None
+    salary_max: Decimal = None
+    skills: tuple = ()
+    posted_after: object = None
+    posted_before: object = None
+    posted_by: str = None
+    publisher_first_name: str = None
+    publisher_last_name: str = None
+    near: str = None
+    radius_km: Decimal = None
+    sort: str = DEFAULT_SORT
+    page: int = 1
+    page_size: int = DEFAULT_PAGE_SIZE
+
+    @classmethod
+    def from_params(cls, params, default_page_size=DEFAULT_PAGE_SIZE):
+        """Parse request query parameters; invalid values are ignored"""
+        salary_min = _decimal(_first(params, 'salary_min'))
+        skills = _first(params, 'skills')
+
+        near = _first(params, 'near')
+        if near is None and _first(params, 'lat') and _first(params, 'lng'):
+            near = f"{_first(params, 'lat')},{_first(params, 'lng')}"
+        radius_km = None
+        if near is not None:
+            radius_km = _decimal(_first(params, 'radius_km'))
+            radius_km = min(radius_km, Decimal(MAX_RADIUS_KM)) if radius_km and radius_km > 0 else Decimal(DEFAULT_RADIUS_KM)
+
+        sort = _first(params, 'sort') or DEFAULT_SORT
+        if sort.lstrip('-') not in SORT_FIELDS:
+            sort = DEFAULT_SORT
+
+        return cls(
+            search=_first(params, 'search'),
+            title=_first(params, 'title'),
+            company=_first(params, 'company'),
+            location=_first(params, 'location'),
+            job_types=_choices(params, 'job_type', JOB_TYPES),
+            experience_levels=_choices(params, 'experience_level', EXPERIENCE_LEVELS),
+            # Salaries are ranges: a job matches if its range overlaps the requested one
+            salary_min=salary_min if salary_min and salary_min > 0 else None,
+            salary_max=_decimal(_first(params, 'salary_max')),
+            skills=tuple(dict.fromkeys(s.strip() for s in skills.split(',') if s.strip())) if skills else (),
+            posted_after=_date(_first(params, 'posted_after')),
+            posted_before=_date(_first(params, 'posted_before')),
+            posted_by=_first(params, 'posted_by'),
+            publisher_first_name=_first(params, 'publisher_first_name'),
+            publisher_last_name=_first(params, 'publisher_last_name'),
+            near=near,
+            radius_km=radius_km,
+            sort=sort,
+            page=positive_int(params.get('page'), 1, MAX_PAGE),
+            page_size=positive_int(params.get('page_size'), default_page_size, MAX_PAGE_SIZE),
+        )
+
+    @property
+    def shape(self):
+        """Which filters are present (and how), plus the sort; keys the plan cache"""
+        present = []
+        for field in fields(self):
+            if field.name in ('sort', 'page', 'page_size') + MODIFIER_FIELDS:
+                continue
+            value = getattr(self, field.name)
+            if isinstance(value, tuple):
+                if value:
+                    present.append(f'{field.name}:{"one" if len(value) == 1 else "many"}')
+            elif value is not None:
+                present.append(field.name)
+        return tuple(present), self.sort
+
+    @property
+    def offset(self):
+        return (self.page - 1) * self.page_size
+
+    def applied_filters(self):
+        """The filters in effect, for echoing back in responses"""
+        applied = {}
+        for field in fields(self):
+            if field.name in ('page', 'page_size'):
+                continue
+            value = getattr(self, field.name)
+            if value in (None, ()):
+                continue
+            if isinstance(value, tuple):
+                value = list(value)
+            elif isinstance(value, Decimal):
+                value = float(value)
+            elif hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            applied[field.name] = value
+        return applied
+
+
+def _day_start(day):
+    start = datetime.combine(day, time.min)
+    return timezone.make_aware(start) if settings.USE_TZ else start
+
+
+def _near(q):
+    point = resolve_point(q.near)
+    nearby = locations_within(*point, float(q.radius_km)) if point else {}
+    return Q(place_id__in=list(nearby))
+
+
+def _any(conditions):
+    combined = Q()
+    for condition in conditions:
+        combined |= condition
+    return combined
+
+
+def _search(q):
+    return _any([
+        *(Q(**{f'{field}__icontains': q.search}) for field in SEARCH_FIELDS),
+        *(substring_filter(field, q.search) for field in SEARCH_TERM_FIELDS),
+    ])
+
+
+# Builders turn one JobQuery field into a filter condition
+FILTER_BUILDERS = {
+    'search': _search,
+    'title': lambda q: Q(title__icontains=q.title),
+    'company': lambda q: substring_filter('company', q.company),
+    'location': lambda q: substring_filter('location', q.location),
+    'job_types:one': lambda q: Q(job_type=q.job_types[0]),
+    'job_types:many': lambda q: Q(job_type__in=q.job_types),
+    'experience_levels:one': lambda q: Q(experience_level=q.experience_levels[0]),
+    'experience_levels:many': lambda q: Q(experience_level__in=q.experience_levels),
+    'salary_min': lambda q: Q(salary_max__gte=q.salary_min),
+    'salary_max': lambda q: Q(salary_min__lte=q.salary_max),
+    'skills:one': lambda q: Q(skills_required__icontains=q.skills[0]),
+    'skills:many': lambda q: _any(Q(skills_required__icontains=skill) for skill in q.skills),
+    # Ranges on the raw column can use an index on created_at; __date cannot
+    'posted_after': lambda q: Q(created_at__gte=_day_start(q.posted_after)),
+    'posted_before': lambda q: Q(created_at__lt=_day_start(q.posted_before + timedelta(days=1))),
+    'posted_by': lambda q: substring_filter('publisher_username', q.posted_by),
+    'publisher_first_name': lambda q: substring_filter('publisher_first_name', q.publisher_first_name),
+    'publisher_last_name': lambda q: substring_filter('publisher_last_name', q.publisher_last_name),
+    'near': _near,
+}
+
+
+def application_count():
+    """Per-row application count; evaluated only for the rows that are returned"""
+    counts = (
+        JobApplication.objects.filter(job=OuterRef('pk')).order_by()
+        .values('job').annotate(count=Count('id')).values('count')
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+class JobQueryPlan:
+    """How to turn JobQuerys of one shape into querysets"""
+
+    def __init__(self, shape):
+        present, sort = shape
+        self.builders = [FILTER_BUILDERS[name] for name in present]
+        field = SORT_FIELDS[sort.lstrip('-')]
+        direction = '-' if sort.startswith('-') else ''
+        self.order_by = (f'{direction}{field}', f'{direction}pk')
+
+    def filter(self, query, base):
+        conditions = Q()
+        for build in self.builders:
+            conditions &= build(query)
+        return base.filter(conditions) if self.builders else base
+
+    def ordered(self, jobs):
+        """Already filtered jobs in result order, ready for JobSerializer"""
+        jobs = jobs.select_related('posted_by').annotate(num_applications=application_count())
+        return jobs.order_by(*self.order_by)
+
+    def page(self, query, jobs):
+        """The requested page of already filtered jobs"""
+        return self.ordered(jobs)[query.offset:query.offset + query.page_size]
+
+
+@lru_cache(maxsize=512)
+def get_plan(shape):
+    return JobQueryPlan(shape)
+
+
+def active_jobs():
+    return Job.objects.filter(is_active=True)
+
+
+def run_job_query(query, base=None, rows=None):
+    """Return (total_count, jobs on the requested page); dicts when rows is a RowSerializer"""
+    base = active_jobs() if base is None else base
+    plan = get_plan(query.shape)
+    jobs = plan.filter(query, base)
+    total_count = jobs.order_by().count()
+    if query.offset >= total_count:
+        return total_count, []
+    jobs_page = plan.page(query, jobs)
+    return total_count, rows.serialize(jobs_page) if rows else list(jobs_page)
+
+
+def job_query_results(query, base=None):
+    """Every matching job in result order, for streaming"""
+    plan = get_plan(query.shape)
+    return plan.ordered(plan.filter(query, active_jobs() if base is None else base))
+
+
+def did_you_mean(query):
+    """Closest known values for the location/company filters of a query"""
+    suggestions = {}
+    for field in SUGGEST_FIELDS:
+        text = getattr(query, field)
+        values = suggest(field, text) if text else []
+        if values:
+            suggestions[field] = values
+    return suggestions
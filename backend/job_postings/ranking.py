@@ -0,0 +1,156 @@
+"""
+Applicant ranking for employers.
+
+For one job, every application's applicant skills and experience are compared
+against Job.skills_required and Job.experience_level in a single vectorized
+pass, and the result is stored on JobApplication.match_score so that sorting
+received applications by fit is an indexed read.
+
+When an applicant edits their profile, or an employer a job's requirements,
+the affected applications are rescored in a background thread after the
+commit, and only if a scored field changed.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+
+from .models import Job, JobApplication
+from .recommendations import EXPERIENCE_CODES, parse_skills, experience_years_to_code
+
+
+logger = logging.getLogger(__name__)
+
+SCORE_WEIGHTS = {
+    'skills': 0.7,
+    'experience': 0.3,
+}
+
+# Profile fields, by model label, that applicant scores are computed from
+SCORED_PROFILE_FIELDS = {
+    'profile_app.EmployeeProfile': ('skills', 'experience_years'),
+    'authentication.UserProfile': ('skills',),
+}
+
+# Job fields that applicant scores are computed from
+SCORED_JOB_FIELDS = ('skills_required', 'experience_level')
+
+_executor = None
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def compute_match_scores(job, applicants):
+    """Score (skills, experience_years) pairs against a job, returning a float array"""
+    job_skills = {skill: i for i, skill in enumerate(parse_skills(job.skills_required))}
+    count = len(applicants)
+
+    matrix = np.zeros((count, max(len(job_skills), 1)), dtype=bool)
+    experience = np.full(count, -1, dtype=np.int8)
+    for i, (skills, experience_years) in enumerate(applicants):
+        codes = [job_skills[s] for s in parse_skills(skills) if s in job_skills]
+        matrix[i, codes] = True
+        experience[i] = experience_years_to_code(experience_years)
+
+    if job_skills:
+        skill_scores = matrix.sum(axis=1) / float(len(job_skills))
+    else:
+        skill_scores = np.full(count, 0.5)
+
+    required = EXPERIENCE_CODES.get(job.experience_level, -1)
+    if required >= 0:
+        # Only a shortfall in experience is penalised
+        shortfall = np.maximum(required - experience.astype(np.int16), 0)
+        experience_scores = 1.0 - shortfall / float(len(EXPERIENCE_CODES) - 1)
+        experience_scores = np.where(experience < 0, 0.5, experience_scores)
+    else:
+        experience_scores = np.full(count, 0.5)
+
+    scores = SCORE_WEIGHTS['skills'] * skill_scores + SCORE_WEIGHTS['experience'] * experience_scores
+    return np.round(scores, 4)
+
+
+def applicant_scores_query(applications):
+    return applications.annotate(
+        skills=Coalesce(F('applicant__employee_profile__skills'), F('applicant__userprofile__skills')),
+        experience_years=F('applicant__employee_profile__experience_years'),
+    )
+
+
+def update_match_scores(job, application_ids=None):
+    """Recompute and persist match_score for a job's applications"""
+    applications = JobApplication.objects.filter(job=job)
+    if application_ids is not None:
+        applications = applications.filter(id__in=application_ids)
+
+    rows = list(applicant_scores_query(applications).values_list('id', 'skills', 'experience_years'))
+    if not rows:
+        return 0
+
+    scores = compute_match_scores(job, [(skills, years) for _, skills, years in rows])
+    updated = [
+        JobApplication(id=application_id, match_score=float(score))
+        for (application_id, _, _), score in zip(rows, scores)
+    ]
+    JobApplication.objects.bulk_update(updated, ['match_score'], batch_size=1000)
+    return len(updated)
+
+
+def update_applicant_match_scores(user_id):
+    """Recompute scores for every application submitted by one user, with one read and one bulk update"""
+    applications = list(
+        applicant_scores_query(JobApplication.objects.filter(applicant_id=user_id))
+        .select_related('job').only('id', 'job__skills_required', 'job__experience_level')
+    )
+    for application in applications:
+        applicant = [(application.skills, application.experience_years)]
+        application.match_score = float(compute_match_scores(application.job, applicant)[0])
+    JobApplication.objects.bulk_update(applications, ['match_score'], batch_size=1000)
+    return len(applications)
+
+
+def update_job_match_scores(job_id):
+    """Recompute scores for a job's applications against its saved requirements"""
+    job = Job.objects.filter(pk=job_id).only(*SCORED_JOB_FIELDS).first()
+    return update_match_scores(job) if job else 0
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='match-rescore')
+    return _executor
+
+
+def _rescore_in_background(rescore, key):
+    with _pending_lock:
+        _pending.discard((rescore, key))
+    try:
+        rescore(key)
+    except Exception:
+        logger.exception('%s(%s) failed', rescore.__name__, key)
+    finally:
+        close_old_connections()
+
+
+def _submit_rescore(rescore, key):
+    # Saves in quick succession rescore once; the queued run reads the latest rows
+    with _pending_lock:
+        if (rescore, key) in _pending:
+            return
+        _pending.add((rescore, key))
+    get_executor().submit(_rescore_in_background, rescore, key)
+
+
+def schedule_applicant_rescore(user_id):
+    """Queue rescoring the user's applications for after the current transaction commits"""
+    transaction.on_commit(lambda: _submit_rescore(update_applicant_match_scores, user_id))
+
+
+def schedule_job_rescore(job_id):
+    """Queue rescoring the job's applications for after the current transaction commits"""
+    transaction.on_commit(lambda: _submit_rescore(update_job_match_scores, job_id))
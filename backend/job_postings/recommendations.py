@@ -0,0 +1,257 @@
+"""
+Skill-based job recommendations for employees.
+
+Active jobs are packed into a JobMatrix of compact NumPy arrays once per
+job version, and candidate profiles are scored against every job in a single
+vectorized pass. The top-K results per user are kept in the cache and dropped
+when the user's profile, applications or any job changes (see signals.py).
+"""
+import threading
+
+import numpy as np
+from django.conf import settings
+
+from core.caching import TieredCache, versions
+from locations.geo import haversine_km
+
+from .applied import get_applied_job_ids
+from .models import Job
+
+
+JOB_TYPE_CODES = {choice[0]: code for code, choice in enumerate(Job.JOB_TYPE_CHOICES)}
+EXPERIENCE_CODES = {choice[0]: code for code, choice in enumerate(Job.EXPERIENCE_CHOICES)}
+
+SCORE_WEIGHTS = {
+    'skills': 0.45,
+    'location': 0.2,
+    'job_type': 0.15,
+    'salary': 0.1,
+    'experience': 0.1,
+}
+
+TOP_K = getattr(settings, 'RECOMMENDATION_TOP_K', 200)
+# Jobs whose place is this close to the preferred place count as a location match
+LOCATION_MATCH_KM = getattr(settings, 'RECOMMENDATION_LOCATION_MATCH_KM', 50)
+CACHE_TIMEOUT = getattr(settings, 'RECOMMENDATION_CACHE_TIMEOUT', 60 * 30)
+# Top-K lists are large, so each process keeps only this many in memory
+L1_MAX_ENTRIES = getattr(settings, 'RECOMMENDATION_L1_MAX_ENTRIES', 500)
+
+user_recommendations = TieredCache('recommendations', Job, timeout=CACHE_TIMEOUT, max_entries=L1_MAX_ENTRIES)
+
+
+def parse_skills(value):
+    """Split a comma-separated skills string into unique lowercase skills"""
+    if not value:
+        return []
+    seen = []
+    for skill in value.split(','):
+        skill = skill.strip().lower()
+        if skill and skill not in seen:
+            seen.append(skill)
+    return seen
+
+
+def experience_years_to_code(years):
+    """Map years of experience onto the Job.EXPERIENCE_CHOICES ordering"""
+    if years is None:
+        return -1
+    if years < 1:
+        return EXPERIENCE_CODES['entry']
+    if years < 3:
+        return EXPERIENCE_CODES['junior']
+    if years < 5:
+        return EXPERIENCE_CODES['mid']
+    return EXPERIENCE_CODES['senior']
+
+
+def _to_float(value):
+    return float(value) if value is not None else np.nan
+
+
+class JobMatrix:
+    """Column-oriented snapshot of all active jobs used for batch scoring"""
+
+    def __init__(self, rows):
+        count = len(rows)
+        self.ids = np.empty(count, dtype=np.int64)
+        self.posted_by = np.empty(count, dtype=np.int64)
+        self.job_types = np.empty(count, dtype=np.int8)
+        self.experience = np.empty(count, dtype=np.int8)
+        self.salary_min = np.empty(count, dtype=np.float64)
+        self.salary_max = np.empty(count, dtype=np.float64)
+        self.latitudes = np.empty(count, dtype=np.float64)
+        self.longitudes = np.empty(count, dtype=np.float64)
+
+        self.skill_index = {}
+        job_skills = []
+        location_index = {}
+        location_codes = np.empty(count, dtype=np.int32)
+
+        for i, row in enumerate(rows):
+            (job_id, posted_by_id, job_type, experience_level,
+             salary_min, salary_max, skills_required, location, latitude, longitude) = row
+            self.ids[i] = job_id
+            self.posted_by[i] = posted_by_id
+            self.job_types[i] = JOB_TYPE_CODES.get(job_type, -1)
+            self.experience[i] = EXPERIENCE_CODES.get(experience_level, -1)
+            self.salary_min[i] = _to_float(salary_min)
+            self.salary_max[i] = _to_float(salary_max)
+            self.latitudes[i] = _to_float(latitude)
+            self.longitudes[i] = _to_float(longitude)
+
+            codes = []
+            for skill in parse_skills(skills_required):
+                codes.append(self.skill_index.setdefault(skill, len(self.skill_index)))
+            job_skills.append(codes)
+
+            location = (location or '').strip().lower()
+            location_codes[i] = location_index.setdefault(location, len(location_index))
+
+        # Job skills in CSR layout: job i requires skill_codes[skill_indptr[i]:skill_indptr[i + 1]]
+        self.skill_counts = np.fromiter(map(len, job_skills), dtype=np.int32, count=count)
+        self.skill_indptr = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(self.skill_counts, out=self.skill_indptr[1:])
+        self.skill_codes = np.fromiter(
+            (code for codes in job_skills for code in codes), dtype=np.int32, count=int(self.skill_indptr[-1])
+        )
+
+        self.locations = np.array(list(location_index), dtype=str) if location_index else np.array([], dtype=str)
+        self.location_codes = location_codes
+        self.remote_locations = np.char.find(self.locations, 'remote') >= 0 if count else np.array([], dtype=bool)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls):
+        rows = list(
+            Job.objects.filter(is_active=True).values_list(
+                'id', 'posted_by_id', 'job_type', 'experience_level',
+                'salary_min', 'salary_max', 'skills_required', 'location',
+                'place__latitude', 'place__longitude'
+            )
+        )
+        return cls(rows)
+
+    def _skill_vectors(self, profiles):
+        vectors = np.zeros((len(profiles), len(self.skill_index)), dtype=np.float32)
+        for i, profile in enumerate(profiles):
+            codes = [self.skill_index[s] for s in parse_skills(profile.skills) if s in self.skill_index]
+            vectors[i, codes] = 1.0
+        return vectors
+
+    def _location_scores(self, profile):
+        preferred = (profile.preferred_location or '').strip().lower()
+        if preferred:
+            matches = np.char.find(self.locations, preferred) >= 0
+        else:
+            matches = np.zeros(len(self.locations), dtype=bool)
+        if profile.open_to_remote:
+            matches = matches | self.remote_locations
+        matches = matches[self.location_codes]
+        # Different spellings of one city, and its neighbours, match by distance
+        place = profile.preferred_place if profile.preferred_place_id else None
+        if place is not None:
+            distances = haversine_km(place.latitude, place.longitude, self.latitudes, self.longitudes)
+            matches = matches | (distances <= LOCATION_MATCH_KM)
+        return matches.astype(np.float32)
+
+    def _salary_scores(self, profile):
+        expected_min = _to_float(profile.expected_salary_min)
+        expected_max = _to_float(profile.expected_salary_max)
+        if np.isnan(expected_min) and np.isnan(expected_max):
+            return np.full(len(self), 0.5, dtype=np.float32)
+
+        expected_min = 0.0 if np.isnan(expected_min) else expected_min
+        expected_max = expected_min if np.isnan(expected_max) else expected_max
+        job_min = np.where(np.isnan(self.salary_min), self.salary_max, self.salary_min)
+        job_max = np.where(np.isnan(self.salary_max), self.salary_min, self.salary_max)
+
+        overlap = np.minimum(job_max, expected_max) - np.maximum(job_min, expected_min)
+        span = expected_max - expected_min
+        if span > 0:
+            scores = np.clip(overlap / span, 0.0, 1.0)
+        else:
+            scores = (overlap >= 0).astype(np.float32)
+        # Jobs without a published salary are neither rewarded nor penalised
+        return np.where(np.isnan(job_min), 0.5, scores).astype(np.float32)
+
+    def _experience_scores(self, profile):
+        code = experience_years_to_code(profile.experience_years)
+        if code < 0:
+            return np.full(len(self), 0.5, dtype=np.float32)
+        distance = np.abs(self.experience.astype(np.int16) - code)
+        scores = 1.0 - distance / float(len(EXPERIENCE_CODES) - 1)
+        return np.where(self.experience < 0, 0.5, scores).astype(np.float32)
+
+    def score(self, profiles):
+        """Return a (len(profiles), len(jobs)) matrix of match scores in [0, 1]"""
+        if not len(self) or not profiles:
+            return np.zeros((len(profiles), len(self)), dtype=np.float32)
+
+        # Per profile, the running count of its skills along skill_codes; each
+        # job's overlap is the difference across its CSR row
+        matched = np.zeros((len(profiles), len(self.skill_codes) + 1), dtype=np.float32)
+        np.cumsum(self._skill_vectors(profiles)[:, self.skill_codes], axis=1, out=matched[:, 1:])
+        overlap = matched[:, self.skill_indptr[1:]] - matched[:, self.skill_indptr[:-1]]
+        skill_scores = overlap / np.maximum(self.skill_counts, 1)
+
+        scores = SCORE_WEIGHTS['skills'] * skill_scores
+        for i, profile in enumerate(profiles):
+            job_type = JOB_TYPE_CODES.get(profile.preferred_job_type, -1)
+            type_scores = (self.job_types == job_type).astype(np.float32) if job_type >= 0 else 0.5
+            scores[i] += (
+                SCORE_WEIGHTS['location'] * self._location_scores(profile)
+                + SCORE_WEIGHTS['job_type'] * type_scores
+                + SCORE_WEIGHTS['salary'] * self._salary_scores(profile)
+                + SCORE_WEIGHTS['experience'] * self._experience_scores(profile)
+            )
+        return scores
+
+
+_matrix_lock = threading.Lock()
+_matrix = {'version': None, 'matrix': None}
+
+
+def get_jobs_version():
+    return versions.get(Job)
+
+
+def get_job_matrix(version=None):
+    """Return the process-local JobMatrix, rebuilding it when jobs changed"""
+    version = version or get_jobs_version()
+    with _matrix_lock:
+        if _matrix['version'] != version:
+            _matrix['matrix'] = JobMatrix.build()
+            _matrix['version'] = version
+        return _matrix['matrix']
+
+
+def get_recommendations(user, profile):
+    """Return the cached top-K list of (job_id, score) pairs for a user"""
+    return user_recommendations.get_or_set(user.id, lambda: score_user(user, profile))
+
+
+def score_user(user, profile):
+    matrix = get_job_matrix()
+    scores = matrix.score([profile])[0] if len(matrix) else np.zeros(0, dtype=np.float32)
+
+    applied_job_ids = np.fromiter(get_applied_job_ids(user.id), dtype=np.int64)
+    excluded = (matrix.posted_by == user.id) | np.isin(matrix.ids, applied_job_ids)
+    scores = np.where(excluded, -np.inf, scores)
+
+    k = min(TOP_K, int((~excluded).sum()))
+    if not k:
+        return []
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind='stable')]
+    return [(int(matrix.ids[i]), round(float(scores[i]), 4)) for i in top]
+
+
+def invalidate_job_recommendations():
+    """Bump the jobs version so every cached matrix and top-K list goes stale"""
+    versions.bump(Job)
+
+
+def invalidate_user_recommendations(user_id):
+    user_recommendations.delete(user_id)
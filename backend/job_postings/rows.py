@@ -0,0 +1,103 @@
+"""
+Row serializers for the job and application lists.
+
+Each one produces exactly what the ModelSerializer of the same name in
+serializers.py does, from one values_list() query. Keep the two in step
+when fields change; `manage.py benchmark_serializers` compares the outputs.
+AvailableJobRows has no ModelSerializer counterpart.
+"""
+from core.rows import Column, Constant, RowSerializer, as_float, decimal_string, file_url, full_name, iso_datetime
+
+from .models import Job, JobApplication
+from .tracking import performance
+
+
+money = decimal_string(Job._meta.get_field('salary_min').decimal_places)
+
+
+class JobRows(RowSerializer):
+    """JobSerializer; the queryset must annotate num_applications (see application_count)"""
+    columns = {
+        'id': 'id',
+        'title': 'title',
+        'description': 'description',
+        'company_name': 'company_name',
+        'location': 'location',
+        'job_type': 'job_type',
+        'experience_level': 'experience_level',
+        'salary_min': Column('salary_min', convert=money),
+        'salary_max': Column('salary_max', convert=money),
+        'skills_required': 'skills_required',
+        'is_active': 'is_active',
+        'created_at': Column('created_at', convert=iso_datetime),
+        'updated_at': Column('updated_at', convert=iso_datetime),
+        'posted_by_name': Column('posted_by__first_name', 'posted_by__last_name', convert=full_name),
+        'posted_by_email': 'posted_by__email',
+        'applications_count': 'num_applications',
+    }
+
+
+class MyJobRows(RowSerializer):
+    """JobSerializer plus the job's performance; the queryset must also annotate tracking.stats_annotations"""
+    columns = {
+        **JobRows.columns,
+        'performance': Column(
+            'num_views', 'num_impressions', 'num_recent_applications', 'sketch__unique_viewers',
+            convert=lambda views, impressions, applications, unique_viewers: performance(
+                views, impressions, applications, unique_viewers or 0
+            ),
+        ),
+    }
+
+
+class AvailableJobRows(RowSerializer):
+    """JobRows for jobs the requesting user has not applied to yet"""
+    columns = {
+        **JobRows.columns,
+        'can_apply': Constant(True),
+        'application_status': Constant('not_applied'),
+    }
+
+
+salary = decimal_string(JobApplication._meta.get_field('expected_salary').decimal_places)
+applicant_name = Column('applicant__first_name', 'applicant__last_name', convert=full_name)
+job_owner_name = Column('job__posted_by__first_name', 'job__posted_by__last_name', convert=full_name)
+
+
+class JobApplicationListRows(RowSerializer):
+    """JobApplicationListSerializer"""
+    columns = {
+        'id': 'id',
+        'status': 'status',
+        'applied_at': Column('applied_at', convert=iso_datetime),
+        'applicant_name': applicant_name,
+        'applicant_role': 'applicant__userprofile__role',
+        'job_title': 'job__title',
+        'company_name': 'job__company_name',
+        'applicant_phone': 'applicant_phone',
+        'expected_salary': Column('expected_salary', convert=salary),
+        'job_owner_name': job_owner_name,
+        'job_owner_email': 'job__posted_by__email',
+        'job_owner_role': 'job__posted_by__userprofile__role',
+    }
+
+
+class JobApplicationReceivedRows(RowSerializer):
+    """JobApplicationReceivedSerializer (no request in context, so resume URLs stay relative)"""
+    columns = {
+        'id': 'id',
+        'applied_at': Column('applied_at', convert=iso_datetime),
+        'applicant_name': applicant_name,
+        'applicant_role': 'applicant__userprofile__role',
+        'job_title': 'job__title',
+        'company_name': 'job__company_name',
+        'applicant_phone': 'applicant_phone',
+        'applicant_email': 'applicant__email',
+        'expected_salary': Column('expected_salary', convert=salary),
+        'job_owner_name': job_owner_name,
+        'job_owner_email': 'job__posted_by__email',
+        'job_owner_role': 'job__posted_by__userprofile__role',
+        'resume': Column('resume', convert=file_url(JobApplication._meta.get_field('resume'))),
+        'cover_letter': 'cover_letter',
+        'match_score': Column('match_score', convert=as_float),
+    }
@@ -0,0 +1,412 @@
+"""
+Saved searches, matched against each job as it is created or updated.
+
+A saved search is a set of JobSearchAPI parameters. Running every saved
+search against every new job would cost one query per search, so the
+searches are indexed the other way round (a percolator). Each search is
+stored under a few keys in SavedSearchKey. A job that matches the search
+is guaranteed to produce at least one of those keys:
+
+    g:<trigram>       a trigram of a text filter (search, title, company,
+                      location, skills, publisher); a job produces every
+                      trigram of its text
+    t:<type>|<level>  job type and experience level, either may be *
+    n:<geohash>       a cell covering a radius search; a job produces
+                      every prefix of its place's geohash
+
+Of the keys a search could be stored under, it takes the set that the
+fewest jobs produce: the rarest trigram, or the type/level pairs, or the
+covering cells. The share of jobs producing a key is estimated from a
+sample of recent jobs. A search needs at least one such filter. Salary
+and date filters only narrow the match; alone they would match too many
+jobs to index.
+
+To match a job, one query on the (key, search) index fetches the
+searches stored under the job's keys. Each of those candidates is then
+checked against every one of its filters in Python, with the same
+semantics as the job query engine (query.py). A job therefore never scans
+the saved searches it cannot match. The cost follows the number of
+candidates, not the number of saved searches.
+
+Matching runs in a background thread after the job's transaction
+commits. Each match is a SavedSearchMatch, and `manage.py
+send_search_digests` emails every user one digest of the jobs their
+searches matched since the last one, daily or weekly per search.
+`manage.py match_saved_searches` re-matches recently changed jobs, e.g.
+after a restart dropped queued work; matching a job twice is harmless.
+"""
+import logging
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import send_mass_mail
+from django.db import close_old_connections, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from locations.geo import covering_cells, haversine_km
+from locations.gazetteer import resolve_point
+
+from .models import Job, SavedSearch, SavedSearchKey, SavedSearchMatch
+from .query import SEARCH_COLUMNS, JobQuery
+from .terms import trigrams
+
+
+logger = logging.getLogger(__name__)
+
+MAX_PER_USER = getattr(settings, 'MAX_SAVED_SEARCHES_PER_USER', 20)
+FREQUENCIES = {'daily': timedelta(days=1), 'weekly': timedelta(days=7)}
+# Jobs listed per search in a digest
+DIGEST_JOBS = 20
+# Recent jobs the key shares are estimated from, and how long an estimate is kept
+SAMPLE_SIZE = 500
+SAMPLE_TTL = 60 * 60
+# Bound on the parameters of one IN (...) query
+IN_BATCH = 900
+
+# JobQuery field -> the parameter it is saved as
+SAVED_FIELDS = {
+    'search': 'search',
+    'title': 'title',
+    'company': 'company',
+    'location': 'location',
+    'job_types': 'job_type',
+    'experience_levels': 'experience_level',
+    'salary_min': 'salary_min',
+    'salary_max': 'salary_max',
+    'skills': 'skills',
+    'posted_after': 'posted_after',
+    'posted_before': 'posted_before',
+    'posted_by': 'posted_by',
+    'publisher_first_name': 'publisher_first_name',
+    'publisher_last_name': 'publisher_last_name',
+    'near': 'near',
+    'radius_km': 'radius_km',
+}
+
+# Text filter -> the job columns it matches a substring of (see FILTER_BUILDERS)
+TEXT_FILTERS = {
+    'search': SEARCH_COLUMNS,
+    'title': ('title',),
+    'company': ('company_name',),
+    'location': ('location',),
+    'posted_by': ('posted_by__username',),
+    'publisher_first_name': ('posted_by__first_name',),
+    'publisher_last_name': ('posted_by__last_name',),
+}
+TEXT_COLUMNS = tuple(dict.fromkeys(column for columns in TEXT_FILTERS.values() for column in columns))
+
+JOB_COLUMNS = TEXT_COLUMNS + (
+    'id', 'posted_by_id', 'job_type', 'experience_level', 'salary_min', 'salary_max', 'created_at',
+    'place__latitude', 'place__longitude', 'place__geohash',
+)
+
+# Job fields whose change can change which searches a job matches
+MATCHED_FIELDS = frozenset({
+    'title', 'description', 'company_name', 'skills_required', 'location', 'place',
+    'job_type', 'experience_level', 'salary_min', 'salary_max', 'is_active',
+})
+
+
+def saved_params(query):
+    """The filters of a JobQuery as the parameters it is saved, and parsed again, with"""
+    params = {}
+    for field, value in query.applied_filters().items():
+        if field in SAVED_FIELDS:
+            params[SAVED_FIELDS[field]] = ','.join(value) if isinstance(value, list) else str(value)
+    return params
+
+
+@lru_cache(maxsize=100000)
+def _parse(params):
+    return JobQuery.from_params(dict(params))
+
+
+def parse(params):
+    return _parse(tuple(sorted(params.items())))
+
+
+@lru_cache(maxsize=10000)
+def _point(near):
+    return resolve_point(near)
+
+
+class JobSample:
+    """Share of recent jobs producing a key, for picking the keys a search is stored under"""
+
+    def __init__(self, rows):
+        self.size = max(len(rows), 1)
+        self.grams, self.types, self.levels = Counter(), Counter(), Counter()
+        self.geohashes = []
+        for row in rows:
+            self.grams.update(job_grams(row))
+            self.types[row['job_type']] += 1
+            self.levels[row['experience_level']] += 1
+            if row['place__geohash']:
+                self.geohashes.append(row['place__geohash'])
+        self.built_at = time.monotonic()
+
+    def share(self, count):
+        # Never zero: a key no sampled job has is still rare, not impossible
+        return (count + 0.5) / self.size
+
+    def gram_share(self, gram):
+        return self.share(self.grams[gram])
+
+    def category_share(self, counter, values):
+        return sum(self.share(counter[value]) for value in values) if values else 1
+
+    def cell_share(self, cells):
+        cells = tuple(cells)
+        return self.share(sum(1 for geohash in self.geohashes if geohash.startswith(cells)))
+
+
+_sample = None
+
+
+def get_sample():
+    global _sample
+    if _sample is None or time.monotonic() - _sample.built_at > SAMPLE_TTL:
+        rows = Job.objects.filter(is_active=True).order_by('-created_at').values(*JOB_COLUMNS)[:SAMPLE_SIZE]
+        _sample = JobSample([prepare_job(row) for row in rows])
+    return _sample
+
+
+def prepare_job(row):
+    """A Job.values(*JOB_COLUMNS) row with its text lowercased, as the matcher reads it"""
+    for column in TEXT_COLUMNS:
+        row[column] = (row[column] or '').lower()
+    return row
+
+
+def job_grams(job):
+    grams = set()
+    for column in TEXT_COLUMNS:
+        grams |= trigrams(job[column])
+    return grams
+
+
+def job_keys(job):
+    """Every key a search the job matches may be stored under"""
+    keys = {f'g:{gram}' for gram in job_grams(job)}
+    job_type, level = job['job_type'], job['experience_level']
+    keys |= {f't:{job_type}|{level}', f't:{job_type}|*', f't:*|{level}'}
+    geohash = job['place__geohash'] or ''
+    keys |= {f'n:{geohash[:length]}' for length in range(1, len(geohash) + 1)}
+    return keys
+
+
+def _rarest_gram(text, sample):
+    return min(sorted(trigrams(text.lower())), key=sample.gram_share)
+
+
+def key_options(query, sample):
+    """(share of jobs, keys) for each key set the query could be stored under"""
+    options = []
+    for field in TEXT_FILTERS:
+        text = getattr(query, field)
+        if text and len(text) >= 3:
+            gram = _rarest_gram(text, sample)
+            options.append((sample.gram_share(gram), {f'g:{gram}'}))
+    # Skills are alternatives, so every one needs a key
+    if query.skills and all(len(skill) >= 3 for skill in query.skills):
+        grams = {_rarest_gram(skill, sample) for skill in query.skills}
+        options.append((sum(map(sample.gram_share, grams)), {f'g:{gram}' for gram in grams}))
+    if query.job_types or query.experience_levels:
+        share = (
+            sample.category_share(sample.types, query.job_types)
+            * sample.category_share(sample.levels, query.experience_levels)
+        )
+        options.append((share, {
+            f't:{job_type}|{level}' for job_type in query.job_types or ('*',) for level in query.experience_levels or ('*',)
+        }))
+    if query.near:
+        point = _point(query.near)
+        # Like the job query engine, a place that does not resolve matches no job
+        cells = covering_cells(*point, float(query.radius_km)) if point else []
+        options.append((sample.cell_share(cells) if cells else 0, {f'n:{cell}' for cell in cells}))
+    return options
+
+
+def is_indexable(query):
+    """Whether a query has a filter selective enough to store it under"""
+    return bool(
+        any(getattr(query, field) and len(getattr(query, field)) >= 3 for field in TEXT_FILTERS)
+        or (query.skills and all(len(skill) >= 3 for skill in query.skills))
+        or query.job_types or query.experience_levels or query.near
+    )
+
+
+def index_search(search):
+    """(Re)store search under its cheapest key set"""
+    options = key_options(parse(search.params), get_sample())
+    if not options:
+        raise ValueError('A saved search needs a keyword, job type, experience level or location')
+    _, keys = min(options, key=lambda option: (option[0], len(option[1])))
+    with transaction.atomic():
+        SavedSearchKey.objects.filter(search=search).delete()
+        SavedSearchKey.objects.bulk_create([SavedSearchKey(key=key, search=search) for key in sorted(keys)])
+    return keys
+
+
+def matches(query, job):
+    """Whether the job (a prepare_job row) passes every filter of query, as query.py applies them"""
+    for field, columns in TEXT_FILTERS.items():
+        text = getattr(query, field)
+        if text and not any(text.lower() in job[column] for column in columns):
+            return False
+    if query.skills and not any(skill.lower() in job['skills_required'] for skill in query.skills):
+        return False
+    if query.job_types and job['job_type'] not in query.job_types:
+        return False
+    if query.experience_levels and job['experience_level'] not in query.experience_levels:
+        return False
+    # Salary ranges overlap; a job without the bound never matches (NULL in SQL)
+    if query.salary_min is not None and (job['salary_max'] is None or job['salary_max'] < query.salary_min):
+        return False
+    if query.salary_max is not None and (job['salary_min'] is None or job['salary_min'] > query.salary_max):
+        return False
+    if query.posted_after or query.posted_before:
+        day = timezone.localdate(job['created_at']) if settings.USE_TZ else job['created_at'].date()
+        if (query.posted_after and day < query.posted_after) or (query.posted_before and day > query.posted_before):
+            return False
+    if query.near:
+        point = _point(query.near)
+        if point is None or job['place__latitude'] is None:
+            return False
+        distance = haversine_km(*point, [job['place__latitude']], [job['place__longitude']])[0]
+        if distance > float(query.radius_km):
+            return False
+    return True
+
+
+def _batches(values):
+    values = list(values)
+    for start in range(0, len(values), IN_BATCH):
+        yield values[start:start + IN_BATCH]
+
+
+def candidate_searches(job):
+    """(id, params) of the active searches stored under one of the job's keys, other than its poster's"""
+    search_ids = set()
+    for keys in _batches(job_keys(job)):
+        search_ids.update(SavedSearchKey.objects.filter(key__in=keys).values_list('search_id', flat=True))
+    for ids in _batches(search_ids):
+        yield from (
+            SavedSearch.objects.filter(pk__in=ids, is_active=True).exclude(user_id=job['posted_by_id'])
+            .values_list('id', 'params')
+        )
+
+
+def match_job(job_id):
+    """Record a match for every saved search the job satisfies; returns the new and existing matches' search ids"""
+    row = Job.objects.filter(pk=job_id, is_active=True).values(*JOB_COLUMNS).first()
+    if row is None:
+        return []
+    job = prepare_job(row)
+    matched = [search_id for search_id, params in candidate_searches(job) if matches(parse(params), job)]
+    SavedSearchMatch.objects.bulk_create(
+        [SavedSearchMatch(search_id=search_id, job_id=job_id) for search_id in matched],
+        ignore_conflicts=True, batch_size=1000,
+    )
+    return matched
+
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='saved-search-match')
+    return _executor
+
+
+def _match_in_background(job_id):
+    try:
+        match_job(job_id)
+    except Exception:
+        logger.exception('Matching job %s against saved searches failed', job_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_match(job_id):
+    get_executor().submit(_match_in_background, job_id)
+
+
+def due_searches(now):
+    """Active searches with unsent matches whose digest period has passed"""
+    return SavedSearch.objects.filter(
+        Q(last_notified_at__isnull=True)
+        | Q(frequency='daily', last_notified_at__lte=now - FREQUENCIES['daily'])
+        | Q(frequency='weekly', last_notified_at__lte=now - FREQUENCIES['weekly']),
+        Exists(SavedSearchMatch.objects.filter(search=OuterRef('pk'), notified_at__isnull=True)),
+        is_active=True,
+    )
+
+
+def describe(search):
+    return search.name or ', '.join(f'{name}={value}' for name, value in search.params.items())
+
+
+def digest_message(user, searches, now):
+    """(subject, body, from, [to]) listing the unsent matches of a user's searches"""
+    sections = []
+    for search in searches:
+        jobs = list(
+            Job.objects.filter(
+                saved_search_matches__search=search, saved_search_matches__notified_at__isnull=True,
+                saved_search_matches__matched_at__lte=now, is_active=True,
+            ).order_by('-saved_search_matches__matched_at').values_list('title', 'company_name', 'location')[:DIGEST_JOBS + 1]
+        )
+        if not jobs:
+            continue
+        lines = [f'  - {title} at {company} ({location})' for title, company, location in jobs[:DIGEST_JOBS]]
+        if len(jobs) > DIGEST_JOBS:
+            lines.append('  - and more')
+        sections.append(f'{describe(search)}:\n' + '\n'.join(lines))
+    if not sections or not user.email:
+        return None
+    body = f'Hi {user.first_name or user.username},\n\nNew jobs match your saved searches.\n\n' + '\n\n'.join(sections)
+    return ('New jobs for your saved searches', body, settings.EMAIL_HOST_USER, [user.email])
+
+
+def send_digests(now=None, batch_size=500):
+    """Email each user one digest of their due searches' matches; returns the number of emails sent"""
+    now = now or timezone.now()
+    sent = count = 0
+    by_user = defaultdict(list)
+    searches = due_searches(now).select_related('user').order_by('user_id', 'id')
+    for search in searches.iterator(chunk_size=batch_size):
+        # A batch ends between users, so each user gets one email
+        if count >= batch_size and search.user not in by_user:
+            sent += _send(by_user, now)
+            by_user, count = defaultdict(list), 0
+        by_user[search.user].append(search)
+        count += 1
+    if by_user:
+        sent += _send(by_user, now)
+    return sent
+
+
+def _send(by_user, now):
+    messages, search_ids = [], []
+    for user, searches in by_user.items():
+        message = digest_message(user, searches, now)
+        # Users without an email (or anything to list) keep their matches for a later digest
+        if message:
+            messages.append(message)
+            search_ids.extend(search.id for search in searches)
+    # Nothing is marked sent unless the mail went out; the next run retries
+    send_mass_mail(messages, fail_silently=False)
+    with transaction.atomic():
+        SavedSearchMatch.objects.filter(
+            search_id__in=search_ids, notified_at__isnull=True, matched_at__lte=now
+        ).update(notified_at=now)
+        SavedSearch.objects.filter(pk__in=search_ids).update(last_notified_at=now)
+    return len(messages)
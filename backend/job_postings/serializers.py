@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Job, JobApplication
+from django.db import transaction
+from .models import Job, JobApplication, SavedSearch
+from .query import JobQuery
+from .saved_searches import MAX_PER_USER, index_search, is_indexable, saved_params
 from authentication.models import UserProfile
 
 
@@ -20,7 +23,9 @@ class JobSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_applications_count(self, obj):
-        return obj.applications.count()
+        # Prefer a count annotated by the queryset over one query per job
+        count = getattr(obj, 'num_applications', None)
+        return count if count is not None else obj.applications.count()
 
 
 class JobCreateSerializer(serializers.ModelSerializer):
@@ -142,7 +147,7 @@ class JobApplicationReceivedSerializer(serializers.ModelSerializer):
             'id', 'applied_at', 'applicant_name', 'applicant_role',
             'job_title', 'company_name', 'applicant_phone', 'applicant_email',
             'expected_salary', 'job_owner_name', 'job_owner_email', 'job_owner_role',
-            'resume', 'cover_letter'
+            'resume', 'cover_letter', 'match_score'
         ]
 
 
@@ -186,4 +191,49 @@ class JobSearchSerializer(serializers.Serializer):
     experience_level = serializers.ChoiceField(choices=Job.EXPERIENCE_CHOICES, required=False)
     salary_min = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
     salary_max = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
-    company_name = serializers.CharField(required=False)
\ No newline at end of file
+    company_name = serializers.CharField(required=False)
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    """Saved search; params are JobSearchAPI query parameters"""
+    
+    class Meta:
+        model = SavedSearch
+        fields = ['id', 'name', 'params', 'frequency', 'is_active', 'created_at', 'last_notified_at']
+        read_only_fields = ['id', 'created_at', 'last_notified_at']
+    
+    def validate_params(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("Expected an object of search parameters")
+        query = JobQuery.from_params({
+            name: ','.join(map(str, item)) if isinstance(item, list) else str(item)
+            for name, item in value.items() if item is not None
+        })
+        if not is_indexable(query):
+            raise serializers.ValidationError(
+                "Add a keyword of 3 or more characters, a job type, an experience level or a location to save this search"
+            )
+        return saved_params(query)
+    
+    def validate(self, data):
+        user = self.context['request'].user
+        if self.instance is None:
+            if 'params' not in data:
+                raise serializers.ValidationError({'params': 'This field is required.'})
+            if SavedSearch.objects.filter(user=user).count() >= MAX_PER_USER:
+                raise serializers.ValidationError(f"You can save up to {MAX_PER_USER} searches")
+        return data
+    
+    def create(self, validated_data):
+        validated_data['user'] = self.context['request'].user
+        with transaction.atomic():
+            search = super().create(validated_data)
+            index_search(search)
+        return search
+    
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            search = super().update(instance, validated_data)
+            if 'params' in validated_data:
+                index_search(search)
+        return search
@@ -0,0 +1,147 @@
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from django.contrib.auth.models import User
+from django.db import transaction
+from authentication.models import UserProfile
+from locations.gazetteer import resolve_location_id
+from profile_app.models import EmployeeProfile
+from .models import Job, JobApplication
+from .applied import invalidate_applied_job_ids
+from .autocomplete import TERM_COLUMNS, autocomplete, instance_terms, job_terms as autocomplete_terms
+from .recommendations import invalidate_job_recommendations, invalidate_user_recommendations
+from .ranking import (
+    SCORED_JOB_FIELDS, SCORED_PROFILE_FIELDS, schedule_applicant_rescore, schedule_job_rescore, update_match_scores
+)
+from .saved_searches import MATCHED_FIELDS, schedule_match
+from .terms import add_terms, indexed_fields, job_terms
+
+
+@receiver(pre_save, sender=Job)
+def job_place(sender, instance, update_fields=None, **kwargs):
+    """Resolve the free-text location to its canonical place (saved along with it, see Job.save)"""
+    if update_fields is None or 'location' in update_fields:
+        instance.place_id = resolve_location_id(instance.location)
+
+
+@receiver(pre_save, sender=Job)
+def job_previous(sender, instance, **kwargs):
+    """
+    Remember the terms the saved row contributed, so the typeahead can drop
+    them, and its scored fields, so an unrelated edit does not rescore
+    """
+    columns = (*TERM_COLUMNS, *SCORED_JOB_FIELDS)
+    previous = Job.objects.filter(pk=instance.pk).values_list(*columns).first() if instance.pk else None
+    instance._autocomplete_previous = autocomplete_terms(*previous[:len(TERM_COLUMNS)]) if previous else {}
+    instance._scored_previous = previous[len(TERM_COLUMNS):] if previous else None
+
+
+@receiver(post_save, sender=Job)
+def job_autocomplete_saved(sender, instance, **kwargs):
+    removed, added = getattr(instance, '_autocomplete_previous', {}), instance_terms(instance)
+    transaction.on_commit(lambda: autocomplete.apply(removed, added))
+
+
+@receiver(post_delete, sender=Job)
+def job_autocomplete_deleted(sender, instance, **kwargs):
+    removed = instance_terms(instance)
+    transaction.on_commit(lambda: autocomplete.apply(removed, {}))
+
+
+@receiver([post_save, post_delete], sender=Job)
+def job_changed(sender, instance, **kwargs):
+    """Any job change invalidates the recommendation matrix"""
+    invalidate_job_recommendations()
+
+
+@receiver(post_save, sender=Job)
+def job_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    """Re-rank applicants, after commit, when the job's requirements changed"""
+    if created:
+        return
+    if update_fields is not None and not set(SCORED_JOB_FIELDS) & set(update_fields):
+        return
+    if getattr(instance, '_scored_previous', None) != tuple(getattr(instance, field) for field in SCORED_JOB_FIELDS):
+        schedule_job_rescore(instance.pk)
+
+
+@receiver(post_save, sender=Job)
+def job_terms_saved(sender, instance, **kwargs):
+    """
+    Keep new locations/companies/publishers searchable and suggestible.
+    Writes that skip this signal must add their terms too (see terms.py).
+    """
+    add_terms(job_terms(instance))
+
+
+@receiver(post_save, sender=Job)
+def job_saved_search_match(sender, instance, update_fields=None, **kwargs):
+    """Match new and changed jobs against the saved searches, after commit"""
+    if not instance.is_active:
+        return
+    if update_fields is not None and not MATCHED_FIELDS & set(update_fields):
+        return
+    job_id = instance.pk
+    transaction.on_commit(lambda: schedule_match(job_id))
+
+
+@receiver(post_save, sender=User)
+def publisher_renamed(sender, instance, update_fields=None, **kwargs):
+    """Publisher names are filtered through the side table too (see terms.py)"""
+    if 'publisher_username' not in indexed_fields():
+        return
+    if update_fields is not None and not {'username', 'first_name', 'last_name'} & set(update_fields):
+        return
+    if Job.objects.filter(posted_by=instance).exists():
+        add_terms({
+            ('publisher_username', instance.username),
+            ('publisher_first_name', instance.first_name),
+            ('publisher_last_name', instance.last_name),
+        })
+
+
+@receiver(pre_save, sender=EmployeeProfile)
+def employee_preferred_place(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'preferred_location' in update_fields:
+        instance.preferred_place_id = resolve_location_id(instance.preferred_location)
+
+
+@receiver([post_save, post_delete], sender=EmployeeProfile)
+def employee_profile_changed(sender, instance, **kwargs):
+    invalidate_user_recommendations(instance.user_id)
+
+
+def scored_fields_saved(sender, update_fields):
+    fields = SCORED_PROFILE_FIELDS[sender._meta.label]
+    return fields if update_fields is None else [field for field in fields if field in update_fields]
+
+
+@receiver(pre_save, sender=EmployeeProfile)
+@receiver(pre_save, sender=UserProfile)
+def applicant_profile_previous(sender, instance, update_fields=None, **kwargs):
+    """Remember the scored fields' saved values, so an unrelated edit does not rescore"""
+    fields = scored_fields_saved(sender, update_fields)
+    if fields and instance.pk:
+        instance._scored_previous = sender.objects.filter(pk=instance.pk).values_list(*fields).first()
+    else:
+        instance._scored_previous = None
+
+
+@receiver(post_save, sender=EmployeeProfile)
+@receiver(post_save, sender=UserProfile)
+def applicant_profile_saved(sender, instance, update_fields=None, **kwargs):
+    """Rescore the applicant's applications, after commit, when a scored field changed"""
+    fields = scored_fields_saved(sender, update_fields)
+    if fields and getattr(instance, '_scored_previous', None) != tuple(getattr(instance, field) for field in fields):
+        schedule_applicant_rescore(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=JobApplication)
+def application_changed(sender, instance, **kwargs):
+    invalidate_applied_job_ids(instance.applicant_id)
+    invalidate_user_recommendations(instance.applicant_id)
+
+
+@receiver(post_save, sender=JobApplication)
+def application_saved(sender, instance, created=False, **kwargs):
+    if created:
+        update_match_scores(instance.job, [instance.id])
@@ -0,0 +1,172 @@
+"""
+Substring matching and "did you mean" for location, company and publisher
+name filters.
+
+On PostgreSQL, icontains on these columns is served by the pg_trgm GIN
+indexes from migrations 0008/0009. Other backends cannot index a
+substring match, so the distinct values of each field are kept in
+SearchTerm. Each value's lowercase trigrams are stored in SearchTermGram.
+A substring filter first finds the values that contain every trigram of
+the search text. That runs against a small, indexed table. The job filter
+then becomes an indexed `IN` on those exact values.
+
+That filter can only find jobs whose value is in SearchTerm, so every write
+of Job.location, Job.company_name or a publisher's User name fields must
+add its values with add_terms(). Model saves do (signals.job_terms_saved,
+signals.publisher_renamed). Writes that skip signals, such as bulk_create()
+or queryset update(), must call add_terms() themselves or run rebuild_terms()
+(`manage.py rebuild_search_terms`) afterwards, as seed_benchmark_data does.
+Values are never removed, so stale entries only cost an unused IN element.
+
+Suggestions rank values by trigram overlap with the text, so a typo such
+as "bangalor" or "acme crop" still finds its value. They come from the
+side table on every backend.
+"""
+from django.db import connections
+from django.db.models import Count, Q
+
+from .models import Job, SearchTerm, SearchTermGram
+
+
+# SearchTerm.field -> Job lookup it stands for
+TERM_LOOKUPS = {
+    'location': 'location',
+    'company': 'company_name',
+    'publisher_username': 'posted_by__username',
+    'publisher_first_name': 'posted_by__first_name',
+    'publisher_last_name': 'posted_by__last_name',
+}
+SUGGEST_FIELDS = ('location', 'company')
+
+# More matching values than this and a plain scan is as good as an IN list
+MAX_MATCHED_VALUES = 500
+SUGGESTION_LIMIT = 5
+MIN_SIMILARITY = 0.3
+
+
+def normalize(value):
+    return ' '.join((value or '').lower().split())
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def uses_trigram_indexes():
+    return connections['default'].vendor == 'postgresql'
+
+
+def indexed_fields():
+    """Fields kept in the side table on this backend"""
+    return SUGGEST_FIELDS if uses_trigram_indexes() else tuple(TERM_LOOKUPS)
+
+
+def job_terms(job):
+    """(field, value) pairs a job contributes to the side table"""
+    fields = indexed_fields()
+    pairs = {('location', job.location), ('company', job.company_name)}
+    if 'publisher_username' in fields:
+        user = job.posted_by
+        pairs |= {
+            ('publisher_username', user.username),
+            ('publisher_first_name', user.first_name),
+            ('publisher_last_name', user.last_name),
+        }
+    return {(field, value) for field, value in pairs if field in fields}
+
+
+def add_terms(pairs, check_existing=True):
+    """Insert the (field, value) pairs that are not in the side table yet"""
+    pairs = {(field, value) for field, value in pairs if normalize(value)}
+    if not pairs:
+        return 0
+    existing = set()
+    if check_existing:
+        existing_filter = Q()
+        for field, value in pairs:
+            existing_filter |= Q(field=field, value=value)
+        existing = set(SearchTerm.objects.filter(existing_filter).values_list('field', 'value'))
+
+    terms = []
+    for field, value in pairs - existing:
+        normalized = normalize(value)[:200]
+        terms.append(SearchTerm(
+            field=field, value=value, normalized=normalized, gram_count=len(trigrams(normalized))
+        ))
+    if not terms:
+        return 0
+    SearchTerm.objects.bulk_create(terms, ignore_conflicts=True)
+
+    created = SearchTerm.objects.filter(
+        field__in={t.field for t in terms}, value__in={t.value for t in terms}, grams__isnull=True
+    )
+    SearchTermGram.objects.bulk_create([
+        SearchTermGram(term=term, field=term.field, gram=gram)
+        for term in created for gram in trigrams(term.normalized)
+    ], batch_size=5000)
+    return len(terms)
+
+
+def rebuild_terms(batch_size=5000):
+    """Rebuild the side table from the current jobs and their publishers"""
+    SearchTerm.objects.all().delete()
+    fields = indexed_fields()
+    pairs = set()
+    for field in fields:
+        values = Job.objects.order_by().values_list(TERM_LOOKUPS[field], flat=True).distinct()
+        pairs.update((field, value) for value in values)
+    pairs = sorted(pairs)
+    for start in range(0, len(pairs), batch_size):
+        add_terms(pairs[start:start + batch_size], check_existing=False)
+    return len(pairs)
+
+
+def matching_values(field, text):
+    """Values of `field` containing `text`, or None when there are too many to list"""
+    normalized = normalize(text)
+    grams = trigrams(normalized)
+    terms = SearchTerm.objects.filter(field=field)
+    if grams:
+        candidate_ids = (
+            SearchTermGram.objects.filter(field=field, gram__in=grams)
+            .values('term').annotate(shared=Count('id')).filter(shared=len(grams))
+            .values('term')
+        )
+        terms = terms.filter(id__in=candidate_ids)
+    # Trigrams narrow the candidates; containment is still checked exactly
+    terms = terms.filter(normalized__contains=normalized)
+    values = list(terms.values_list('value', flat=True)[:MAX_MATCHED_VALUES + 1])
+    if len(values) > MAX_MATCHED_VALUES:
+        return None
+    # normalized collapses whitespace; keep only what icontains would match
+    needle = text.lower()
+    return [value for value in values if needle in value.lower()]
+
+
+def substring_filter(field, text):
+    """Q matching jobs whose `field` contains `text`, case-insensitively"""
+    lookup = TERM_LOOKUPS[field]
+    if not uses_trigram_indexes():
+        values = matching_values(field, text)
+        if values is not None:
+            return Q(**{f'{lookup}__in': values})
+    return Q(**{f'{lookup}__icontains': text})
+
+
+def suggest(field, text, limit=SUGGESTION_LIMIT):
+    """Values of `field` most similar to `text` (trigram Jaccard similarity)"""
+    grams = trigrams(normalize(text))
+    if not grams:
+        return []
+    candidates = (
+        SearchTermGram.objects.filter(field=field, gram__in=grams)
+        .values('term').annotate(shared=Count('id')).order_by('-shared')[:50]
+    )
+    shared = {row['term']: row['shared'] for row in candidates}
+    scored = []
+    for term in SearchTerm.objects.filter(id__in=shared.keys()).only('value', 'gram_count'):
+        similarity = shared[term.id] / (len(grams) + term.gram_count - shared[term.id])
+        if similarity >= MIN_SIMILARITY:
+            scored.append((similarity, term.value))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [value for _, value in scored[:limit]]
@@ -1,3 +1,438 @@
+from datetime import timedelta
+from unittest import mock, skipIf
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from django.http import QueryDict
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import UserProfile
+from profile_app.models import EmployeeProfile
+
+from .autocomplete import (
+    FIELDS as AUTOCOMPLETE_FIELDS, Autocomplete, PrefixIndex, autocomplete, bump_version, get_version
+)
+from .management.commands.check_query_plans import check_plan, plan_cases
+from .models import Job, JobApplication, JobDailyStats, SavedSearch, SavedSearchMatch
+from .recommendations import SCORE_WEIGHTS, JobMatrix
+from .query import DEFAULT_SORT, JobQuery, _day_start, run_job_query
+from .ranking import update_applicant_match_scores, update_job_match_scores, update_match_scores
+from . import saved_searches
+from .saved_searches import JOB_COLUMNS, index_search, match_job, matches, prepare_job, send_digests
+from .terms import matching_values, substring_filter, suggest
+from .tracking import JobActivity, employer_performance, stats_annotations
+
+
+def make_user(username, role='employee', **fields):
+    user = User.objects.create_user(username, f'{username}@example.com', 'password', **fields)
+    UserProfile.objects.create(user=user, role=role)
+    return user
+
+
+def make_job(posted_by, **fields):
+    values = {
+        'title': 'Python Developer',
+        'description': 'Build APIs',
+        'company_name': 'Acme',
+        'location': 'Remote',
+        'job_type': 'full_time',
+        'experience_level': 'junior',
+        'skills_required': 'python, django',
+        **fields,
+    }
+    return Job.objects.create(posted_by=posted_by, **values)
+
+
+class RecommendedJobsTests(TestCase):
+    def setUp(self):
+        self.employer = make_user('employer', role='employer')
+        self.employee = make_user('employee')
+        EmployeeProfile.objects.create(user=self.employee, skills='python, django', preferred_job_type='full_time')
+        self.client = APIClient()
+        self.client.force_authenticate(self.employee)
+
+    def test_skips_jobs_deactivated_since_caching(self):
+        kept = make_job(self.employer)
+        closed = make_job(self.employer, title='Django Developer')
+        response = self.client.get(reverse('recommended-jobs'))
+        self.assertEqual({job['id'] for job in response.json()['data']}, {kept.id, closed.id})
+
+        # A queryset update sends no signal, so the cached ranking still lists the job
+        Job.objects.filter(pk=closed.pk).update(is_active=False)
+        response = self.client.get(reverse('recommended-jobs'))
+        self.assertEqual([job['id'] for job in response.json()['data']], [kept.id])
+
+    def test_skill_scores_are_the_share_of_required_skills_held(self):
+        jobs = [
+            make_job(self.employer, skills_required='Python, Django'),
+            make_job(self.employer, skills_required=''),
+            make_job(self.employer, skills_required='go, python, rust'),
+            make_job(self.employer, skills_required='rust'),
+        ]
+        matrix = JobMatrix.build()
+        profiles = [EmployeeProfile(skills='django, python'), EmployeeProfile(skills='rust, python'), EmployeeProfile()]
+        scores = matrix.score(profiles)
+        no_skills = scores[2]
+        shares = {jobs[0].id: [1, 1 / 2], jobs[1].id: [0, 0], jobs[2].id: [1 / 3, 2 / 3], jobs[3].id: [0, 1]}
+        for column, job_id in enumerate(matrix.ids):
+            for row, share in enumerate(shares[job_id]):
+                self.assertAlmostEqual(
+                    scores[row][column] - no_skills[column], SCORE_WEIGHTS['skills'] * share, places=5
+                )
+
+
+class ApplicantRescoreTests(TestCase):
+    def setUp(self):
+        employer = make_user('employer', role='employer')
+        self.employee = make_user('employee')
+        self.profile = EmployeeProfile.objects.create(user=self.employee, skills='python', experience_years=2)
+        self.jobs = [
+            make_job(employer, skills_required='python, django', experience_level='mid'),
+            make_job(employer, skills_required='python', experience_level='entry'),
+        ]
+        for job in self.jobs:
+            JobApplication.objects.create(job=job, applicant=self.employee)
+
+    def scores(self):
+        return dict(JobApplication.objects.values_list('job_id', 'match_score'))
+
+    def test_scores_every_application_against_its_job(self):
+        EmployeeProfile.objects.filter(pk=self.profile.pk).update(skills='python, django', experience_years=6)
+        self.assertEqual(update_applicant_match_scores(self.employee.id), 2)
+        by_applicant = self.scores()
+        for job in self.jobs:
+            update_match_scores(job)
+        self.assertEqual(by_applicant, self.scores())
+        self.assertEqual(by_applicant[self.jobs[0].id], 1.0)
+
+    @mock.patch('job_postings.signals.schedule_applicant_rescore')
+    def test_rescores_only_when_a_scored_field_changes(self, schedule):
+        self.profile.notice_period = '1 month'
+        self.profile.save()
+        self.profile.save(update_fields=['notice_period'])
+        self.employee.userprofile.save()
+        schedule.assert_not_called()
+
+        self.profile.skills = 'python, django'
+        self.profile.save()
+        schedule.assert_called_once_with(self.employee.id)
+
+    @mock.patch('job_postings.signals.schedule_job_rescore')
+    def test_rescores_a_job_only_when_a_scored_field_changes(self, schedule):
+        job = self.jobs[0]
+        job.title = 'Senior Python Developer'
+        job.save()
+        job.save(update_fields=['title'])
+        schedule.assert_not_called()
+
+        job.experience_level = 'senior'
+        job.save()
+        schedule.assert_called_once_with(job.id)
+
+    def test_job_rescoring_waits_for_the_commit(self):
+        job = self.jobs[1]
+        update_match_scores(job)
+        before = self.scores()[job.id]
+        job.skills_required = 'python, django'
+        # Only the rescore; the saved-search matcher would run in its own thread
+        with mock.patch('job_postings.ranking._submit_rescore') as submit, mock.patch('job_postings.signals.schedule_match'):
+            with self.captureOnCommitCallbacks(execute=True):
+                job.save()
+                submit.assert_not_called()
+        submit.assert_called_once_with(update_job_match_scores, job.id)
+        self.assertEqual(update_job_match_scores(job.id), 1)
+        self.assertLess(self.scores()[job.id], before)
+
+
+def parse(query_string):
+    return JobQuery.from_params(QueryDict(query_string))
+
+
+class JobQueryTests(TestCase):
+    def setUp(self):
+        self.employer = make_user('employer', role='employer', first_name='Grace', last_name='Hopper')
+        self.python = make_job(self.employer, salary_min=50000, salary_max=70000)
+        self.golang = make_job(
+            make_user('other', role='employer'), title='Go Developer', description='Build services',
+            company_name='Initech', location='Berlin', job_type='contract', experience_level='senior',
+            skills_required='go', salary_min=90000, salary_max=120000,
+        )
+
+    def ids(self, query_string):
+        _, jobs = run_job_query(parse(query_string))
+        return [job.id for job in jobs]
+
+    def test_parses_aliases_and_drops_invalid_values(self):
+        query = parse('company=acme&date_from=2024-01-02&ordering=bogus&salary_min=-5&salary_max=abc&skills=go, ,go')
+        self.assertEqual(query.company, 'acme')
+        self.assertEqual(query.posted_after.isoformat(), '2024-01-02')
+        self.assertEqual(query.sort, DEFAULT_SORT)
+        self.assertIsNone(query.salary_min)
+        self.assertIsNone(query.salary_max)
+        self.assertEqual(query.skills, ('go',))
+
+    def test_selecting_every_choice_is_no_filter(self):
+        query = parse('job_type=full_time,part_time,contract,internship&experience_level=senior')
+        self.assertEqual(query.job_types, ())
+        self.assertEqual(query.shape, (('experience_levels:one',), DEFAULT_SORT))
+
+    def test_search_matches_job_text_and_publisher_names(self):
+        self.assertEqual(self.ids('search=initech'), [self.golang.id])
+        self.assertEqual(self.ids('search=grace'), [self.python.id])
+        self.assertEqual(self.ids('search=HOPP'), [self.python.id])
+        self.assertEqual(self.ids('search=nobody'), [])
+
+    def test_salary_ranges_overlap(self):
+        self.assertEqual(self.ids('salary_min=60000&salary_max=80000'), [self.python.id])
+        self.assertEqual(self.ids('salary_min=75000&salary_max=85000'), [])
+        self.assertEqual(self.ids('salary_min=100000'), [self.golang.id])
+
+    def test_sorts_with_a_stable_tie_break(self):
+        same_title = make_job(self.employer)
+        self.assertEqual(self.ids('sort_by=title'), [self.golang.id, self.python.id, same_title.id])
+        self.assertEqual(self.ids('sort_by=-title'), [same_title.id, self.python.id, self.golang.id])
+
+    def test_pages_past_the_end_are_empty(self):
+        total, jobs = run_job_query(parse('page=3&page_size=1'))
+        self.assertEqual((total, jobs), (2, []))
+
+    def test_saved_search_matcher_agrees_with_the_engine(self):
+        rows = [prepare_job(row) for row in Job.objects.values(*JOB_COLUMNS)]
+        for query_string in ('search=grace', 'search=initech', 'company=acme&location=remote',
+                             'job_type=contract', 'salary_min=60000&salary_max=80000', 'publisher_last_name=hop'):
+            query = parse(query_string)
+            matched = sorted(row['id'] for row in rows if matches(query, row))
+            self.assertEqual(matched, sorted(self.ids(query_string)), query_string)
+
+
+class QueryPlanTests(TestCase):
+    """The check_query_plans cases, on a few rows"""
+
+    def setUp(self):
+        employer = make_user('employer', role='employer')
+        employee = make_user('employee')
+        for salary in (40000, 60000, 80000):
+            job = make_job(employer, salary_min=salary, salary_max=salary + 10000)
+            JobApplication.objects.create(job=job, applicant=employee)
+        if connection.vendor == 'postgresql':
+            # Tables this small are cheaper to scan; check that an index can serve each query
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def test_queries_use_their_indexes(self):
+        for name, queryset, expected in plan_cases():
+            with self.subTest(name):
+                self.assertEqual(check_plan(queryset.explain(), expected), [])
+
+
+class PlaceResolutionTests(TestCase):
+    def setUp(self):
+        self.employee = make_user('employee')
+        self.job = make_job(make_user('employer', role='employer'), location='London')
+
+    def test_place_follows_a_location_saved_alone(self):
+        self.assertEqual(self.job.place.name, 'London')
+        self.job.location = 'Berlin'
+        self.job.save(update_fields=['location'])
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.place.name, 'Berlin')
+
+    def test_other_partial_saves_keep_the_place(self):
+        Job.objects.filter(pk=self.job.pk).update(location='Berlin')
+        self.job.title = 'Django Developer'
+        self.job.save(update_fields=['title'])
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.place.name, 'London')
+
+    def test_preferred_place_follows_a_preferred_location_saved_alone(self):
+        profile = EmployeeProfile.objects.create(user=self.employee, preferred_location='London')
+        self.assertEqual(profile.preferred_place.name, 'London')
+        profile.preferred_location = 'Berlin'
+        profile.save(update_fields=['preferred_location'])
+        profile.refresh_from_db()
+        self.assertEqual(profile.preferred_place.name, 'Berlin')
+
+
+class JobStatsTests(TestCase):
+    def setUp(self):
+        self.employer = make_user('employer', role='employer')
+        self.job = make_job(self.employer)
+        today = timezone.localdate()
+        for days_ago, username in ((0, 'today'), (6, 'in_window'), (7, 'before_window')):
+            application = JobApplication.objects.create(job=self.job, applicant=make_user(username))
+            # Just after local midnight, where a bound in the wrong time zone misplaces it
+            applied_at = _day_start(today - timedelta(days=days_ago)) + timedelta(minutes=1)
+            JobApplication.objects.filter(pk=application.pk).update(applied_at=applied_at)
+
+    def test_applications_are_counted_from_the_first_day_of_the_window(self):
+        job = Job.objects.annotate(**stats_annotations(7)).get(pk=self.job.pk)
+        self.assertEqual(job.num_recent_applications, 2)
+        stats = employer_performance(self.employer, 7)
+        self.assertEqual(stats['applications'], 2)
+        self.assertEqual(sum(day['applications'] for day in stats['daily']), 2)
+
+    def test_activity_adds_to_the_daily_totals(self):
+        deleted = make_job(self.employer)
+        activity = JobActivity()
+        activity.add([self.job.id, deleted.id], impressions=1)
+        activity.add([self.job.id], views=1)
+        deleted.delete()
+        activity.flush()
+        activity.add([self.job.id], views=2)
+        activity.flush()
+        self.assertEqual(
+            list(JobDailyStats.objects.values_list('job_id', 'views', 'impressions')), [(self.job.id, 3, 1)]
+        )
+        self.assertEqual(activity.snapshot(), {'pending': 0, 'flushes': 2, 'failures': 0})
+
+
+class SavedSearchTests(TestCase):
+    def setUp(self):
+        saved_searches._sample = None
+        self.employer = make_user('employer', role='employer')
+        self.employee = make_user('employee')
+        self.job = make_job(self.employer, title='Senior Python Developer', location='Berlin')
+
+    def save_search(self, user, **params):
+        search = SavedSearch.objects.create(user=user, params=params)
+        index_search(search)
+        return search
+
+    def test_matches_the_searches_a_job_satisfies(self):
+        python = self.save_search(self.employee, search='python')
+        in_berlin = self.save_search(self.employee, search='python', location='berlin', job_type='full_time')
+        self.save_search(self.employee, search='golang')
+        self.save_search(self.employee, job_type='contract')
+        self.save_search(self.employer, search='python')
+        self.assertEqual(sorted(match_job(self.job.id)), [python.id, in_berlin.id])
+        # Matching again records nothing new
+        match_job(self.job.id)
+        self.assertEqual(SavedSearchMatch.objects.count(), 2)
+
+    def test_digests_go_to_users_with_an_email(self):
+        no_email = make_user('no_email')
+        User.objects.filter(pk=no_email.pk).update(email='')
+        sent = self.save_search(self.employee, search='python')
+        kept = self.save_search(User.objects.get(pk=no_email.pk), search='python')
+        match_job(self.job.id)
+
+        self.assertEqual(send_digests(), 1)
+        self.assertEqual(mail.outbox[0].to, ['employee@example.com'])
+        self.assertIn('Senior Python Developer at Acme (Berlin)', mail.outbox[0].body)
+        self.assertFalse(SavedSearchMatch.objects.filter(search=sent, notified_at__isnull=True).exists())
+        # Kept until the user has somewhere to receive it
+        self.assertTrue(SavedSearchMatch.objects.filter(search=kept, notified_at__isnull=True).exists())
+        self.assertIsNone(SavedSearch.objects.get(pk=kept.pk).last_notified_at)
+
+
+class InlineThread:
+    def __init__(self, target, **kwargs):
+        self.target = target
+
+    def start(self):
+        self.target()
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = make_user('employer', role='employer')
+        self.job = make_job(self.employer, title='Senior Python Developer', skills_required='Python, Docker')
+        self.autocomplete = Autocomplete()
+        self.autocomplete.rebuild()
+
+    def values(self, prefix, field='title'):
+        return [entry['value'] for entry in self.autocomplete.complete(prefix, [field])[field]]
+
+    def test_matches_the_start_of_any_word(self):
+        for prefix in ('sen', 'dev', 'python d', 'SENIOR  Python'):
+            self.assertEqual(self.values(prefix), ['Senior Python Developer'])
+        for prefix in ('eloper', 'developers', ''):
+            self.assertEqual(self.values(prefix), [])
+        self.assertEqual(self.values('dock', 'skill'), ['Docker'])
+
+    def test_terms_are_weighted_by_the_jobs_using_them(self):
+        index = PrefixIndex()
+        index.add('Python Developer')
+        index.add('python  developer ')
+        index.add('Python Engineer')
+        self.assertEqual(index.complete('py'), [
+            {'value': 'Python Developer', 'count': 2}, {'value': 'Python Engineer', 'count': 1}
+        ])
+        index.remove('Python Developer')
+        self.assertEqual(index.complete('dev'), [{'value': 'Python Developer', 'count': 1}])
+        index.remove('Python Developer')
+        self.assertEqual(index.complete('dev'), [])
+        self.assertEqual(index.entries, [('engineer', 'python engineer'), ('python engineer', 'python engineer')])
+
+    @mock.patch('job_postings.autocomplete.SCAN_LIMIT', 0)
+    def test_changes_drop_the_cached_top_results(self):
+        index = PrefixIndex()
+        index.add('Python Developer')
+        index.complete('py')
+        self.assertIn('py', index.top)
+        index.add('Python Engineer')
+        self.assertEqual([entry['value'] for entry in index.complete('py')], ['Python Developer', 'Python Engineer'])
+
+    def test_deactivated_jobs_drop_out(self):
+        autocomplete.rebuild()
+        self.addCleanup(setattr, autocomplete, 'indexes', None)
+        self.assertIn('Senior Python Developer', [e['value'] for e in autocomplete.complete('dev', ['title'])['title']])
+        self.job.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.save()
+        self.assertEqual(autocomplete.complete('dev'), {field: [] for field in AUTOCOMPLETE_FIELDS})
+
+    @mock.patch('job_postings.autocomplete.threading.Thread', InlineThread)
+    def test_other_processes_changes_rebuild_the_index(self):
+        # Inserted without signals, as another process's change looks from here
+        Job.objects.bulk_create([Job(
+            posted_by=self.employer, title='Data Engineer', description='-', company_name='Acme',
+            location='Remote', job_type='full_time', experience_level='junior', skills_required='sql',
+        )])
+        bump_version()
+        # Rebuilt at most once per REBUILD_INTERVAL
+        self.assertEqual(self.values('eng'), [])
+        with mock.patch('job_postings.autocomplete.REBUILD_INTERVAL', 0):
+            self.assertEqual(self.values('eng'), ['Data Engineer'])
+        self.assertEqual(self.autocomplete.version, get_version())
+
+
+class SearchTermTests(TestCase):
+    def setUp(self):
+        employer = make_user('employer', role='employer', first_name='Ada')
+        for location, company in (('Bangalore', 'Acme Corp'), ('New  York', 'Initech'), ('York', 'Acme Labs')):
+            make_job(employer, location=location, company_name=company)
+
+    def test_matching_values_contain_the_text(self):
+        self.assertEqual(sorted(matching_values('company', 'acme')), ['Acme Corp', 'Acme Labs'])
+        self.assertEqual(sorted(matching_values('location', 'YORK')), ['New  York', 'York'])
+        self.assertEqual(matching_values('location', 'paris'), [])
+        # As icontains: runs of spaces are not collapsed
+        self.assertEqual(matching_values('location', 'new  york'), ['New  York'])
+        self.assertEqual(matching_values('location', 'new york'), [])
+
+    @skipIf(connection.vendor == 'postgresql', 'PostgreSQL filters through its trigram indexes')
+    def test_substring_filter_agrees_with_icontains(self):
+        for text in ('york', 'new  york', 'galo', 'zzz'):
+            matched = Job.objects.filter(substring_filter('location', text))
+            expected = Job.objects.filter(location__icontains=text)
+            self.assertQuerySetEqual(matched, expected, ordered=False)
+        self.assertEqual(Job.objects.filter(substring_filter('publisher_first_name', 'ad')).count(), 3)
+
+    def test_too_many_values_fall_back_to_a_scan(self):
+        with mock.patch('job_postings.terms.MAX_MATCHED_VALUES', 1):
+            self.assertIsNone(matching_values('company', 'acme'))
+            self.assertEqual(substring_filter('company', 'acme'), Q(company_name__icontains='acme'))
 
-# Create your tests here.
+    def test_suggestions_survive_typos(self):
+        self.assertEqual(suggest('location', 'bangalor'), ['Bangalore'])
+        self.assertEqual(suggest('company', 'acme crop'), ['Acme Corp'])
+        self.assertEqual(suggest('location', 'xq'), [])
+        self.assertEqual(suggest('location', 'qqqqqq'), [])
@@ -0,0 +1,177 @@
+"""
+Detail views and search impressions of jobs, rolled up per job and day.
+
+Employers had no way to see how often a listing was opened or shown in
+search results. An UPDATE per view would also make every popular job a
+lock hot spot. So track_view() and track_impressions() only add to a
+per-process counter (core.buffering). Every JOB_STATS_FLUSH_SECONDS the
+counter is written to JobDailyStats, one upsert per batch of rows, adding
+to the day's totals:
+
+    INSERT ... ON CONFLICT (job_id, date) DO UPDATE SET views = views + excluded.views, ...
+
+Jobs deleted in the meantime are dropped by a join with the job table.
+Totals lag by up to the flush interval, and a worker that is killed loses
+what it had not flushed.
+
+MyJobRows (MyJobsAPI) and employer_performance() (JobSearchStatsView) turn
+the rollup into views/applications conversion over the last `days` days.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from core.buffering import ProcessLocal, WriteBuffer
+from core.sketches import record_view
+
+from .models import Job, JobApplication, JobDailyStats, JobSketch
+from .query import _day_start
+
+
+FLUSH_SECONDS = getattr(settings, 'JOB_STATS_FLUSH_SECONDS', 5)
+BATCH_SIZE = 500
+DEFAULT_DAYS = 30
+MAX_DAYS = 365
+
+
+class JobActivity(WriteBuffer):
+    """Per-process views and impressions, by (job id, date)"""
+
+    def empty(self):
+        return defaultdict(lambda: [0, 0])
+
+    def add(self, job_ids, views=0, impressions=0):
+        today = timezone.localdate()
+        with self.lock:
+            for job_id in job_ids:
+                counts = self.pending[job_id, today]
+                counts[0] += views
+                counts[1] += impressions
+
+    def write(self, pending):
+        # Sorted, so concurrent flushes lock the rows in the same order
+        rows = sorted((job_id, date, views, impressions) for (job_id, date), (views, impressions) in pending.items())
+        for start in range(0, len(rows), BATCH_SIZE):
+            upsert_daily_stats(rows[start:start + BATCH_SIZE])
+
+
+activity = ProcessLocal(lambda: JobActivity(FLUSH_SECONDS, name='job-stats-flush'))
+
+
+def upsert_daily_stats(rows):
+    """Add (job id, date, views, impressions) rows to JobDailyStats"""
+    quote = connection.ops.quote_name
+    table = quote(JobDailyStats._meta.db_table)
+    job_column = quote(JobDailyStats._meta.get_field('job').column)
+    date_column = quote('date')
+    # VALUES columns are column1, column2, ... on PostgreSQL and SQLite alike;
+    # SQLite needs the WHERE to parse ON CONFLICT after a SELECT
+    sql = f"""
+        INSERT INTO {table} ({job_column}, {date_column}, views, impressions)
+        SELECT v.column1, v.column2, v.column3, v.column4
+        FROM (VALUES {', '.join(['(%s, %s, %s, %s)'] * len(rows))}) AS v
+        JOIN {quote(Job._meta.db_table)} AS j ON j.id = v.column1
+        WHERE true
+        ON CONFLICT ({job_column}, {date_column}) DO UPDATE SET
+            views = {table}.views + excluded.views,
+            impressions = {table}.impressions + excluded.impressions
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, [value for row in rows for value in row])
+
+
+def track_view(request, job_id, user=None):
+    """Count a detail view of the job, and its viewer among the unique viewers"""
+    activity.get().add([job_id], views=1)
+    record_view(JobSketch, job_id, request, user)
+
+
+def track_impressions(jobs_data):
+    """Count an impression of every job on a page of results"""
+    if jobs_data:
+        activity.get().add([job['id'] for job in jobs_data], impressions=1)
+
+
+def get_days(params):
+    """The ?days= reporting window, 1 to MAX_DAYS"""
+    try:
+        days = int(params.get('days', DEFAULT_DAYS))
+    except (TypeError, ValueError):
+        days = DEFAULT_DAYS
+    return max(1, min(days, MAX_DAYS))
+
+
+def window_start(days):
+    return timezone.localdate() - timedelta(days=days - 1)
+
+
+def rate(count, total):
+    return round(count / total, 4) if total else None
+
+
+def performance(views, impressions, applications, unique_viewers=None):
+    """Totals and the rates between them: views per impression, applications per view"""
+    data = {
+        'views': views,
+        'impressions': impressions,
+        'applications': applications,
+        'click_through_rate': rate(views, impressions),
+        'conversion_rate': rate(applications, views),
+    }
+    if unique_viewers is not None:
+        data['unique_viewers'] = unique_viewers
+    return data
+
+
+def stats_annotations(days):
+    """Per-row views, impressions and applications over the window; see MyJobRows"""
+    since = window_start(days)
+
+    def total(field):
+        totals = (
+            JobDailyStats.objects.filter(job=OuterRef('pk'), date__gte=since).order_by()
+            .values('job').annotate(total=Sum(field)).values('total')
+        )
+        return Coalesce(Subquery(totals), 0)
+
+    # Bounded by an aware datetime, as query.py bounds created_at; __date casts every row
+    applications = (
+        JobApplication.objects.filter(job=OuterRef('pk'), applied_at__gte=_day_start(since)).order_by()
+        .values('job').annotate(count=Count('id')).values('count')
+    )
+    return {
+        'num_views': total('views'),
+        'num_impressions': total('impressions'),
+        'num_recent_applications': Coalesce(Subquery(applications), 0),
+    }
+
+
+def employer_performance(user, days):
+    """Totals and a daily series over the window for the jobs user posted"""
+    since = window_start(days)
+    daily = {
+        row['date']: [row['views'], row['impressions'], 0]
+        for row in JobDailyStats.objects.filter(job__posted_by=user, date__gte=since)
+        .values('date').annotate(views=Sum('views'), impressions=Sum('impressions')).order_by()
+    }
+    applications = (
+        JobApplication.objects.filter(job__posted_by=user, applied_at__gte=_day_start(since))
+        .annotate(date=TruncDate('applied_at')).values('date').annotate(count=Count('id')).order_by()
+    )
+    for row in applications:
+        daily.setdefault(row['date'], [0, 0, 0])[2] = row['count']
+    views, impressions, applied = (sum(counts[i] for counts in daily.values()) for i in range(3))
+    return {
+        'days': days,
+        'jobs': Job.objects.filter(posted_by=user).count(),
+        **performance(views, impressions, applied),
+        'daily': [
+            {'date': date.isoformat(), 'views': counts[0], 'impressions': counts[1], 'applications': counts[2]}
+            for date, counts in sorted(daily.items())
+        ],
+    }
@@ -3,9 +3,12 @@ from .views import (
     JobCreateAPI, JobListAPI, JobDetailAPI, JobApplyAPI, MyJobsAPI, 
     JobUpdateAPI, MyApplicationsAPI, JobApplicationsReceivedAPI,
     ApplicationDetailAPI, UpdateApplicationStatusAPI, JobDeleteAPI,
-    JobSearchAPI, JobFiltersAPI, JobTextSearchAPI, AvailableJobsAPI, JobFilterAPI
+    JobSearchAPI, JobFiltersAPI, JobTextSearchAPI, AvailableJobsAPI, JobFilterAPI,
+    RecommendedJobsAPI, JobAutocompleteAPI,
+    SavedSearchListCreateAPI, SavedSearchDetailAPI, SavedSearchMatchesAPI
 )
 from .optimized_views import OptimizedJobListView, JobSearchStatsView
+from .async_views import AsyncJobSearchView, AsyncJobDetailView
 
 urlpatterns = [
     # Optimized Search & Filter (NEW)
@@ -16,15 +19,26 @@ urlpatterns = [
     path('create/', JobCreateAPI.as_view(), name='job-create'),
     path('list/', JobListAPI.as_view(), name='job-list'),
     path('available/', AvailableJobsAPI.as_view(), name='available-jobs'),
+    path('recommended/', RecommendedJobsAPI.as_view(), name='recommended-jobs'),
     path('search/', JobTextSearchAPI.as_view(), name='job-text-search'),
     path('advanced-search/', JobSearchAPI.as_view(), name='job-advanced-search'),
     path('filter/', JobFilterAPI.as_view(), name='job-filter'),
     path('filters/', JobFiltersAPI.as_view(), name='job-filters'),
+    path('autocomplete/', JobAutocompleteAPI.as_view(), name='job-autocomplete'),
     path('detail/<int:job_id>/', JobDetailAPI.as_view(), name='job-detail'),
     path('update/<int:job_id>/', JobUpdateAPI.as_view(), name='job-update'),
     path('delete/<int:job_id>/', JobDeleteAPI.as_view(), name='job-delete'),
     path('my-jobs/', MyJobsAPI.as_view(), name='my-jobs'),
     
+    # Saved searches, matched against new and updated jobs
+    path('saved-searches/', SavedSearchListCreateAPI.as_view(), name='saved-searches'),
+    path('saved-searches/<int:search_id>/', SavedSearchDetailAPI.as_view(), name='saved-search-detail'),
+    path('saved-searches/<int:search_id>/matches/', SavedSearchMatchesAPI.as_view(), name='saved-search-matches'),
+    
+    # Async read paths (served concurrently under ASGI)
+    path('async/advanced-search/', AsyncJobSearchView.as_view(), name='job-advanced-search-async'),
+    path('async/detail/<int:job_id>/', AsyncJobDetailView.as_view(), name='job-detail-async'),
+    
     # Job Applications
     path('apply/<int:job_id>/', JobApplyAPI.as_view(), name='job-apply'),
     path('my-applications/', MyApplicationsAPI.as_view(), name='my-applications'),
@@ -4,14 +4,27 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.shortcuts import get_object_or_404
-from .models import Job, JobApplication
+from django.db.models import F, Exists, OuterRef
+from django.db.models.functions import Coalesce
+from .models import Job, JobApplication, SavedSearch
 from .serializers import (
     JobSerializer, JobCreateSerializer, JobApplicationCreateSerializer,
-    JobApplicationListSerializer, JobApplicationDetailSerializer,
-    ApplicationStatusUpdateSerializer, JobApplicationReceivedSerializer,
-    JobSearchSerializer
+    JobApplicationDetailSerializer, ApplicationStatusUpdateSerializer,
+    JobSearchSerializer, SavedSearchSerializer
 )
+from .query import (
+    JOB_QUERY_BUDGET, JobQuery, MAX_PAGE_SIZE, active_jobs, application_count, did_you_mean, job_query_results,
+    run_job_query
+)
+from .applied import APPLIED_IDS_INLINE_LIMIT, get_applied_job_ids
+from .recommendations import get_recommendations
+from .rows import AvailableJobRows, JobApplicationListRows, JobApplicationReceivedRows, JobRows, MyJobRows
+from .tracking import get_days, stats_annotations, track_impressions, track_view
+from .autocomplete import DEFAULT_LIMIT, FIELDS as AUTOCOMPLETE_FIELDS, MAX_LIMIT, autocomplete
 from authentication.models import UserProfile
+from core.pagination import get_page_params, stream_response, wants_stream
+from core.purge import delete_with_files
+from profile_app.models import EmployeeProfile
 
 
 class JobCreateAPI(APIView):
@@ -50,93 +63,25 @@ class JobCreateAPI(APIView):
 
 
 class JobListAPI(APIView):
+    statement_timeout = 'search'
+    read_replica = True
+    query_budget = JOB_QUERY_BUDGET
+    
     def get(self, request):
         try:
-            jobs = Job.objects.filter(is_active=True)
-            
-            # Search functionality
-            search = request.query_params.get('search')
-            if search:
-                from django.db.models import Q
-                jobs = jobs.filter(
-                    Q(title__icontains=search) |
-                    Q(description__icontains=search) |
-                    Q(company_name__icontains=search) |
-                    Q(skills_required__icontains=search) |
-                    Q(location__icontains=search)
-                )
+            query = JobQuery.from_params(request.query_params)
+            total_count, jobs_data = run_job_query(query, rows=JobRows)
+            track_impressions(jobs_data)
+            page, page_size = query.page, query.page_size
             
-            # Filter by location
-            location = request.query_params.get('location')
-            if location:
-                jobs = jobs.filter(location__icontains=location)
-            
-            # Filter by job type
-            job_type = request.query_params.get('job_type')
-            if job_type:
-                jobs = jobs.filter(job_type=job_type)
-            
-            # Filter by experience level
-            experience_level = request.query_params.get('experience_level')
-            if experience_level:
-                jobs = jobs.filter(experience_level=experience_level)
-            
-            # Filter by company
-            company_name = request.query_params.get('company_name')
-            if company_name:
-                jobs = jobs.filter(company_name__icontains=company_name)
-            
-            # Filter by salary range
-            salary_min = request.query_params.get('salary_min')
-            if salary_min:
-                jobs = jobs.filter(salary_max__gte=salary_min)
-            
-            salary_max = request.query_params.get('salary_max')
-            if salary_max:
-                jobs = jobs.filter(salary_min__lte=salary_max)
-            
-            # Filter by skills
-            skills = request.query_params.get('skills')
-            if skills:
-                skill_list = [skill.strip() for skill in skills.split(',')]
-                from django.db.models import Q
-                skill_query = Q()
-                for skill in skill_list:
-                    skill_query |= Q(skills_required__icontains=skill)
-                jobs = jobs.filter(skill_query)
-            
-            # Date range filters
-            date_from = request.query_params.get('date_from')
-            if date_from:
-                jobs = jobs.filter(created_at__date__gte=date_from)
-            
-            date_to = request.query_params.get('date_to')
-            if date_to:
-                jobs = jobs.filter(created_at__date__lte=date_to)
-            
-            # Sorting
-            sort_by = request.query_params.get('sort_by', '-created_at')
-            valid_sort_fields = ['created_at', '-created_at', 'title', '-title', 'salary_min', '-salary_min', 'salary_max', '-salary_max']
-            if sort_by in valid_sort_fields:
-                jobs = jobs.order_by(sort_by)
-            
-            # Pagination
-            page = int(request.query_params.get('page', 1))
-            page_size = int(request.query_params.get('page_size', 10))
-            start = (page - 1) * page_size
-            end = start + page_size
-            
-            total_count = jobs.count()
-            jobs_page = jobs[start:end]
-            
-            serializer = JobSerializer(jobs_page, many=True)
             return Response({
                 'message': 'Jobs retrieved successfully',
                 'count': total_count,
                 'page': page,
                 'page_size': page_size,
                 'total_pages': (total_count + page_size - 1) // page_size,
-                'data': serializer.data
+                'did_you_mean': did_you_mean(query) if not total_count else {},
+                'data': jobs_data
             }, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({
@@ -145,13 +90,18 @@ class JobListAPI(APIView):
 
 
 class JobDetailAPI(APIView):
+    read_replica = True
+    
     def get(self, request, job_id):
         try:
-            job = get_object_or_404(Job, id=job_id, is_active=True)
+            job = get_object_or_404(
+                Job.objects.annotate(unique_viewers=Coalesce('sketch__unique_viewers', 0)), id=job_id, is_active=True
+            )
+            track_view(request, job.pk)
             serializer = JobSerializer(job)
             return Response({
                 'message': 'Job retrieved successfully',
-                'data': serializer.data
+                'data': {**serializer.data, 'unique_viewers': job.unique_viewers}
             }, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({
@@ -244,22 +194,19 @@ class MyApplicationsAPI(APIView):
                 applications = applications.order_by(sort_by)
             
             # Pagination
-            page = int(request.query_params.get('page', 1))
-            page_size = min(int(request.query_params.get('page_size', 10)), 50)
-            start = (page - 1) * page_size
-            end = start + page_size
+            page, page_size, start, end = get_page_params(request.query_params)
             
             total_count = applications.count()
             applications_page = applications[start:end]
             
-            serializer = JobApplicationListSerializer(applications_page, many=True, context={'request': request})
+            applications_data = JobApplicationListRows.serialize(applications_page)
             return Response({
                 'message': 'Your applications retrieved successfully',
                 'count': total_count,
                 'page': page,
                 'page_size': page_size,
                 'total_pages': (total_count + page_size - 1) // page_size,
-                'data': serializer.data
+                'data': applications_data
             }, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({
@@ -306,29 +253,28 @@ class JobApplicationsReceivedAPI(APIView):
             if date_to:
                 applications = applications.filter(applied_at__date__lte=date_to)
             
-            # Sorting
+            # Sorting (match_score sorts best-fit applicants first, unscored last)
             sort_by = request.query_params.get('sort_by', '-applied_at')
             valid_sort_fields = ['-applied_at', 'applied_at', 'status', '-status']
-            if sort_by in valid_sort_fields:
+            if sort_by in ['match_score', '-match_score']:
+                applications = applications.order_by(F('match_score').desc(nulls_last=True), '-applied_at')
+            elif sort_by in valid_sort_fields:
                 applications = applications.order_by(sort_by)
             
             # Pagination
-            page = int(request.query_params.get('page', 1))
-            page_size = min(int(request.query_params.get('page_size', 10)), 50)
-            start = (page - 1) * page_size
-            end = start + page_size
+            page, page_size, start, end = get_page_params(request.query_params)
             
             total_count = applications.count()
             applications_page = applications[start:end]
             
-            serializer = JobApplicationReceivedSerializer(applications_page, many=True)
+            applications_data = JobApplicationReceivedRows.serialize(applications_page)
             return Response({
                 'message': 'Applications retrieved successfully',
                 'count': total_count,
                 'page': page,
                 'page_size': page_size,
                 'total_pages': (total_count + page_size - 1) // page_size,
-                'data': serializer.data
+                'data': applications_data
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
@@ -487,10 +433,27 @@ class MyJobsAPI(APIView):
                 # Employees cannot post jobs, return empty
                 jobs = Job.objects.none()
             
-            serializer = JobSerializer(jobs, many=True)
+            # Views, impressions and applications over the last ?days= days (see tracking.py)
+            days = get_days(request.query_params)
+            jobs = jobs.select_related('posted_by').annotate(
+                num_applications=application_count(), **stats_annotations(days)
+            ).order_by('-created_at', '-id')
+            
+            if wants_stream(request):
+                return stream_response('Your jobs retrieved successfully', MyJobRows.values(jobs), MyJobRows.many)
+            
+            page, page_size, start, end = get_page_params(request.query_params)
+            total_count = jobs.count()
+            
+            jobs_data = MyJobRows.serialize(jobs[start:end])
             return Response({
                 'message': 'Your jobs retrieved successfully',
-                'data': serializer.data
+                'count': total_count,
+                'page': page,
+                'page_size': page_size,
+                'total_pages': (total_count + page_size - 1) // page_size,
+                'days': days,
+                'data': jobs_data
             }, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({
@@ -549,8 +512,8 @@ class JobDeleteAPI(APIView):
                     'error': 'Companies can only delete company jobs'
                 }, status=status.HTTP_403_FORBIDDEN)
             
-            # Delete the job
-            job.delete()
+            # Applicants' resume files are queued for the background sweeper
+            delete_with_files(job)
             return Response({
                 'message': 'Job deleted successfully'
             }, status=status.HTTP_200_OK)
@@ -563,114 +526,18 @@ class JobDeleteAPI(APIView):
 
 class JobSearchAPI(APIView):
     """Advanced job search with multiple filters"""
+    throttle_scope = 'search'
+    statement_timeout = 'search'
+    read_replica = True
+    query_budget = JOB_QUERY_BUDGET
     
     def get(self, request):
         try:
-            jobs = Job.objects.filter(is_active=True)
+            query = JobQuery.from_params(request.query_params)
+            total_count, jobs_data = run_job_query(query, rows=JobRows)
+            track_impressions(jobs_data)
+            page, page_size = query.page, query.page_size
             
-            # Text search across multiple fields
-            search = request.query_params.get('search')
-            if search and search.strip():  # Check if search is not empty
-                from django.db.models import Q
-                jobs = jobs.filter(
-                    Q(title__icontains=search) |
-                    Q(description__icontains=search) |
-                    Q(company_name__icontains=search) |
-                    Q(skills_required__icontains=search) |
-                    Q(location__icontains=search)
-                )
-            
-            # Location filter
-            location = request.query_params.get('location')
-            if location:
-                jobs = jobs.filter(location__icontains=location)
-            
-            # Job type filter (multiple values supported)
-            job_types = request.query_params.getlist('job_type')
-            if job_types:
-                jobs = jobs.filter(job_type__in=job_types)
-            
-            # Experience level filter (multiple values supported)
-            experience_levels = request.query_params.getlist('experience_level')
-            if experience_levels:
-                jobs = jobs.filter(experience_level__in=experience_levels)
-            
-            # Company filter
-            company_name = request.query_params.get('company_name')
-            if company_name:
-                jobs = jobs.filter(company_name__icontains=company_name)
-            
-            # Salary range filters
-            salary_min = request.query_params.get('salary_min')
-            if salary_min:
-                try:
-                    salary_min = float(salary_min)
-                    jobs = jobs.filter(salary_max__gte=salary_min)
-                except ValueError:
-                    pass
-            
-            salary_max = request.query_params.get('salary_max')
-            if salary_max:
-                try:
-                    salary_max = float(salary_max)
-                    jobs = jobs.filter(salary_min__lte=salary_max)
-                except ValueError:
-                    pass
-            
-            # Skills filter (comma-separated)
-            skills = request.query_params.get('skills')
-            if skills:
-                skill_list = [skill.strip() for skill in skills.split(',')]
-                from django.db.models import Q
-                skill_query = Q()
-                for skill in skill_list:
-                    skill_query |= Q(skills_required__icontains=skill)
-                jobs = jobs.filter(skill_query)
-            
-            # Date range filters
-            date_from = request.query_params.get('date_from')
-            if date_from:
-                try:
-                    from datetime import datetime
-                    date_from = datetime.strptime(date_from, '%Y-%m-%d').date()
-                    jobs = jobs.filter(created_at__date__gte=date_from)
-                except ValueError:
-                    pass
-            
-            date_to = request.query_params.get('date_to')
-            if date_to:
-                try:
-                    from datetime import datetime
-                    date_to = datetime.strptime(date_to, '%Y-%m-%d').date()
-                    jobs = jobs.filter(created_at__date__lte=date_to)
-                except ValueError:
-                    pass
-            
-            # Posted by specific user
-            posted_by = request.query_params.get('posted_by')
-            if posted_by:
-                jobs = jobs.filter(posted_by__username__icontains=posted_by)
-            
-            # Sorting
-            sort_by = request.query_params.get('sort_by', '-created_at')
-            valid_sort_fields = [
-                'created_at', '-created_at', 'title', '-title', 
-                'salary_min', '-salary_min', 'salary_max', '-salary_max',
-                'company_name', '-company_name', 'location', '-location'
-            ]
-            if sort_by in valid_sort_fields:
-                jobs = jobs.order_by(sort_by)
-            
-            # Pagination
-            page = int(request.query_params.get('page', 1))
-            page_size = min(int(request.query_params.get('page_size', 10)), 50)  # Max 50 per page
-            start = (page - 1) * page_size
-            end = start + page_size
-            
-            total_count = jobs.count()
-            jobs_page = jobs[start:end]
-            
-            serializer = JobSerializer(jobs_page, many=True)
             
             return Response({
                 'message': 'Jobs search completed successfully',
@@ -678,7 +545,8 @@ class JobSearchAPI(APIView):
                 'page': page,
                 'page_size': page_size,
                 'total_pages': (total_count + page_size - 1) // page_size,
-                'data': serializer.data
+                'did_you_mean': did_you_mean(query) if not total_count else {},
+                'data': jobs_data
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
@@ -689,6 +557,10 @@ class JobSearchAPI(APIView):
 
 class JobTextSearchAPI(APIView):
     """Simple text search for jobs"""
+    throttle_scope = 'search'
+    statement_timeout = 'search'
+    read_replica = True
+    query_budget = JOB_QUERY_BUDGET
     
     def get(self, request):
         try:
@@ -701,22 +573,22 @@ class JobTextSearchAPI(APIView):
                     'data': []
                 }, status=status.HTTP_200_OK)
             
-            from django.db.models import Q
-            jobs = Job.objects.filter(
-                is_active=True
-            ).filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(company_name__icontains=search) |
-                Q(skills_required__icontains=search) |
-                Q(location__icontains=search)
-            )
+            query = JobQuery.from_params(request.query_params, default_page_size=MAX_PAGE_SIZE)
+            if wants_stream(request):
+                return stream_response(
+                    f'Search results for "{search}"', JobRows.values(job_query_results(query)), JobRows.many
+                )
+            
+            total_count, jobs_data = run_job_query(query, rows=JobRows)
+            track_impressions(jobs_data)
             
-            serializer = JobSerializer(jobs, many=True)
             return Response({
                 'message': f'Search results for "{search}"',
-                'count': jobs.count(),
-                'data': serializer.data
+                'count': total_count,
+                'page': query.page,
+                'page_size': query.page_size,
+                'total_pages': (total_count + query.page_size - 1) // query.page_size,
+                'data': jobs_data
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
@@ -729,6 +601,9 @@ class AvailableJobsAPI(APIView):
     """Get jobs available for application (excludes own jobs and already applied jobs)"""
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
+    statement_timeout = 'search'
+    read_replica = True
+    query_budget = JOB_QUERY_BUDGET + 2
     
     def get(self, request):
         try:
@@ -740,21 +615,34 @@ class AvailableJobsAPI(APIView):
             
             jobs = Job.objects.filter(is_active=True).exclude(posted_by=request.user)
             
-            applied_job_ids = JobApplication.objects.filter(
-                applicant=request.user
-            ).values_list('job_id', flat=True)
-            jobs = jobs.exclude(id__in=applied_job_ids)
-            
-            serializer = JobSerializer(jobs, many=True)
-            jobs_data = serializer.data
+            # Small applied sets come from the cache as a literal exclusion; large
+            # ones fall back to a NOT EXISTS anti-join on the (applicant, job) index
+            applied_job_ids = get_applied_job_ids(request.user.id)
+            if len(applied_job_ids) <= APPLIED_IDS_INLINE_LIMIT:
+                if applied_job_ids:
+                    jobs = jobs.exclude(id__in=applied_job_ids)
+            else:
+                jobs = jobs.filter(~Exists(
+                    JobApplication.objects.filter(applicant=request.user, job=OuterRef('pk'))
+                ))
+            
+            query = JobQuery.from_params(request.query_params)
+            if wants_stream(request):
+                return stream_response(
+                    'Available jobs for application retrieved successfully',
+                    AvailableJobRows.values(job_query_results(query, base=jobs)), AvailableJobRows.many
+                )
             
-            for job_data in jobs_data:
-                job_data['can_apply'] = True
-                job_data['application_status'] = 'not_applied'
+            total_count, jobs_data = run_job_query(query, base=jobs, rows=AvailableJobRows)
+            track_impressions(jobs_data)
+            page, page_size = query.page, query.page_size
             
             return Response({
                 'message': 'Available jobs for application retrieved successfully',
-                'count': jobs.count(),
+                'count': total_count,
+                'page': page,
+                'page_size': page_size,
+                'total_pages': (total_count + page_size - 1) // page_size,
                 'data': jobs_data
             }, status=status.HTTP_200_OK)
             
@@ -768,79 +656,66 @@ class AvailableJobsAPI(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class RecommendedJobsAPI(APIView):
+    """Employee: jobs ranked by how well they match the employee profile"""
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    statement_timeout = 'search'
+    read_replica = True
+
+    def get(self, request):
+        try:
+            try:
+                profile = EmployeeProfile.objects.select_related('preferred_place').get(user=request.user)
+            except EmployeeProfile.DoesNotExist:
+                return Response({
+                    'error': 'Employee profile not found'
+                }, status=status.HTTP_404_NOT_FOUND)
+
+            recommendations = get_recommendations(request.user, profile)
+
+            # Pagination
+            page, page_size, start, end = get_page_params(request.query_params)
+
+            total_count = len(recommendations)
+            page_scores = dict(recommendations[start:end])
+            jobs = active_jobs().filter(id__in=page_scores.keys()).annotate(num_applications=application_count())
+            jobs_by_id = {job['id']: job for job in JobRows.serialize(jobs)}
+            # Keep ranking order; jobs deactivated since caching are skipped
+            jobs_data = [
+                {**jobs_by_id[job_id], 'match_score': score}
+                for job_id, score in page_scores.items() if job_id in jobs_by_id
+            ]
+            track_impressions(jobs_data)
+
+            return Response({
+                'message': 'Recommended jobs retrieved successfully',
+                'count': total_count,
+                'page': page,
+                'page_size': page_size,
+                'total_pages': (total_count + page_size - 1) // page_size,
+                'data': jobs_data
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class JobFilterAPI(APIView):
     """Filter jobs by various criteria"""
+    statement_timeout = 'search'
+    read_replica = True
+    query_budget = JOB_QUERY_BUDGET
     
     def get(self, request):
         try:
-            jobs = Job.objects.filter(is_active=True)
-            
-            # Filter by job title
-            title = request.query_params.get('title')
-            if title:
-                jobs = jobs.filter(title__icontains=title)
-            
-            # Filter by company
-            company = request.query_params.get('company')
-            if company:
-                jobs = jobs.filter(company_name__icontains=company)
-            
-            # Filter by location
-            location = request.query_params.get('location')
-            if location:
-                jobs = jobs.filter(location__icontains=location)
-            
-            # Filter by job type (supports multiple values)
-            job_type = request.query_params.get('job_type')
-            if job_type:
-                # Handle comma-separated values
-                if ',' in job_type:
-                    job_types = [jt.strip() for jt in job_type.split(',')]
-                    jobs = jobs.filter(job_type__in=job_types)
-                else:
-                    jobs = jobs.filter(job_type=job_type)
-            
-            # Filter by experience level
-            experience_level = request.query_params.get('experience_level')
-            if experience_level:
-                jobs = jobs.filter(experience_level=experience_level)
-            
-            # Filter by salary range
-            salary_min = request.query_params.get('salary_min')
-            if salary_min:
-                try:
-                    salary_min = float(salary_min)
-                    jobs = jobs.filter(salary_max__gte=salary_min)
-                except ValueError:
-                    pass
-            
-            salary_max = request.query_params.get('salary_max')
-            if salary_max:
-                try:
-                    salary_max = float(salary_max)
-                    jobs = jobs.filter(salary_min__lte=salary_max)
-                except ValueError:
-                    pass
-            
-            # Sorting
-            sort_by = request.query_params.get('sort_by', '-created_at')
-            valid_sort_fields = [
-                'created_at', '-created_at', 'title', '-title', 
-                'salary_min', '-salary_min', 'salary_max', '-salary_max'
-            ]
-            if sort_by in valid_sort_fields:
-                jobs = jobs.order_by(sort_by)
+            query = JobQuery.from_params(request.query_params)
+            total_count, jobs_data = run_job_query(query, rows=JobRows)
+            track_impressions(jobs_data)
+            page, page_size = query.page, query.page_size
             
-            # Pagination
-            page = int(request.query_params.get('page', 1))
-            page_size = int(request.query_params.get('page_size', 10))
-            start = (page - 1) * page_size
-            end = start + page_size
-            
-            total_count = jobs.count()
-            jobs_page = jobs[start:end]
-            
-            serializer = JobSerializer(jobs_page, many=True)
             
             return Response({
                 'message': 'Jobs filtered successfully',
@@ -848,16 +723,9 @@ class JobFilterAPI(APIView):
                 'page': page,
                 'page_size': page_size,
                 'total_pages': (total_count + page_size - 1) // page_size,
-                'filters_applied': {
-                    'title': title,
-                    'company': company,
-                    'location': location,
-                    'job_type': job_type,
-                    'experience_level': experience_level,
-                    'salary_min': salary_min,
-                    'salary_max': salary_max
-                },
-                'data': serializer.data
+                'filters_applied': query.applied_filters(),
+                'did_you_mean': did_you_mean(query) if not total_count else {},
+                'data': jobs_data
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
@@ -868,6 +736,7 @@ class JobFilterAPI(APIView):
 
 class JobFiltersAPI(APIView):
     """Get available filter options"""
+    read_replica = True
     
     def get(self, request):
         try:
@@ -892,4 +761,159 @@ class JobFiltersAPI(APIView):
         except Exception as e:
             return Response({
                 'error': str(e)
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class JobAutocompleteAPI(APIView):
+    """Typeahead suggestions for job titles, companies, skills and locations"""
+    # Answered from the in-memory index; no user lookup needed
+    authentication_classes = []
+    # Only a cold index (first request before warm-up finished) reads the jobs
+    query_budget = 1
+    
+    def get(self, request):
+        try:
+            prefix = request.query_params.get('q', '').strip()
+            fields = [f.strip() for f in request.query_params.get('field', '').split(',') if f.strip()]
+            unknown = [f for f in fields if f not in AUTOCOMPLETE_FIELDS]
+            if unknown:
+                return Response({
+                    'error': f"Unknown field(s): {', '.join(unknown)}; choose from {', '.join(AUTOCOMPLETE_FIELDS)}"
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            if not prefix:
+                return Response({
+                    'message': 'Please provide a prefix',
+                    'data': {}
+                }, status=status.HTTP_200_OK)
+            
+            try:
+                limit = min(max(int(request.query_params.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+            except ValueError:
+                limit = DEFAULT_LIMIT
+            
+            return Response({
+                'message': f'Suggestions for "{prefix}"',
+                'data': autocomplete.complete(prefix, fields or AUTOCOMPLETE_FIELDS, limit)
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class SavedSearchListCreateAPI(APIView):
+    """List or save the user's job searches; new matching jobs are sent as digests"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        try:
+            searches = SavedSearch.objects.filter(user=request.user)
+            serializer = SavedSearchSerializer(searches, many=True)
+            return Response({
+                'message': 'Saved searches retrieved successfully',
+                'count': len(serializer.data),
+                'data': serializer.data
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    def post(self, request):
+        try:
+            serializer = SavedSearchSerializer(data=request.data, context={'request': request})
+            
+            if serializer.is_valid():
+                search = serializer.save()
+                return Response({
+                    'message': 'Search saved successfully',
+                    'data': SavedSearchSerializer(search).data
+                }, status=status.HTTP_201_CREATED)
+            
+            return Response({
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class SavedSearchDetailAPI(APIView):
+    """Update or delete one of the user's saved searches"""
+    permission_classes = [IsAuthenticated]
+    
+    def patch(self, request, search_id):
+        try:
+            search = SavedSearch.objects.get(id=search_id, user=request.user)
+            serializer = SavedSearchSerializer(search, data=request.data, partial=True, context={'request': request})
+            
+            if serializer.is_valid():
+                search = serializer.save()
+                return Response({
+                    'message': 'Saved search updated successfully',
+                    'data': SavedSearchSerializer(search).data
+                }, status=status.HTTP_200_OK)
+            
+            return Response({
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except SavedSearch.DoesNotExist:
+            return Response({
+                'error': 'Saved search not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    def delete(self, request, search_id):
+        try:
+            search = SavedSearch.objects.get(id=search_id, user=request.user)
+            search.delete()
+            return Response({
+                'message': 'Saved search deleted successfully'
+            }, status=status.HTTP_200_OK)
+        except SavedSearch.DoesNotExist:
+            return Response({
+                'error': 'Saved search not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class SavedSearchMatchesAPI(APIView):
+    """Active jobs a saved search has matched, newest match first"""
+    permission_classes = [IsAuthenticated]
+    read_replica = True
+    
+    def get(self, request, search_id):
+        try:
+            search = SavedSearch.objects.get(id=search_id, user=request.user)
+            jobs = Job.objects.filter(saved_search_matches__search=search, is_active=True).select_related(
+                'posted_by'
+            ).annotate(num_applications=application_count()).order_by('-saved_search_matches__matched_at', '-id')
+            
+            page, page_size, start, end = get_page_params(request.query_params)
+            total_count = jobs.count()
+            
+            return Response({
+                'message': 'Saved search matches retrieved successfully',
+                'count': total_count,
+                'page': page,
+                'page_size': page_size,
+                'total_pages': (total_count + page_size - 1) // page_size,
+                'data': JobRows.serialize(jobs[start:end])
+            }, status=status.HTTP_200_OK)
+        except SavedSearch.DoesNotExist:
+            return Response({
+                'error': 'Saved search not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
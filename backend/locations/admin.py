@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from .models import Location, LocationAlias
+
+
+class LocationAliasInline(admin.TabularInline):
+    model = LocationAlias
+    extra = 0
+
+
+@admin.register(Location)
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ('name', 'country_code', 'latitude', 'longitude', 'geohash')
+    list_filter = ('country_code',)
+    search_fields = ('name', 'aliases__alias')
+    readonly_fields = ('geohash',)
+    inlines = [LocationAliasInline]
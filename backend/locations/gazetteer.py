@@ -0,0 +1,151 @@
+"""
+Canonical locations for the free-text job and profile location fields.
+
+The offline gazetteer file (data/gazetteer.csv) lists places with their
+coordinates and the other names they go by. Loading it fills Location and
+LocationAlias. A free-text value such as "Bangalore, India" or "Bengaluru
+(Hybrid)" is split into candidate keys ("bangalore", "india") that are
+looked up in LocationAlias; the most specific key that matches wins.
+"""
+import csv
+import re
+from pathlib import Path
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+
+from .geo import covering_cells, encode, haversine_km
+from .models import Location, LocationAlias
+
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / 'data' / 'gazetteer.csv'
+
+DEFAULT_RADIUS_KM = 25
+MAX_RADIUS_KM = 500
+
+# "lat,lng" in a location parameter is a point rather than a place name
+COORDINATES = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$')
+PART_SEPARATORS = re.compile(r'[,/;|]|\s-\s')
+
+
+def normalize_key(text):
+    return ' '.join(re.sub(r'[^\w\s]', ' ', (text or '').lower()).split())
+
+
+def place_keys(text):
+    """Alias keys to try for a free-text location, most specific first"""
+    # Parenthesised notes are qualifiers, e.g. "Kochi (Remote)"
+    text = re.sub(r'\(.*?\)', ' ', text or '')
+    keys = []
+    for part in PART_SEPARATORS.split(text):
+        key = normalize_key(part)
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+def read_gazetteer(path=GAZETTEER_PATH):
+    with open(path, newline='', encoding='utf-8') as f:
+        return [
+            {
+                'name': row['name'].strip(),
+                'country_code': row['country_code'].strip().upper(),
+                'latitude': float(row['latitude']),
+                'longitude': float(row['longitude']),
+                'aliases': [alias for alias in (row.get('aliases') or '').split('|') if alias.strip()],
+            }
+            for row in csv.DictReader(f)
+        ]
+
+
+@transaction.atomic
+def load_gazetteer(path=GAZETTEER_PATH):
+    """Insert or update the places in a gazetteer file; returns (places, new aliases)"""
+    rows = read_gazetteer(path)
+    existing = {(l.name, l.country_code): l for l in Location.objects.all()}
+    created, changed = [], []
+    for row in rows:
+        location = existing.get((row['name'], row['country_code']))
+        if location is None:
+            location = Location(name=row['name'], country_code=row['country_code'])
+            created.append(location)
+        else:
+            changed.append(location)
+        location.latitude, location.longitude = row['latitude'], row['longitude']
+        location.geohash = encode(row['latitude'], row['longitude'])
+    Location.objects.bulk_create(created)
+    Location.objects.bulk_update(changed, ['latitude', 'longitude', 'geohash'])
+
+    ids = {(name, country): pk for pk, name, country in Location.objects.values_list('id', 'name', 'country_code')}
+    aliases = {}
+    for row in rows:
+        for alias in [row['name']] + row['aliases']:
+            # A spelling shared by two places resolves to the first one listed
+            aliases.setdefault(normalize_key(alias), ids[(row['name'], row['country_code'])])
+    known = set(LocationAlias.objects.filter(alias__in=aliases).values_list('alias', flat=True))
+    LocationAlias.objects.bulk_create(
+        [LocationAlias(alias=alias, location_id=pk) for alias, pk in aliases.items() if alias not in known],
+        ignore_conflicts=True,
+    )
+    return len(rows), len(set(aliases) - known)
+
+
+def _lookup(keys, *fields):
+    if not keys:
+        return None
+    found = {row[0]: row[1:] for row in LocationAlias.objects.filter(alias__in=keys).values_list('alias', *fields)}
+    return next((found[key] for key in keys if key in found), None)
+
+
+def resolve_location_id(text):
+    """Location id for a free-text location, or None"""
+    match = _lookup(place_keys(text), 'location_id')
+    return match[0] if match else None
+
+
+def resolve_point(text):
+    """(latitude, longitude) of a place name or a "lat,lng" string, or None"""
+    coordinates = COORDINATES.match(text or '')
+    if coordinates:
+        latitude, longitude = float(coordinates.group(1)), float(coordinates.group(2))
+        return (latitude, longitude) if -90 <= latitude <= 90 and -180 <= longitude <= 180 else None
+    return _lookup(place_keys(text), 'location__latitude', 'location__longitude')
+
+
+def locations_within(latitude, longitude, radius_km):
+    """{location id: distance in km} for every place within radius_km of a point"""
+    cells = Q()
+    for cell in covering_cells(latitude, longitude, radius_km):
+        cells |= Q(geohash__startswith=cell)
+    rows = np.array(Location.objects.filter(cells).values_list('id', 'latitude', 'longitude'), dtype=np.float64)
+    if not len(rows):
+        return {}
+    distances = haversine_km(latitude, longitude, rows[:, 1], rows[:, 2])
+    inside = distances <= radius_km
+    return {int(pk): round(float(distance), 1) for pk, distance in zip(rows[inside, 0], distances[inside])}
+
+
+def assign_locations(queryset, text_field, location_field):
+    """Point every row of queryset at the place its free-text field resolves to; returns rows matched"""
+    values = [v for v in queryset.order_by().values_list(text_field, flat=True).distinct() if v is not None]
+    keys = {value: place_keys(value) for value in values}
+    aliases = dict(
+        LocationAlias.objects.filter(alias__in={key for value_keys in keys.values() for key in value_keys})
+        .values_list('alias', 'location_id')
+    )
+
+    by_location = {}
+    for value, value_keys in keys.items():
+        location_id = next((aliases[key] for key in value_keys if key in aliases), None)
+        by_location.setdefault(location_id, []).append(value)
+
+    matched = 0
+    with transaction.atomic():
+        for location_id, texts in by_location.items():
+            for start in range(0, len(texts), 500):
+                count = queryset.filter(**{f'{text_field}__in': texts[start:start + 500]}).update(
+                    **{location_field: location_id}
+                )
+                matched += count if location_id is not None else 0
+    return matched
@@ -0,0 +1,94 @@
+"""
+Geohash grid and great-circle distance helpers.
+
+A geohash interleaves longitude and latitude bits into a base32 string.
+Every extra character splits a cell into 32 smaller ones, so places in one
+cell share a prefix and a B-tree index on the hash serves "everything in
+this cell" as a range scan. A radius search covers the circle's bounding
+box with a few cells, fetches the places in them and then applies the exact
+haversine distance to all candidates in one vectorized pass.
+"""
+import math
+
+import numpy as np
+
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+STORED_PRECISION = 9
+
+# Cell (height, width) in degrees for each precision
+CELL_DEGREES = {
+    precision: (180 / 2 ** ((5 * precision) // 2), 360 / 2 ** ((5 * precision + 1) // 2))
+    for precision in range(1, STORED_PRECISION + 1)
+}
+
+
+def encode(latitude, longitude, precision=STORED_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        bounds, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(min_lat, min_lon, max_lat, max_lon) of a circle, widened to whole longitudes near the poles"""
+    dlat = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = max(latitude - dlat, -90.0), min(latitude + dlat, 90.0)
+    widest = max(abs(min_lat), abs(max_lat))
+    if widest >= 89.9:
+        return min_lat, -180.0, max_lat, 180.0
+    dlon = min(radius_km / (KM_PER_DEGREE * math.cos(math.radians(widest))), 180.0)
+    return min_lat, longitude - dlon, max_lat, longitude + dlon
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """Geohash prefixes whose cells together cover the circle's bounding box"""
+    min_lat, min_lon, max_lat, max_lon = bounding_box(latitude, longitude, radius_km)
+    # The finest precision whose cells are at least as big as the box, so it
+    # takes a handful of cells rather than hundreds
+    precision = 1
+    for candidate in range(STORED_PRECISION, 0, -1):
+        height, width = CELL_DEGREES[candidate]
+        if height >= max_lat - min_lat and width >= max_lon - min_lon:
+            precision = candidate
+            break
+    height, width = CELL_DEGREES[precision]
+
+    cells = set()
+    lat = min_lat
+    while True:
+        lon = min_lon
+        while True:
+            wrapped = (lon + 180.0) % 360.0 - 180.0
+            cells.add(encode(min(lat, 90.0 - 1e-9), wrapped, precision))
+            if lon >= max_lon:
+                break
+            lon = min(lon + width, max_lon)
+        if lat >= max_lat:
+            break
+        lat = min(lat + height, max_lat)
+    return sorted(cells)
+
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    """Distances in km from one point to arrays of points"""
+    lat1, lon1 = np.radians(latitude), np.radians(longitude)
+    lat2, lon2 = np.radians(np.asarray(latitudes, dtype=np.float64)), np.radians(np.asarray(longitudes, dtype=np.float64))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from job_postings.models import Job
+from locations.gazetteer import GAZETTEER_PATH, assign_locations, load_gazetteer
+from profile_app.models import EmployeeProfile
+
+
+class Command(BaseCommand):
+    help = 'Load places from the offline gazetteer file and resolve job and profile locations against them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=str(GAZETTEER_PATH), help='Gazetteer CSV (name,country_code,latitude,longitude,aliases)')
+        parser.add_argument('--skip-assign', action='store_true', help='Only load places; leave jobs and profiles alone')
+
+    def handle(self, *args, **options):
+        places, aliases = load_gazetteer(options['file'])
+        self.stdout.write(f'Loaded {places} places, {aliases} new aliases')
+        if options['skip_assign']:
+            return
+        jobs = assign_locations(Job.objects.all(), 'location', 'place')
+        profiles = assign_locations(EmployeeProfile.objects.all(), 'preferred_location', 'preferred_place')
+        self.stdout.write(self.style.SUCCESS(
+            f'Resolved {jobs}/{Job.objects.count()} jobs and '
+            f'{profiles}/{EmployeeProfile.objects.count()} employee profiles to a place'
+        ))
@@ -0,0 +1,94 @@
+import csv
+import re
+from pathlib import Path
+
+from django.db import migrations
+
+
+GAZETTEER_PATH = Path(__file__).resolve().parent.parent / 'data' / 'gazetteer.csv'
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+PART_SEPARATORS = re.compile(r'[,/;|]|\s-\s')
+
+
+# As in locations.geo and locations.gazetteer
+def encode(latitude, longitude, precision=9):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        bounds, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def normalize_key(text):
+    return ' '.join(re.sub(r'[^\w\s]', ' ', (text or '').lower()).split())
+
+
+def place_keys(text):
+    keys = []
+    for part in PART_SEPARATORS.split(re.sub(r'\(.*?\)', ' ', text or '')):
+        key = normalize_key(part)
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+def load_gazetteer(apps, schema_editor):
+    Location = apps.get_model('locations', 'Location')
+    LocationAlias = apps.get_model('locations', 'LocationAlias')
+    db_alias = schema_editor.connection.alias
+    with open(GAZETTEER_PATH, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+
+    aliases = {}
+    for row in rows:
+        latitude, longitude = float(row['latitude']), float(row['longitude'])
+        location = Location.objects.using(db_alias).create(
+            name=row['name'], country_code=row['country_code'], latitude=latitude, longitude=longitude,
+            geohash=encode(latitude, longitude),
+        )
+        for alias in [row['name']] + (row['aliases'] or '').split('|'):
+            if normalize_key(alias):
+                aliases.setdefault(normalize_key(alias), location.id)
+    LocationAlias.objects.using(db_alias).bulk_create([
+        LocationAlias(alias=a, location_id=pk) for a, pk in aliases.items()
+    ])
+
+    # Point existing jobs and profiles at their canonical place
+    for model, text_field, location_field in [
+        (apps.get_model('job_postings', 'Job'), 'location', 'place_id'),
+        (apps.get_model('profile_app', 'EmployeeProfile'), 'preferred_location', 'preferred_place_id'),
+    ]:
+        values = model.objects.using(db_alias).order_by().values_list(text_field, flat=True).distinct()
+        for value in values:
+            location_id = next((aliases[key] for key in place_keys(value) if key in aliases), None)
+            if location_id:
+                model.objects.using(db_alias).filter(**{text_field: value}).update(**{location_field: location_id})
+
+
+def unload_gazetteer(apps, schema_editor):
+    apps.get_model('locations', 'Location').objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0001_initial'),
+        ('job_postings', '0010_job_place'),
+        ('profile_app', '0007_employeeprofile_preferred_place'),
+    ]
+
+    operations = [
+        migrations.RunPython(load_gazetteer, unload_gazetteer),
+    ]
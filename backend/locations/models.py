@@ -0,0 +1,33 @@
+from django.db import models
+
+from .geo import encode
+
+
+class Location(models.Model):
+    """A canonical place from the gazetteer (see gazetteer.py)"""
+    name = models.CharField(max_length=200)
+    country_code = models.CharField(max_length=2)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    # Prefix searches on the geohash find every place in a grid cell
+    geohash = models.CharField(max_length=12, db_index=True)
+
+    class Meta:
+        ordering = ['name']
+        unique_together = ('name', 'country_code')
+
+    def __str__(self):
+        return f"{self.name}, {self.country_code}"
+
+    def save(self, *args, **kwargs):
+        self.geohash = encode(self.latitude, self.longitude)
+        super().save(*args, **kwargs)
+
+
+class LocationAlias(models.Model):
+    """A normalized spelling that resolves to a Location, including its own name"""
+    alias = models.CharField(max_length=200, unique=True)
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='aliases')
+
+    def __str__(self):
+        return f"{self.alias} -> {self.location.name}"
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0001_initial'),
+        ('profile_app', '0006_post_postcomment_postlike_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employeeprofile',
+            name='preferred_place',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='locations.location'),
+        ),
+    ]
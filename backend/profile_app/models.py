@@ -43,6 +43,9 @@ class EmployeeProfile(BaseProfile):
         ('contract', 'Contract'), ('internship', 'Internship')
     ], blank=True, null=True)
     preferred_location = models.CharField(max_length=200, blank=True, null=True)
+    preferred_place = models.ForeignKey(
+        'locations.Location', on_delete=models.SET_NULL, blank=True, null=True, related_name='+'
+    )
     open_to_remote = models.BooleanField(default=True)
     expected_salary_min = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
     expected_salary_max = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
@@ -50,6 +53,7 @@ class EmployeeProfile(BaseProfile):
     # Documents & Media
     resume = models.FileField(upload_to='employee_resumes/%Y/%m/', blank=True, null=True)
     profile_image = models.ImageField(upload_to='employee_images/', blank=True, null=True)
+    profile_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     portfolio_url = models.URLField(blank=True, null=True)
     linkedin_url = models.URLField(blank=True, null=True)
     github_url = models.URLField(blank=True, null=True)
@@ -58,6 +62,12 @@ class EmployeeProfile(BaseProfile):
     available_from = models.DateField(blank=True, null=True)
     notice_period = models.CharField(max_length=50, blank=True, null=True)
     
+    def save(self, *args, update_fields=None, **kwargs):
+        # The place is resolved from the location (job_postings.signals) and saved with it
+        if update_fields is not None and 'preferred_location' in update_fields:
+            update_fields = {*update_fields, 'preferred_place'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+    
     def __str__(self):
         return f"{self.user.get_full_name()} - Employee Profile"
     
@@ -81,6 +91,7 @@ class EmployerProfile(BaseProfile):
     
     # Contact & Media
     profile_image = models.ImageField(upload_to='employer_images/', blank=True, null=True)
+    profile_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     linkedin_url = models.URLField(blank=True, null=True)
     
     # Verification
@@ -125,7 +136,9 @@ class CompanyProfile(BaseProfile):
     
     # Social Media & Branding
     company_logo = models.ImageField(upload_to='company_logos/', blank=True, null=True)
+    company_logo_variants = models.JSONField(default=dict, blank=True, editable=False)
     cover_image = models.ImageField(upload_to='company_covers/', blank=True, null=True)
+    cover_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     linkedin_url = models.URLField(blank=True, null=True)
     twitter_url = models.URLField(blank=True, null=True)
     
@@ -168,6 +181,7 @@ class Post(models.Model):
     post_type = models.CharField(max_length=20, choices=POST_TYPES, default='text')
     content = models.TextField()
     image = models.ImageField(upload_to='posts/%Y/%m/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     
     # Engagement
     likes_count = models.PositiveIntegerField(default=0)
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
+from core.images import ImageVariantsField
 from .models import EmployeeProfile, EmployerProfile, CompanyProfile, Post, PostLike, PostComment
 
 
@@ -9,10 +10,11 @@ class PostSerializer(serializers.ModelSerializer):
     author_name = serializers.SerializerMethodField()
     author_type = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField('image')
     
     class Meta:
         model = Post
-        fields = ['id', 'post_type', 'content', 'image', 'likes_count', 'comments_count', 
+        fields = ['id', 'post_type', 'content', 'image', 'image_variants', 'likes_count', 'comments_count', 
                  'created_at', 'updated_at', 'author_name', 'author_type', 'is_liked']
         read_only_fields = ['id', 'likes_count', 'comments_count', 'created_at', 'updated_at']
     
@@ -4,6 +4,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
+from core.pagination import PagePagination
+from core.purge import delete_with_files
 from .models import Post, PostLike, PostComment
 from .post_serializers import PostSerializer, PostCommentSerializer, PostLikeSerializer
 
@@ -52,7 +54,7 @@ class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
         # Check if user owns this post
         user = self.request.user
         if hasattr(instance.profile, 'user') and instance.profile.user == user:
-            instance.delete()
+            delete_with_files(instance)
         else:
             from rest_framework.exceptions import PermissionDenied
             raise PermissionDenied("You can only delete your own posts")
@@ -108,9 +110,11 @@ def user_feed(request):
     """Get personalized feed for the user"""
     # For now, return all posts ordered by creation date
     # In future, this can be enhanced with following logic
-    posts = Post.objects.all().select_related('content_type').prefetch_related('likes', 'comments')
-    serializer = PostSerializer(posts, many=True, context={'request': request})
-    return Response(serializer.data)
+    posts = Post.objects.all().select_related('content_type').prefetch_related('likes', 'comments').order_by('-created_at', '-id')
+    paginator = PagePagination()
+    posts_page = paginator.paginate_queryset(posts, request)
+    serializer = PostSerializer(posts_page, many=True, context={'request': request})
+    return paginator.get_paginated_response(serializer.data)
 
 
 @api_view(['GET'])
@@ -118,7 +122,7 @@ def user_feed(request):
 def my_posts(request):
     """Get current user's posts"""
     user = request.user
-    posts = []
+    posts = Post.objects.none()
     
     if hasattr(user, 'userprofile'):
         role = user.userprofile.role
@@ -138,5 +142,7 @@ def my_posts(request):
                 object_id=user.company_profile.id
             )
     
-    serializer = PostSerializer(posts, many=True, context={'request': request})
-    return Response(serializer.data)
\ No newline at end of file
+    paginator = PagePagination()
+    posts_page = paginator.paginate_queryset(posts.order_by('-created_at', '-id'), request)
+    serializer = PostSerializer(posts_page, many=True, context={'request': request})
+    return paginator.get_paginated_response(serializer.data)
\ No newline at end of file
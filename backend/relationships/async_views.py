@@ -0,0 +1,59 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.http import JsonResponse
+from django.views import View
+from rest_framework import status
+from core.aio import (
+    authenticate, gather_queries, paginated_response,
+    unauthorized_response, error_response
+)
+from core.pagination import get_page_params
+from .serializers import UserBasicSerializer
+
+
+def _serialize_users(users):
+    return UserBasicSerializer(users, many=True).data
+
+
+class AsyncFollowListView(View):
+    """Base for the async follower/following lists; count and page run concurrently"""
+    read_replica = True
+    relation_filter = None
+    message = None
+    
+    async def get(self, request, user_id=None):
+        current_user = await authenticate(request)
+        if current_user is None:
+            return unauthorized_response()
+        
+        try:
+            if user_id:
+                user = await User.objects.filter(id=user_id).afirst()
+                if user is None:
+                    return JsonResponse({
+                        'error': 'User not found'
+                    }, status=status.HTTP_404_NOT_FOUND)
+            else:
+                user = current_user
+            
+            users = User.objects.filter(**{self.relation_filter: user}).order_by('id')
+            page, page_size, start, end = get_page_params(request.GET)
+            users_page = users.select_related('userprofile')[start:end]
+            
+            total_count, users_page = await gather_queries(users.count, lambda: list(users_page))
+            data = await sync_to_async(_serialize_users)(users_page)
+            return paginated_response(self.message.format(name=user.get_full_name()), total_count, page, page_size, data)
+        except Exception as e:
+            return error_response(e)
+
+
+class AsyncFollowersListView(AsyncFollowListView):
+    """Async FollowersListAPI"""
+    relation_filter = 'following__following'
+    message = 'Followers of {name}'
+
+
+class AsyncFollowingListView(AsyncFollowListView):
+    """Async FollowingListAPI"""
+    relation_filter = 'followers__follower'
+    message = 'Users followed by {name}'
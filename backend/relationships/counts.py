@@ -0,0 +1,28 @@
+"""
+Per-user cache of follower and following counts, for UserFollowStatsAPI.
+
+Entries are dropped by the Follow signals in signals.py. Bulk inserts that
+skip signals bump the Follow version (core.caching.versions) instead.
+"""
+from django.conf import settings
+
+from core.caching import TieredCache
+
+from .models import Follow
+
+
+CACHE_TIMEOUT = getattr(settings, 'FOLLOW_COUNTS_CACHE_TIMEOUT', 60 * 60)
+
+follow_counts = TieredCache('follow_counts', Follow, timeout=CACHE_TIMEOUT)
+
+
+def get_follow_counts(user_id):
+    """(followers, following) of the user"""
+    return follow_counts.get_or_set(user_id, lambda: (
+        Follow.objects.filter(following_id=user_id).count(),
+        Follow.objects.filter(follower_id=user_id).count(),
+    ))
+
+
+def invalidate_user_follow_counts(*user_ids):
+    follow_counts.delete_many(user_ids)
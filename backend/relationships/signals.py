@@ -0,0 +1,9 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .counts import invalidate_user_follow_counts
+from .models import Follow
+
+
+@receiver([post_save, post_delete], sender=Follow)
+def follow_changed(sender, instance, **kwargs):
+    invalidate_user_follow_counts(instance.follower_id, instance.following_id)
@@ -3,6 +3,7 @@ from .views import (
     FollowUserAPI, UnfollowUserAPI, FollowersListAPI, 
     FollowingListAPI, UserFollowStatsAPI
 )
+from .async_views import AsyncFollowersListView, AsyncFollowingListView
 
 urlpatterns = [
     # Follow Actions
@@ -14,6 +15,10 @@ urlpatterns = [
     path('followers/<int:user_id>/', FollowersListAPI.as_view(), name='user-followers'),
     path('following/', FollowingListAPI.as_view(), name='my-following'),
     path('following/<int:user_id>/', FollowingListAPI.as_view(), name='user-following'),
+    path('async/followers/', AsyncFollowersListView.as_view(), name='my-followers-async'),
+    path('async/followers/<int:user_id>/', AsyncFollowersListView.as_view(), name='user-followers-async'),
+    path('async/following/', AsyncFollowingListView.as_view(), name='my-following-async'),
+    path('async/following/<int:user_id>/', AsyncFollowingListView.as_view(), name='user-following-async'),
     
     # Follow Stats
     path('stats/<int:user_id>/', UserFollowStatsAPI.as_view(), name='user-follow-stats'),
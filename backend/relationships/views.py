@@ -5,6 +5,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import User
+from core.pagination import get_page_params, stream_response, wants_stream
+from .counts import get_follow_counts
 from .models import Follow
 from .serializers import (
     FollowSerializer, FollowCreateSerializer, UserBasicSerializer, FollowStatsSerializer
@@ -69,6 +71,7 @@ class FollowersListAPI(APIView):
     """List user's followers"""
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
+    read_replica = True
     
     def get(self, request, user_id=None):
         try:
@@ -77,13 +80,23 @@ class FollowersListAPI(APIView):
             else:
                 user = request.user
             
-            followers = Follow.objects.filter(following=user).select_related('follower')
-            follower_users = [follow.follower for follow in followers]
+            follower_users = User.objects.filter(following__following=user).select_related('userprofile').order_by('id')
+            if wants_stream(request):
+                return stream_response(
+                    f'Followers of {user.get_full_name()}', follower_users,
+                    lambda rows: UserBasicSerializer(rows, many=True).data
+                )
             
-            serializer = UserBasicSerializer(follower_users, many=True)
+            page, page_size, start, end = get_page_params(request.query_params)
+            total_count = follower_users.count()
+            
+            serializer = UserBasicSerializer(follower_users[start:end], many=True)
             return Response({
                 'message': f'Followers of {user.get_full_name()}',
-                'count': len(follower_users),
+                'count': total_count,
+                'page': page,
+                'page_size': page_size,
+                'total_pages': (total_count + page_size - 1) // page_size,
                 'data': serializer.data
             }, status=status.HTTP_200_OK)
             
@@ -97,6 +110,7 @@ class FollowingListAPI(APIView):
     """List users that current user is following"""
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
+    read_replica = True
     
     def get(self, request, user_id=None):
         try:
@@ -105,13 +119,23 @@ class FollowingListAPI(APIView):
             else:
                 user = request.user
             
-            following = Follow.objects.filter(follower=user).select_related('following')
-            following_users = [follow.following for follow in following]
+            following_users = User.objects.filter(followers__follower=user).select_related('userprofile').order_by('id')
+            if wants_stream(request):
+                return stream_response(
+                    f'Users followed by {user.get_full_name()}', following_users,
+                    lambda rows: UserBasicSerializer(rows, many=True).data
+                )
+            
+            page, page_size, start, end = get_page_params(request.query_params)
+            total_count = following_users.count()
             
-            serializer = UserBasicSerializer(following_users, many=True)
+            serializer = UserBasicSerializer(following_users[start:end], many=True)
             return Response({
                 'message': f'Users followed by {user.get_full_name()}',
-                'count': len(following_users),
+                'count': total_count,
+                'page': page,
+                'page_size': page_size,
+                'total_pages': (total_count + page_size - 1) // page_size,
                 'data': serializer.data
             }, status=status.HTTP_200_OK)
             
@@ -130,8 +154,7 @@ class UserFollowStatsAPI(APIView):
         try:
             user = get_object_or_404(User, id=user_id)
             
-            followers_count = Follow.objects.filter(following=user).count()
-            following_count = Follow.objects.filter(follower=user).count()
+            followers_count, following_count = get_follow_counts(user.id)
             is_following = Follow.objects.filter(
                 follower=request.user, 
                 following=user
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Production server launcher (start_server.py and `manage.py runserver` are
+for development only).
+
+    python serve.py                 # start gunicorn in the foreground
+    python serve.py --asgi          # serve job_portal.asgi with uvicorn workers
+    python serve.py reload          # zero-downtime reload onto new code
+    python serve.py stop            # finish in-flight requests, then exit
+
+Settings live in gunicorn.conf.py. Arguments after -- are passed to
+gunicorn, e.g. `python serve.py -- --workers 8`.
+
+reload starts a second master on the same socket with USR2. It preloads
+the new code and warms its caches before forking workers, and only once
+it answers /health/ is the old master told to stop gracefully. If the new
+master does not come up, the old one keeps serving.
+"""
+import argparse
+import json
+import os
+import runpy
+import signal
+import sys
+import time
+import urllib.request
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG = os.path.join(BASE_DIR, 'gunicorn.conf.py')
+RELOAD_TIMEOUT = int(os.environ.get('SERVER_RELOAD_TIMEOUT', '120'))
+
+
+def read_pid(path):
+    try:
+        with open(path) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def wait_for(check, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if check():
+            return True
+        time.sleep(0.5)
+    return False
+
+
+def healthy(bind, master):
+    """Whether a worker of master answers /health/ with 200; old and new workers share the socket"""
+    if bind.startswith('unix:'):
+        return True
+    host, _, port = bind.rpartition(':')
+    host = '127.0.0.1' if host in ('', '0.0.0.0', '[::]') else host
+    try:
+        with urllib.request.urlopen(f'http://{host}:{port}/health/', timeout=2) as response:
+            return json.load(response).get('master') == master
+    except (OSError, ValueError):
+        return False
+
+
+def start(args, extra):
+    if args.asgi:
+        os.environ['SERVER_INTERFACE'] = 'asgi'
+    os.chdir(BASE_DIR)
+    # The console script, not `python -m gunicorn`: on reload gunicorn re-executes
+    # its own argv, and running gunicorn/__main__.py as a file breaks its imports
+    script = os.path.join(os.path.dirname(sys.executable), 'gunicorn')
+    os.execvp(script if os.path.exists(script) else 'gunicorn', ['gunicorn', '-c', CONFIG, *extra])
+
+
+def reload(config):
+    old = read_pid(config['pidfile'])
+    if old is None:
+        sys.exit(f"No server running ({config['pidfile']} not found)")
+    new_pidfile = config['pidfile'] + '.2'
+    if os.path.exists(new_pidfile):
+        sys.exit(f'A reload is already in progress ({new_pidfile} exists)')
+    os.kill(old, signal.SIGUSR2)
+    # The new master writes <pidfile>.2 once its app is loaded and warm
+    if not wait_for(lambda: read_pid(new_pidfile) is not None, RELOAD_TIMEOUT):
+        sys.exit('New server did not start; the old one is still serving')
+    new = read_pid(new_pidfile)
+    bind = config['bind'] if isinstance(config['bind'], str) else config['bind'][0]
+    if not wait_for(lambda: healthy(bind, new), RELOAD_TIMEOUT):
+        os.kill(new, signal.SIGTERM)
+        sys.exit('New server is not healthy and was stopped; the old one is still serving')
+    os.kill(old, signal.SIGTERM)
+    print(f'Reloaded: master {old} -> {new}')
+
+
+def stop(config):
+    pid = read_pid(config['pidfile'])
+    if pid is None:
+        sys.exit(f"No server running ({config['pidfile']} not found)")
+    os.kill(pid, signal.SIGTERM)
+    print(f'Stopping master {pid}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the production server')
+    parser.add_argument('command', nargs='?', default='start', choices=['start', 'reload', 'stop'])
+    parser.add_argument('--asgi', action='store_true', help='Serve the ASGI app with uvicorn workers')
+    argv = sys.argv[1:]
+    split = argv.index('--') if '--' in argv else len(argv)
+    args, extra = parser.parse_args(argv[:split]), argv[split + 1:]
+    if args.command == 'start':
+        start(args, extra)
+    else:
+        config = runpy.run_path(CONFIG)
+        reload(config) if args.command == 'reload' else stop(config)
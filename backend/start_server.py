@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 """
 Simple script to start the Django development server and test the authentication system
+(for production use serve.py)
 """
 import os
 import sys